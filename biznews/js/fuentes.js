@@ -75,23 +75,19 @@
             }
         }
         
-        // Primero obtener solo el conteo total
-        const countRes = await fetch(`${API_BASE_URL}/news/fuentes/${encodeURIComponent(fuenteName)}?limit=1${dateParams}`, { 
+        // Una sola petición: la muestra trae también el total (cacheado en la API)
+        // y solo las columnas que usan los filtros (sin contenido)
+        const sampleRes = await fetch(`${API_BASE_URL}/news/fuentes/${encodeURIComponent(fuenteName)}?limit=100&fields=id,titulo,resumen,fuente${dateParams}`, { 
             headers: { "Accept": "application/json" } 
         });
-        if (!countRes.ok) throw new Error(`Error fetching count for fuente ${fuenteName}: ${countRes.status}`);
-        const countData = await countRes.json();
-        const totalCount = countData.total || 0;
+        if (!sampleRes.ok) throw new Error(`Error fetching sample for fuente ${fuenteName}: ${sampleRes.status}`);
+        const sampleData = await sampleRes.json();
+        const totalCount = sampleData.total || 0;
         
         console.log(`${fuenteName} (${timeFilter}): Total de noticias en API: ${totalCount}`);
         
-        // Si hay noticias, obtener una muestra para aplicar filtros
+        // Si hay noticias, aplicar filtros a la muestra
         if (totalCount > 0) {
-            const sampleRes = await fetch(`${API_BASE_URL}/news/fuentes/${encodeURIComponent(fuenteName)}?limit=100${dateParams}`, { 
-                headers: { "Accept": "application/json" } 
-            });
-            if (!sampleRes.ok) throw new Error(`Error fetching sample for fuente ${fuenteName}: ${sampleRes.status}`);
-            const sampleData = await sampleRes.json();
             const sampleNews = Array.isArray(sampleData) ? sampleData : (sampleData.items || []);
             
             // Aplicar los mismos filtros
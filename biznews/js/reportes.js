@@ -7,116 +7,56 @@
     let fuentesChart, categoriasChart, mensualChart, diasChart, topNewsChart;
     let chartsLoaded = false;
 
-    // Función para obtener datos de la API
-    async function fetchData() {
+    // Función para obtener datos de la API: todos los agregados en una sola petición
+    async function fetchStats() {
         try {
-            const [newsRes, fuentesRes, categoriasRes] = await Promise.all([
-                fetch(`${API_BASE_URL}/news`, { headers: { "Accept": "application/json" } }),
-                fetch(`${API_BASE_URL}/news/fuentes/listar`, { headers: { "Accept": "application/json" } }),
-                fetch(`${API_BASE_URL}/news/categorias/listar`, { headers: { "Accept": "application/json" } })
-            ]);
+            const res = await fetch(`${API_BASE_URL}/news/stats`, { headers: { "Accept": "application/json" } });
 
-            if (!newsRes.ok || !fuentesRes.ok || !categoriasRes.ok) {
+            if (!res.ok) {
                 throw new Error('Error fetching data from API');
             }
 
-            const news = await newsRes.json();
-            const fuentes = await fuentesRes.json();
-            const categorias = await categoriasRes.json();
-
-            const newsData = Array.isArray(news) ? news : (news.items || []);
-            const fuentesData = Array.isArray(fuentes) ? fuentes : (fuentes.fuentes || []);
-            const categoriasData = Array.isArray(categorias) ? categorias : (categorias.categorias || []);
-
-            return { newsData, fuentesData, categoriasData };
+            return await res.json();
         } catch (error) {
             console.error('Error fetching data:', error);
-            return { newsData: [], fuentesData: [], categoriasData: [] };
+            return null;
         }
     }
 
     // Función para procesar datos de noticias por fuente
-    function processFuentesData(newsData, fuentesData) {
-        const fuentesCount = {};
-        fuentesData.forEach(fuente => {
-            fuentesCount[fuente] = 0;
-        });
-
-        newsData.forEach(news => {
-            if (news.fuente && fuentesCount.hasOwnProperty(news.fuente)) {
-                fuentesCount[news.fuente]++;
-            }
-        });
-
-        return Object.entries(fuentesCount)
-            .filter(([_, count]) => count > 0)
-            .sort((a, b) => b[1] - a[1]);
+    function processFuentesData(stats) {
+        return stats.por_fuente
+            .filter(item => item.total > 0)
+            .map(item => [item.nombre, item.total]);
     }
 
     // Función para procesar datos de noticias por categoría
-    function processCategoriasData(newsData, categoriasData) {
-        const categoriasCount = {};
-        categoriasData.forEach(categoria => {
-            categoriasCount[categoria] = 0;
-        });
-
-        newsData.forEach(news => {
-            if (news.categoria && categoriasCount.hasOwnProperty(news.categoria)) {
-                categoriasCount[news.categoria]++;
-            }
-        });
-
-        return Object.entries(categoriasCount)
-            .filter(([_, count]) => count > 0)
-            .sort((a, b) => b[1] - a[1]);
+    function processCategoriasData(stats) {
+        return stats.por_categoria
+            .filter(item => item.total > 0)
+            .map(item => [item.nombre, item.total]);
     }
 
-    // Función para procesar datos mensuales
-    function processMensualData(newsData) {
-        const mensualCount = {};
-        
-        newsData.forEach(news => {
-            if (news.fecha) {
-                const date = new Date(news.fecha);
-                const monthKey = `${date.getFullYear()}-${String(date.getMonth() + 1).padStart(2, '0')}`;
-                const monthName = date.toLocaleDateString('es-ES', { year: 'numeric', month: 'short' });
-                
-                if (!mensualCount[monthKey]) {
-                    mensualCount[monthKey] = { name: monthName, count: 0 };
-                }
-                mensualCount[monthKey].count++;
-            }
+    // Función para procesar datos mensuales (la API los devuelve en orden cronológico)
+    function processMensualData(stats) {
+        return stats.por_mes.map(item => {
+            const [year, month] = item.mes.split('-').map(Number);
+            const date = new Date(year, month - 1, 1);
+            return {
+                name: date.toLocaleDateString('es-ES', { year: 'numeric', month: 'short' }),
+                count: item.total
+            };
         });
-
-        return Object.values(mensualCount).sort((a, b) => a.name.localeCompare(b.name));
     }
 
     // Función para procesar datos por día de la semana
-    function processDiasData(newsData) {
-        const diasCount = {
-            'Lunes': 0, 'Martes': 0, 'Miércoles': 0, 'Jueves': 0,
-            'Viernes': 0, 'Sábado': 0, 'Domingo': 0
-        };
-        
-        newsData.forEach(news => {
-            if (news.fecha) {
-                const date = new Date(news.fecha);
-                const dayName = date.toLocaleDateString('es-ES', { weekday: 'long' });
-                if (diasCount.hasOwnProperty(dayName)) {
-                    diasCount[dayName]++;
-                }
-            }
-        });
-
-        return Object.entries(diasCount);
+    function processDiasData(stats) {
+        return stats.por_dia_semana.map(item => [item.dia, item.total]);
     }
 
     // Función para procesar top noticias (simulado por fecha de creación)
-    function processTopNewsData(newsData) {
-        return newsData
-            .filter(news => news.titulo && news.titulo.trim() !== '')
-            .sort((a, b) => new Date(b.created_at || b.fecha_extraccion) - new Date(a.created_at || a.fecha_extraccion))
-            .slice(0, 10)
+    function processTopNewsData(stats) {
+        return stats.recientes
             .map((news, index) => ({
                 title: news.titulo.length > 50 ? news.titulo.substring(0, 50) + '...' : news.titulo,
                 count: Math.floor(Math.random() * 1000) + 100, // Simulado
@@ -354,26 +294,11 @@
     }
 
     // Función para actualizar resumen estadístico
-    function updateStatsSummary(newsData, fuentesData, categoriasData) {
-        const totalNews = newsData.length;
-        const totalFuentes = fuentesData.length;
-        const totalCategorias = categoriasData.length;
-        
-        // Calcular promedio por día (últimos 30 días)
-        const thirtyDaysAgo = new Date();
-        thirtyDaysAgo.setDate(thirtyDaysAgo.getDate() - 30);
-        
-        const recentNews = newsData.filter(news => {
-            const newsDate = new Date(news.fecha || news.created_at);
-            return newsDate >= thirtyDaysAgo;
-        });
-        
-        const avgPerDay = Math.round(recentNews.length / 30 * 10) / 10;
-
-        document.getElementById('total-news').textContent = totalNews.toLocaleString();
-        document.getElementById('total-fuentes').textContent = totalFuentes;
-        document.getElementById('total-categorias').textContent = totalCategorias;
-        document.getElementById('avg-per-day').textContent = avgPerDay;
+    function updateStatsSummary(stats) {
+        document.getElementById('total-news').textContent = stats.total.toLocaleString();
+        document.getElementById('total-fuentes').textContent = stats.total_fuentes;
+        document.getElementById('total-categorias').textContent = stats.total_categorias;
+        document.getElementById('avg-per-day').textContent = stats.promedio_diario;
     }
 
     // Función para actualizar fecha de última actualización
@@ -425,21 +350,21 @@
 
             console.log('Cargando datos para reportes...');
             
-            const { newsData, fuentesData, categoriasData } = await fetchData();
+            const stats = await fetchStats();
             
-            if (newsData.length === 0) {
+            if (!stats || stats.total === 0) {
                 console.warn('No hay datos disponibles para mostrar');
                 return;
             }
 
-            console.log(`Datos cargados: ${newsData.length} noticias, ${fuentesData.length} fuentes, ${categoriasData.length} categorías`);
+            console.log(`Datos cargados: ${stats.total} noticias, ${stats.total_fuentes} fuentes, ${stats.total_categorias} categorías`);
 
             // Procesar datos
-            const fuentesProcessed = processFuentesData(newsData, fuentesData);
-            const categoriasProcessed = processCategoriasData(newsData, categoriasData);
-            const mensualProcessed = processMensualData(newsData);
-            const diasProcessed = processDiasData(newsData);
-            const topNewsProcessed = processTopNewsData(newsData);
+            const fuentesProcessed = processFuentesData(stats);
+            const categoriasProcessed = processCategoriasData(stats);
+            const mensualProcessed = processMensualData(stats);
+            const diasProcessed = processDiasData(stats);
+            const topNewsProcessed = processTopNewsData(stats);
 
             // Crear gráficas solo una vez
             createFuentesChart(fuentesProcessed);
@@ -449,7 +374,7 @@
             createTopNewsChart(topNewsProcessed);
 
             // Actualizar resumen
-            updateStatsSummary(newsData, fuentesData, categoriasData);
+            updateStatsSummary(stats);
             updateLastUpdate();
 
             // Marcar como cargado
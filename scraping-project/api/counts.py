@@ -0,0 +1,132 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from bulk_loader import DATA_VERSION_INSTALLED_SQL, DATA_VERSION_TABLE
+
+from .rollups import ROLLUP_CHECK_TTL, rollup_total, rollups_installed
+
+# Count strategy for the list endpoints.
+#
+# - Exact counts are cached per filter signature (WHERE clause + params) and
+#   stamped with the data version of `noticias`; every ingest (BulkLoader
+#   bumps the version key in noticias_version) or update/delete changes it
+#   and invalidates every cached count.
+# - For expensive filters (text search) the planner estimate is used when it
+#   is above COUNT_ESTIMATE_THRESHOLD, so the count never scans the table.
+# - Filters that only use fuente, categoria and a start date are answered from
+#   the daily rollup table (news_rollups) when it is installed.
+# - Callers can skip the count entirely with include_total=false.
+
+COUNT_CACHE_TTL = int(os.getenv("COUNT_CACHE_TTL", "300"))
+COUNT_CACHE_SIZE = int(os.getenv("COUNT_CACHE_SIZE", "1024"))
+COUNT_ESTIMATE_THRESHOLD = int(os.getenv("COUNT_ESTIMATE_THRESHOLD", "10000"))
+
+_cache: "OrderedDict[Tuple[str, Tuple[Any, ...]], Tuple[Tuple[int, int], int, float]]" = OrderedDict()
+_lock = threading.Lock()
+
+_versioned: Optional[tuple] = None
+
+# Updates and deletes made outside BulkLoader (cleanup, dedup) only show in
+# the statistics collector
+_CHANGES_SQL = "COALESCE((SELECT n_tup_upd + n_tup_del FROM pg_stat_user_tables WHERE relname = 'noticias'), 0)"
+
+
+async def _version_key_installed(cur) -> bool:
+    global _versioned
+    if _versioned is not None and time.monotonic() - _versioned[1] < ROLLUP_CHECK_TTL:
+        return _versioned[0]
+    await cur.execute(DATA_VERSION_INSTALLED_SQL, [DATA_VERSION_TABLE])
+    installed = bool((await cur.fetchone())[0])
+    _versioned = (installed, time.monotonic())
+    return installed
+
+
+async def data_version(cur) -> Tuple[int, int]:
+    """
+    Cheap change marker for `noticias`: the ingest version BulkLoader bumps
+    on every merge (the highest id on databases without noticias_version)
+    plus the updated/deleted tuple counters from the statistics collector.
+    """
+    if await _version_key_installed(cur):
+        ingest_sql = f"(SELECT version FROM {DATA_VERSION_TABLE})"
+    else:
+        ingest_sql = "(SELECT COALESCE(MAX(id), 0) FROM noticias)"
+    await cur.execute(f"SELECT {ingest_sql}, {_CHANGES_SQL}")
+    ingest, changes = await cur.fetchone()
+    return int(ingest or 0), int(changes)
+
+
+def invalidate_counts() -> None:
+    with _lock:
+        _cache.clear()
+
+
+def _where_sql(where: Sequence[str]) -> str:
+    return f"WHERE {' AND '.join(where)}" if where else ""
+
+
+async def estimate_count(cur, where: Sequence[str], params: Sequence[Any]) -> int:
+    """Row estimate of the planner for the filter (no table scan)."""
+    await cur.execute(f"EXPLAIN (FORMAT JSON) SELECT 1 FROM noticias {_where_sql(where)}", list(params))
+    plan = (await cur.fetchone())[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _cached(key, version) -> Optional[int]:
+    with _lock:
+        entry = _cache.get(key)
+        if entry is None:
+            return None
+        cached_version, total, stored_at = entry
+        if cached_version != version or time.monotonic() - stored_at > COUNT_CACHE_TTL:
+            del _cache[key]
+            return None
+        _cache.move_to_end(key)
+        return total
+
+
+def _store(key, version, total: int) -> None:
+    with _lock:
+        _cache[key] = (version, total, time.monotonic())
+        _cache.move_to_end(key)
+        while len(_cache) > COUNT_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+async def count_news(
+    cur,
+    where: Sequence[str],
+    params: Sequence[Any],
+    expensive: bool = False,
+    rollup: Optional[Dict[str, Any]] = None,
+) -> Tuple[int, bool]:
+    """
+    Total rows of noticias matching the filter.
+    `rollup` is the same filter as news_rollups.total_noticias() arguments (fuente,
+    categoria, desde), when it can be expressed that way.
+    Returns (total, exact); exact is False when the planner estimate was used.
+    """
+    if rollup is not None and await rollups_installed(cur):
+        return await rollup_total(cur, **rollup), True
+
+    key = (" AND ".join(where), tuple(str(p) for p in params))
+    version = await data_version(cur)
+    total = _cached(key, version)
+    if total is not None:
+        return total, True
+
+    if expensive:
+        estimate = await estimate_count(cur, where, params)
+        if estimate >= COUNT_ESTIMATE_THRESHOLD:
+            return estimate, False
+
+    await cur.execute(f"SELECT COUNT(*) FROM noticias {_where_sql(where)}", list(params))
+    total = (await cur.fetchone())[0]
+    _store(key, version, total)
+    return total, True
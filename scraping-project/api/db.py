@@ -1,8 +1,25 @@
 import os
-from typing import Optional
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
 
-import psycopg2
-from psycopg2.pool import SimpleConnectionPool
+from psycopg import AsyncConnection
+from psycopg_pool import AsyncConnectionPool
+
+# Async connection pool (psycopg 3) shared by every request of the worker.
+#
+# - Connections are in autocommit mode: the API only reads, so no request
+#   leaves a connection idle in a transaction.
+# - Statements executed DB_PREPARE_THRESHOLD times on a connection are
+#   prepared server-side; set it empty to disable (e.g. behind pgbouncer in
+#   transaction mode).
+# - A request waits up to DB_POOL_TIMEOUT seconds for a free connection
+#   instead of failing when all DB_POOL_MAX_SIZE are busy.
+
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+_prepare_threshold = os.getenv("DB_PREPARE_THRESHOLD", "2")
+DB_PREPARE_THRESHOLD: Optional[int] = int(_prepare_threshold) if _prepare_threshold else None
 
 
 def build_conn_str() -> str:
@@ -14,30 +31,42 @@ def build_conn_str() -> str:
     return f"host={host} port={port} dbname={db} user={user} password={password}"
 
 
-_pool: Optional[SimpleConnectionPool] = None
+_pool: Optional[AsyncConnectionPool] = None
 
 
-def init_pool(minconn: int = 1, maxconn: int = 5) -> None:
+async def init_pool(min_size: int = DB_POOL_MIN_SIZE, max_size: int = DB_POOL_MAX_SIZE) -> None:
     global _pool
     if _pool is None:
-        _pool = SimpleConnectionPool(minconn=minconn, maxconn=maxconn, dsn=build_conn_str())
+        _pool = AsyncConnectionPool(
+            build_conn_str(),
+            min_size=min_size,
+            max_size=max_size,
+            timeout=DB_POOL_TIMEOUT,
+            kwargs={"autocommit": True, "prepare_threshold": DB_PREPARE_THRESHOLD},
+            name="news_api",
+            open=False,
+        )
+        await _pool.open()
 
 
-def get_conn():
+@asynccontextmanager
+async def connection() -> AsyncIterator[AsyncConnection]:
     if _pool is None:
-        init_pool()
+        await init_pool()
     assert _pool is not None
-    return _pool.getconn()
+    async with _pool.connection() as conn:
+        yield conn
 
 
-def put_conn(conn) -> None:
-    assert _pool is not None
-    _pool.putconn(conn)
+def pool_stats() -> Dict[str, Any]:
+    """Pool size, free connections, waiting requests, wait times, errors..."""
+    if _pool is None:
+        return {}
+    return _pool.get_stats()
 
 
-def close_pool() -> None:
+async def close_pool() -> None:
     global _pool
     if _pool is not None:
-        _pool.closeall()
+        await _pool.close()
         _pool = None
-
@@ -0,0 +1,141 @@
+import io
+import os
+import re
+from datetime import date, datetime, time
+from typing import Any, AsyncIterator, Callable, Dict, List, Sequence
+
+from starlette.concurrency import run_in_threadpool
+
+from .db import connection
+from .serialization import dumps
+
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.parquet as pq  # type: ignore
+except ImportError:  # pragma: no cover - optional, only for format=parquet
+    pa = None
+    pq = None
+
+# Bulk export of `noticias` for downstream analytics (/news/export).
+#
+# The filtered rows are read through a server-side (named) cursor in batches of
+# EXPORT_BATCH_SIZE and every batch is encoded and sent as soon as it arrives,
+# so memory stays constant whatever the size of the result set. The response
+# is streamed with chunked transfer encoding. Encoding runs in the threadpool so
+# a large export does not hold up the event loop.
+#
+# An export keeps one pool connection (inside a read-only transaction, which
+# the named cursor needs) until the client has read the whole body.
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "2000"))
+
+EXPORT_FORMATS: Dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def parquet_available() -> bool:
+    return pq is not None
+
+
+async def stream_batches(
+    columns: Sequence[str], where: Sequence[str], params: Sequence[Any], order: str = "asc"
+) -> AsyncIterator[List[tuple]]:
+    """Rows of the filtered noticias, in batches, in id (ingest) order."""
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+    direction = "DESC" if order == "desc" else "ASC"
+    async with connection() as conn:
+        async with conn.transaction():
+            await conn.execute("SET TRANSACTION READ ONLY")
+            async with conn.cursor(name="news_export") as cur:
+                cur.itersize = EXPORT_BATCH_SIZE
+                await cur.execute(
+                    f"SELECT {', '.join(columns)} FROM noticias {where_sql} ORDER BY id {direction}",
+                    list(params),
+                )
+                while True:
+                    rows = await cur.fetchmany(EXPORT_BATCH_SIZE)
+                    if not rows:
+                        break
+                    yield rows
+
+
+def _ndjson_lines(columns: Sequence[str], rows: List[tuple]) -> bytes:
+    return b"".join(dumps(dict(zip(columns, row))) + b"\n" for row in rows)
+
+
+async def _ndjson(columns: Sequence[str], batches: AsyncIterator[List[tuple]]) -> AsyncIterator[bytes]:
+    async for rows in batches:
+        yield await run_in_threadpool(_ndjson_lines, columns, rows)
+
+
+_CSV_NEEDS_QUOTES = re.compile(r'[",\r\n]')
+
+
+def _csv_field(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return '"' + value.replace('"', '""') + '"' if _CSV_NEEDS_QUOTES.search(value) else value
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_lines(rows: Sequence[Sequence[Any]]) -> bytes:
+    return "".join(",".join(map(_csv_field, row)) + "\r\n" for row in rows).encode()
+
+
+async def _csv(columns: Sequence[str], batches: AsyncIterator[List[tuple]]) -> AsyncIterator[bytes]:
+    # Same quoting as csv.writer (RFC 4180, minimal quoting), but built with
+    # str methods: the csv module copies long fields like contenido char by
+    # char and was ~3x slower than the NDJSON path. Unlike csv.writer, which
+    # writes str(value), dates and times are ISO 8601 (isoformat, with "T"),
+    # the same text as in the NDJSON export
+    yield _csv_lines([columns])
+    async for rows in batches:
+        yield await run_in_threadpool(_csv_lines, rows)
+
+
+# Fixed Arrow types, so every row group has the same schema even when a batch
+# only has NULLs in a column
+_PARQUET_TYPES: Dict[str, Callable[[], Any]] = {
+    "id": lambda: pa.int64(),
+    "fecha": lambda: pa.timestamp("us"),
+    "hora": lambda: pa.time64("us"),
+    "fecha_extraccion": lambda: pa.timestamp("us"),
+    "created_at": lambda: pa.timestamp("us"),
+}
+
+
+def _parquet_row_group(writer, schema, sink: io.BytesIO, rows: List[tuple]) -> bytes:
+    arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)]
+    writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+    # Hand over what has been written so far (Arrow keeps its own offsets)
+    data = sink.getvalue()
+    sink.seek(0)
+    sink.truncate()
+    return data
+
+
+async def _parquet(columns: Sequence[str], batches: AsyncIterator[List[tuple]]) -> AsyncIterator[bytes]:
+    schema = pa.schema([(c, _PARQUET_TYPES.get(c, pa.string)()) for c in columns])
+    sink = io.BytesIO()
+    # One row group per batch
+    with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+        async for rows in batches:
+            yield await run_in_threadpool(_parquet_row_group, writer, schema, sink, rows)
+    # Footer
+    yield sink.getvalue()
+
+
+ENCODERS = {"ndjson": _ndjson, "csv": _csv, "parquet": _parquet}
+
+
+def export_stream(
+    fmt: str, columns: Sequence[str], where: Sequence[str], params: Sequence[Any], order: str = "asc"
+) -> AsyncIterator[bytes]:
+    """Encoded body of an export, chunk by chunk."""
+    return ENCODERS[fmt](columns, stream_batches(columns, where, params, order))
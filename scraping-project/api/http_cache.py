@@ -0,0 +1,33 @@
+import hashlib
+import json
+from typing import Any
+
+from fastapi import Request, Response
+
+# Conditional GET helpers: strong ETags computed from the response body, so a
+# client that already has the current representation gets an empty 304.
+
+
+def make_etag(payload: Any) -> str:
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str).encode()
+    return '"' + hashlib.blake2b(raw, digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [c.strip() for c in header.split(",")]
+    # Weak comparison (RFC 9110 13.1.2): W/ prefixes are ignored
+    return "*" in candidates or etag in (c[2:] if c.startswith("W/") else c for c in candidates)
+
+
+def cache_headers(response: Response, etag: str, max_age: int) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = f"public, max-age={max_age}"
+
+
+def not_modified(etag: str, max_age: int) -> Response:
+    response = Response(status_code=304)
+    cache_headers(response, etag, max_age)
+    return response
@@ -3,8 +3,9 @@ import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from .db import close_pool, init_pool
+from .db import close_pool, init_pool, pool_stats
 from .routers import news
+from .schema import check_schema
 
 try:
     from dotenv import load_dotenv  # type: ignore
@@ -45,6 +46,11 @@ async def health():
     return {"status": "ok"}
 
 
+@app.get("/health/db")
+async def health_db():
+    return {"status": "ok", "pool": pool_stats()}
+
+
 app.include_router(news.router, prefix="/news", tags=["news"])
 
 
@@ -52,10 +58,11 @@ app.include_router(news.router, prefix="/news", tags=["news"])
 
 
 @app.on_event("startup")
-def on_startup():
-    init_pool()
+async def on_startup():
+    await init_pool()
+    await check_schema()
 
 
 @app.on_event("shutdown")
-def on_shutdown():
-    close_pool()
+async def on_shutdown():
+    await close_pool()
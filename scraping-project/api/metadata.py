@@ -0,0 +1,72 @@
+import os
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from news_rollups import ROLLUP_TABLE
+
+from .counts import data_version
+from .db import connection
+from .http_cache import make_etag
+from .rollups import rollups_installed
+
+# In-process cache of the fuente/categoria listings.
+#
+# Within METADATA_CACHE_TTL seconds a listing is served without touching the
+# database. After that the data version of `noticias` is checked (the version
+# key BulkLoader bumps on every ingest, see api/counts.py) and the DISTINCT
+# query only runs again if it changed. The ETag is derived from the values
+# rather than from the version, so clients keep getting 304 while an ingest
+# did not add a new fuente or categoria.
+
+METADATA_CACHE_TTL = int(os.getenv("METADATA_CACHE_TTL", "30"))
+METADATA_MAX_AGE = int(os.getenv("METADATA_MAX_AGE", "60"))
+
+METADATA_COLUMNS = ("fuente", "categoria")
+
+# column -> (data version, values, etag, checked_at)
+_cache: Dict[str, Tuple[Tuple[int, int], List[str], str, float]] = {}
+_lock = threading.Lock()
+
+
+async def distinct_values(cur, column: str) -> List[str]:
+    # The rollup table has one row per day x fuente x categoria, not per news
+    source = ROLLUP_TABLE if await rollups_installed(cur) else "noticias"
+    having = "HAVING SUM(total) > 0" if source == ROLLUP_TABLE else ""
+    await cur.execute(
+        f"""
+        SELECT {column} FROM {source}
+        WHERE {column} IS NOT NULL AND {column} != ''
+        GROUP BY {column} {having}
+        ORDER BY {column}
+        """
+    )
+    return [row[0] for row in await cur.fetchall()]
+
+
+def invalidate_metadata() -> None:
+    with _lock:
+        _cache.clear()
+
+
+async def get_listing(column: str) -> Tuple[List[str], str]:
+    """Sorted distinct values of `column` and their ETag."""
+    if column not in METADATA_COLUMNS:
+        raise ValueError(f"column must be one of {METADATA_COLUMNS}")
+    with _lock:
+        entry = _cache.get(column)
+    if entry is not None and time.monotonic() - entry[3] < METADATA_CACHE_TTL:
+        return entry[1], entry[2]
+
+    async with connection() as conn:
+        cur = conn.cursor()
+        version = await data_version(cur)
+        if entry is not None and entry[0] == version:
+            values, etag = entry[1], entry[2]
+        else:
+            values = await distinct_values(cur, column)
+            etag = make_etag(values)
+
+    with _lock:
+        _cache[column] = (version, values, etag, time.monotonic())
+    return values, etag
@@ -19,9 +19,74 @@ class News(BaseModel):
     imagenes: Optional[str] = None
     fuente: Optional[str] = None
     created_at: Optional[datetime] = None
+    # Highlighted search fragment (only for ?q= searches)
+    snippet: Optional[str] = None
 
 
 class NewsListResponse(BaseModel):
-    total: int
+    # None when the request used include_total=false
+    total: Optional[int] = None
+    # False when total is a planner estimate (expensive text filters)
+    total_exact: bool = True
     items: list[News]
+    # Opaque keyset cursor for the next page (pass it back as ?cursor=)
+    next_cursor: Optional[str] = None
+    # "fulltext" or "fuzzy" (pg_trgm title match) when ?q= was given
+    search_mode: Optional[str] = None
+
+
+class NewsSummary(BaseModel):
+    """Card-sized projection of News (view=summary): no contenido, short resumen."""
+
+    id: int
+    titulo: Optional[str] = None
+    fecha: Optional[datetime] = None
+    resumen: Optional[str] = None
+    categoria: Optional[str] = None
+    autor: Optional[str] = None
+    url: Optional[str] = None
+    # Only the first image
+    imagenes: Optional[str] = None
+    fuente: Optional[str] = None
+    created_at: Optional[datetime] = None
+    snippet: Optional[str] = None
+
+
+class NewsSummaryListResponse(NewsListResponse):
+    items: list[NewsSummary]
 
+
+class StatCount(BaseModel):
+    nombre: str
+    total: int
+
+
+class MonthCount(BaseModel):
+    # YYYY-MM
+    mes: str
+    total: int
+
+
+class WeekdayCount(BaseModel):
+    dia: str
+    total: int
+
+
+class RecentNews(BaseModel):
+    id: int
+    titulo: str
+    created_at: Optional[datetime] = None
+
+
+class NewsStats(BaseModel):
+    total: int
+    total_fuentes: int
+    total_categorias: int
+    # Average news per day over the last 30 days
+    promedio_diario: float
+    por_fuente: list[StatCount]
+    por_categoria: list[StatCount]
+    por_mes: list[MonthCount]
+    por_dia_semana: list[WeekdayCount]
+    recientes: list[RecentNews]
+    generated_at: datetime
@@ -0,0 +1,100 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+
+# Keyset (cursor) pagination over ORDER BY fecha <order> NULLS LAST, id <order>.
+#
+# The cursor is the (fecha, id) of the last row of the previous page, so a
+# page is a plain index range scan no matter how deep it is. Rows without
+# fecha sort last: once the dated rows are exhausted the page continues with
+# the NULL-fecha rows ordered by id. Both halves are served by the composite
+# indexes created by setup_database.py.
+
+
+def encode_cursor(fecha: Optional[datetime], news_id: int, order: str) -> str:
+    payload = [fecha.isoformat() if fecha else None, news_id, order]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, order: str) -> Tuple[Optional[datetime], int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        fecha, news_id, cursor_order = json.loads(raw)
+        fecha = datetime.fromisoformat(fecha) if fecha else None
+        news_id = int(news_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    if cursor_order != order:
+        raise HTTPException(status_code=400, detail="El cursor corresponde a otro orden")
+    return fecha, news_id
+
+
+def _where_sql(where: Sequence[str]) -> str:
+    return f"WHERE {' AND '.join(where)}" if where else ""
+
+
+async def fetch_page(
+    cur,
+    columns: Sequence[str],
+    where: Sequence[str],
+    params: Sequence[Any],
+    order: str,
+    limit: int,
+    skip: int = 0,
+    cursor: Optional[str] = None,
+) -> Tuple[List[tuple], Optional[str]]:
+    """
+    Fetch one page of noticias ordered by (fecha, id).
+
+    Without a cursor the page is selected with OFFSET (backward compatible);
+    with a cursor, skip is ignored. `columns` must include id and fecha.
+    Returns the rows and the cursor of the next page (None on the last page).
+    """
+    desc = order == "desc"
+    direction = "DESC" if desc else "ASC"
+    cmp = "<" if desc else ">"
+    select_sql = f"SELECT {', '.join(columns)} FROM noticias"
+    order_sql = f"ORDER BY fecha {direction} NULLS LAST, id {direction}"
+
+    where = list(where)
+    params = list(params)
+
+    if cursor is None:
+        await cur.execute(
+            f"{select_sql} {_where_sql(where)} {order_sql} OFFSET %s LIMIT %s",
+            params + [skip, limit],
+        )
+        rows = await cur.fetchall()
+    else:
+        last_fecha, last_id = decode_cursor(cursor, order)
+        rows = []
+        if last_fecha is not None:
+            await cur.execute(
+                f"{select_sql} {_where_sql(where + [f'(fecha, id) {cmp} (%s, %s)'])} {order_sql} LIMIT %s",
+                params + [last_fecha, last_id, limit],
+            )
+            rows = await cur.fetchall()
+
+        if len(rows) < limit:
+            # Continue (or keep going) through the rows without fecha
+            null_where = where + ["fecha IS NULL"]
+            null_params = list(params)
+            if last_fecha is None:
+                null_where.append(f"id {cmp} %s")
+                null_params.append(last_id)
+            await cur.execute(
+                f"{select_sql} {_where_sql(null_where)} ORDER BY id {direction} LIMIT %s",
+                null_params + [limit - len(rows)],
+            )
+            rows += await cur.fetchall()
+
+    next_cursor = None
+    if len(rows) == limit:
+        last = rows[-1]
+        next_cursor = encode_cursor(last[columns.index("fecha")], last[columns.index("id")], order)
+    return rows, next_cursor
@@ -0,0 +1,176 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from .counts import data_version
+from .db import connection
+from .http_cache import cache_headers, etag_matches, make_etag, not_modified
+
+logger = logging.getLogger(__name__)
+
+# Response cache for the GET endpoints of the news router.
+#
+# - Responses are keyed by path + normalized query string and stamped with the
+#   data version of `noticias` (MAX(id) + update/delete counters, see
+#   api/counts.py). The version itself is re-read at most every
+#   RESPONSE_VERSION_TTL seconds, so a repeated request within that window
+#   does not touch PostgreSQL at all.
+# - The ETag is derived from (key, version): a client revalidating with
+#   If-None-Match gets a 304 until the next ingest.
+# - Serialized bodies live in an in-memory LRU and, if RESPONSE_CACHE_REDIS_URL
+#   is set, in Redis as a second tier shared by all the API workers.
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "512"))
+RESPONSE_VERSION_TTL = float(os.getenv("RESPONSE_VERSION_TTL", "5"))
+RESPONSE_MAX_AGE = int(os.getenv("RESPONSE_MAX_AGE", "15"))
+RESPONSE_CACHE_REDIS_URL = os.getenv("RESPONSE_CACHE_REDIS_URL", "")
+RESPONSE_CACHE_REDIS_TTL = int(os.getenv("RESPONSE_CACHE_REDIS_TTL", "300"))
+
+Version = Tuple[int, int]
+
+_memory: "OrderedDict[str, Tuple[Version, bytes]]" = OrderedDict()
+_lock = threading.Lock()
+_version: Optional[Tuple[Version, float]] = None
+_redis = None
+
+
+def uncached(endpoint: Callable) -> Callable:
+    """Opt an endpoint out of the response cache (own validators, streaming)."""
+    endpoint.response_cache = False
+    return endpoint
+
+
+def cache_key(request: Request) -> str:
+    params = sorted((k, v) for k, v in request.query_params.multi_items() if v != "")
+    query = "&".join(f"{k}={v}" for k, v in params)
+    return f"{request.url.path}?{query}"
+
+
+async def current_version() -> Version:
+    global _version
+    with _lock:
+        if _version is not None and time.monotonic() - _version[1] < RESPONSE_VERSION_TTL:
+            return _version[0]
+    async with connection() as conn:
+        version = await data_version(conn.cursor())
+    with _lock:
+        _version = (version, time.monotonic())
+    return version
+
+
+def invalidate_responses() -> None:
+    global _version
+    with _lock:
+        _memory.clear()
+        _version = None
+
+
+def _get_redis():
+    global _redis
+    if _redis is None and RESPONSE_CACHE_REDIS_URL:
+        try:
+            import redis.asyncio as redis  # type: ignore
+
+            _redis = redis.Redis.from_url(RESPONSE_CACHE_REDIS_URL, socket_timeout=0.2)
+        except Exception as e:
+            logger.warning("Response cache: Redis tier disabled: %s", e)
+            _redis = False
+    return _redis or None
+
+
+def _redis_key(key: str, version: Version) -> str:
+    digest = hashlib.blake2b(f"{version}:{key}".encode(), digest_size=16).hexdigest()
+    return f"news_api:response:{digest}"
+
+
+def _memory_get(key: str, version: Version) -> Optional[bytes]:
+    with _lock:
+        entry = _memory.get(key)
+        if entry is None:
+            return None
+        if entry[0] != version:
+            del _memory[key]
+            return None
+        _memory.move_to_end(key)
+        return entry[1]
+
+
+def _memory_put(key: str, version: Version, body: bytes) -> None:
+    with _lock:
+        _memory[key] = (version, body)
+        _memory.move_to_end(key)
+        while len(_memory) > RESPONSE_CACHE_SIZE:
+            _memory.popitem(last=False)
+
+
+async def _redis_get(key: str, version: Version) -> Optional[bytes]:
+    client = _get_redis()
+    if client is None:
+        return None
+    try:
+        return await client.get(_redis_key(key, version))
+    except Exception as e:
+        logger.warning("Response cache: Redis get failed: %s", e)
+        return None
+
+
+async def _redis_put(key: str, version: Version, body: bytes) -> None:
+    client = _get_redis()
+    if client is None:
+        return
+    try:
+        await client.setex(_redis_key(key, version), RESPONSE_CACHE_REDIS_TTL, body)
+    except Exception as e:
+        logger.warning("Response cache: Redis set failed: %s", e)
+
+
+def _json_response(body: bytes, etag: str) -> Response:
+    response = Response(content=body, media_type="application/json")
+    cache_headers(response, etag, RESPONSE_MAX_AGE)
+    return response
+
+
+class CachedRoute(APIRoute):
+    """APIRoute whose GET responses go through the cache above."""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        if not getattr(self.endpoint, "response_cache", True):
+            return handler
+
+        async def cached_handler(request: Request) -> Response:
+            if request.method != "GET":
+                return await handler(request)
+
+            key = cache_key(request)
+            version = await current_version()
+            etag = make_etag([key, list(version)])
+            if etag_matches(request, etag):
+                return not_modified(etag, RESPONSE_MAX_AGE)
+
+            body = _memory_get(key, version)
+            if body is None and RESPONSE_CACHE_REDIS_URL:
+                body = await _redis_get(key, version)
+                if body is not None:
+                    _memory_put(key, version, body)
+            if body is not None:
+                return _json_response(body, etag)
+
+            response = await handler(request)
+            body = getattr(response, "body", None)
+            if response.status_code != 200 or not isinstance(body, bytes):
+                return response
+            _memory_put(key, version, body)
+            if RESPONSE_CACHE_REDIS_URL:
+                await _redis_put(key, version, body)
+            cache_headers(response, etag, RESPONSE_MAX_AGE)
+            return response
+
+        return cached_handler
@@ -0,0 +1,28 @@
+import os
+import time
+from typing import Optional
+
+from news_rollups import ROLLUPS_INSTALLED_PARAMS, ROLLUPS_INSTALLED_SQL, total_query
+
+# Async readers of the daily rollup table maintained by news_rollups.py.
+# Whether it is installed is re-checked every ROLLUP_CHECK_TTL seconds.
+
+ROLLUP_CHECK_TTL = float(os.getenv("ROLLUP_CHECK_TTL", "60"))
+
+_installed: Optional[tuple] = None
+
+
+async def rollups_installed(cur) -> bool:
+    global _installed
+    if _installed is not None and time.monotonic() - _installed[1] < ROLLUP_CHECK_TTL:
+        return _installed[0]
+    await cur.execute(ROLLUPS_INSTALLED_SQL, ROLLUPS_INSTALLED_PARAMS)
+    installed = bool((await cur.fetchone())[0])
+    _installed = (installed, time.monotonic())
+    return installed
+
+
+async def rollup_total(cur, fuente=None, categoria=None, desde=None) -> int:
+    """news_rollups.total_noticias for an async cursor."""
+    await cur.execute(*total_query(await rollups_installed(cur), fuente, categoria, desde))
+    return int((await cur.fetchone())[0])
@@ -1,52 +1,106 @@
+import os
 from datetime import datetime
-from typing import Any, List, Optional
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 
-from ..db import get_conn, put_conn
-from ..models import News, NewsListResponse
+from ..counts import count_news
+from ..db import connection
+from ..export import EXPORT_FORMATS, export_stream, parquet_available
+from ..http_cache import cache_headers, etag_matches, not_modified
+from ..metadata import METADATA_MAX_AGE, get_listing
+from ..models import News, NewsListResponse, NewsStats, NewsSummary, NewsSummaryListResponse
+from ..pagination import fetch_page
+from ..response_cache import CachedRoute, uncached
+from ..search import choose_mode, fetch_ranked_page, headlines, search_condition
+from ..serialization import VALIDATE_RESPONSES, JSONBytesResponse
+from ..stats import get_stats
 
-router = APIRouter()
+router = APIRouter(route_class=CachedRoute)
+
+NEWS_COLUMNS = [
+    "id",
+    "titulo",
+    "fecha",
+    "hora",
+    "resumen",
+    "contenido",
+    "categoria",
+    "autor",
+    "tags",
+    "url",
+    "fecha_extraccion",
+    "imagenes",
+    "fuente",
+    "created_at",
+]
+
+# view=summary: what the news cards show, without the article body
+SUMMARY_RESUMEN_CHARS = int(os.getenv("SUMMARY_RESUMEN_CHARS", "280"))
+
+SUMMARY_FIELDS = ["id", "titulo", "fecha", "resumen", "categoria", "autor", "url", "imagenes", "fuente", "created_at"]
+
+SUMMARY_COLUMNS = [
+    "id",
+    "titulo",
+    "fecha",
+    f"CASE WHEN length(resumen) > {SUMMARY_RESUMEN_CHARS} "
+    f"THEN left(resumen, {SUMMARY_RESUMEN_CHARS}) || '…' ELSE resumen END",
+    "categoria",
+    "autor",
+    "url",
+    "split_part(imagenes, ',', 1)",
+    "fuente",
+    "created_at",
+]
+
+ListResponse = Union[NewsListResponse, NewsSummaryListResponse]
 
 
 def _row_to_news(row: tuple) -> News:
-    (
-        id,
-        titulo,
-        fecha,
-        hora,
-        resumen,
-        contenido,
-        categoria,
-        autor,
-        tags,
-        url,
-        fecha_extraccion,
-        imagenes,
-        fuente,
-        created_at,
-    ) = row
-    return News(
-        id=id,
-        titulo=titulo,
-        fecha=fecha,
-        hora=hora,
-        resumen=resumen,
-        contenido=contenido,
-        categoria=categoria,
-        autor=autor,
-        tags=tags,
-        url=url,
-        fecha_extraccion=fecha_extraccion,
-        imagenes=imagenes,
-        fuente=fuente,
-        created_at=created_at,
-    )
+    return News(**dict(zip(NEWS_COLUMNS, row)))
+
 
+def _requested_fields(fields: str) -> List[str]:
+    requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in requested if f not in NEWS_COLUMNS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Campos no válidos: {', '.join(unknown)}")
+    return requested
 
-@router.get("", response_model=NewsListResponse)
-def list_news(
-    q: Optional[str] = Query(None, description="Texto a buscar en título o contenido"),
+
+def _projection(view: str, fields: Optional[str]) -> Tuple[List[str], Callable[[tuple], dict], Type[BaseModel]]:
+    """Columns to select, row -> item dict builder and item model for ?view= / ?fields=."""
+    if fields:
+        requested = _requested_fields(fields)
+        # id and fecha are always read (cursor), but only returned if requested
+        columns = ["id", "fecha"] + [f for f in requested if f not in ("id", "fecha")]
+        output = [i for i, c in enumerate(columns) if c == "id" or c in requested]
+        keys = [columns[i] for i in output]
+        pick = itemgetter(*output)
+        if len(output) == 1:
+            return columns, lambda row: {keys[0]: pick(row)}, News
+        return columns, lambda row: dict(zip(keys, pick(row))), News
+    if view == "summary":
+        return SUMMARY_COLUMNS, lambda row: dict(zip(SUMMARY_FIELDS, row)), NewsSummary
+    return NEWS_COLUMNS, lambda row: dict(zip(NEWS_COLUMNS, row)), News
+
+
+def _list_response(item_model: Type[BaseModel], page: Dict[str, Any]):
+    if not VALIDATE_RESPONSES:
+        return JSONBytesResponse(page)
+    page = {**page, "items": [item_model(**item) for item in page["items"]]}
+    if item_model is NewsSummary:
+        return NewsSummaryListResponse(**page)
+    return NewsListResponse(**page)
+
+
+@router.get("", response_model=ListResponse, response_model_exclude_unset=True)
+async def list_news(
+    q: Optional[str] = Query(None, description="Búsqueda de texto completo (sintaxis web: \"frase\", or, -palabra)"),
     categoria: Optional[str] = Query(None),
     fuente: Optional[str] = Query(None),
     date_from: Optional[str] = Query(None, description="YYYY-MM-DD"),
@@ -54,17 +108,22 @@ def list_news(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     order: str = Query("desc", regex="^(asc|desc)$"),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente (next_cursor); ignora skip"),
+    include_total: bool = Query(True, description="false: no calcular el total (total=null)"),
+    view: str = Query("full", regex="^(full|summary)$", description="summary: sin contenido y con resumen corto"),
+    fields: Optional[str] = Query(None, description="Columnas a devolver, separadas por comas (ej. id,titulo,fecha)"),
+    sort: Optional[str] = Query(
+        None,
+        regex="^(relevance|recent_relevance|fecha)$",
+        description="Con q, por defecto relevance. recent_relevance: ordena por relevancia solo las "
+        "SEARCH_RANK_WINDOW coincidencias más recientes (más rápido; total sigue contando todas)",
+    ),
 ):
-    conn = get_conn()
-    try:
+    async with connection() as conn:
         cur = conn.cursor()
         where = []
         params: list[Any] = []
 
-        if q:
-            where.append("(titulo ILIKE %s OR contenido ILIKE %s)")
-            like = f"%{q}%"
-            params.extend([like, like])
         if categoria:
             where.append("categoria = %s")
             params.append(categoria)
@@ -78,38 +137,111 @@ def list_news(
             where.append("fecha <= %s")
             params.append(datetime.strptime(date_to, "%Y-%m-%d"))
 
-        where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+        # Full-text search, or fuzzy title match when nothing matches
+        search_mode = None
+        if q:
+            search_mode = await choose_mode(cur, where, params, q)
+            where.append(search_condition(search_mode))
+            params.append(q)
 
-        # Count
-        cur.execute(f"SELECT COUNT(*) FROM noticias {where_sql}", params)
-        total = cur.fetchone()[0]
+        # Count (rollup table when possible, else cached; estimated for text search)
+        total, total_exact = None, True
+        if include_total:
+            rollup = None if q or date_to else {"fuente": fuente, "categoria": categoria, "desde": date_from}
+            total, total_exact = await count_news(cur, where, params, expensive=bool(q), rollup=rollup)
 
         # Data
-        order_sql = "ASC" if order == "asc" else "DESC"
-        cur.execute(
-            f"""
-            SELECT id, titulo, fecha, hora, resumen, contenido, categoria, autor,
-                   tags, url, fecha_extraccion, imagenes, fuente, created_at
-            FROM noticias
-            {where_sql}
-            ORDER BY fecha {order_sql} NULLS LAST, id {order_sql}
-            OFFSET %s LIMIT %s
-            """,
-            params + [skip, limit],
+        columns, build, item_model = _projection(view, fields)
+        sort = sort or "relevance"
+        if q and sort in ("relevance", "recent_relevance") and cursor is None:
+            rows = await fetch_ranked_page(
+                cur, columns, where, params, q, search_mode, limit, skip, recent_only=sort == "recent_relevance"
+            )
+            next_cursor = None
+        else:
+            rows, next_cursor = await fetch_page(cur, columns, where, params, order, limit, skip, cursor)
+        items = [build(r) for r in rows]
+
+        if q:
+            snippets = await headlines(cur, [item["id"] for item in items], q, search_mode)
+            for item in items:
+                item["snippet"] = snippets.get(item["id"])
+
+        return _list_response(
+            item_model,
+            {
+                "total": total,
+                "total_exact": total_exact,
+                "items": items,
+                "next_cursor": next_cursor,
+                "search_mode": search_mode,
+            },
         )
-        rows = cur.fetchall()
-        items = [_row_to_news(r) for r in rows]
-        return NewsListResponse(total=total, items=items)
-    finally:
-        put_conn(conn)
+
+
+@router.get("/stats", response_model=NewsStats)
+async def news_stats(
+    date_from: Optional[str] = Query(None, description="YYYY-MM-DD"),
+    date_to: Optional[str] = Query(None, description="YYYY-MM-DD"),
+):
+    async with connection() as conn:
+        cur = conn.cursor()
+        start = datetime.strptime(date_from, "%Y-%m-%d").date() if date_from else None
+        end = datetime.strptime(date_to, "%Y-%m-%d").date() if date_to else None
+        stats = await get_stats(cur, start, end)
+        return stats if VALIDATE_RESPONSES else JSONBytesResponse(stats)
+
+
+@router.get("/export")
+@uncached
+async def export_news(
+    format: str = Query("ndjson", regex="^(ndjson|csv|parquet)$"),
+    q: Optional[str] = Query(None, description="Búsqueda de texto completo"),
+    categoria: Optional[str] = Query(None),
+    fuente: Optional[str] = Query(None),
+    date_from: Optional[str] = Query(None, description="YYYY-MM-DD"),
+    date_to: Optional[str] = Query(None, description="YYYY-MM-DD"),
+    order: str = Query("asc", regex="^(asc|desc)$", description="Orden de ingesta (id)"),
+    fields: Optional[str] = Query(None, description="Columnas a exportar, separadas por comas"),
+):
+    """Exporta todas las noticias del filtro en streaming (NDJSON, CSV o Parquet), sin paginar"""
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=501, detail="Exportación Parquet no disponible (instalar pyarrow)")
+    columns = _requested_fields(fields) if fields else NEWS_COLUMNS
+
+    where = []
+    params: list[Any] = []
+    if categoria:
+        where.append("categoria = %s")
+        params.append(categoria)
+    if fuente:
+        where.append("fuente = %s")
+        params.append(fuente)
+    if date_from:
+        where.append("fecha >= %s")
+        params.append(datetime.strptime(date_from, "%Y-%m-%d"))
+    if date_to:
+        where.append("fecha <= %s")
+        params.append(datetime.strptime(date_to, "%Y-%m-%d"))
+    if q:
+        async with connection() as conn:
+            search_mode = await choose_mode(conn.cursor(), where, params, q)
+        where.append(search_condition(search_mode))
+        params.append(q)
+
+    filename = f"noticias_{datetime.now():%Y%m%d_%H%M%S}.{format}"
+    return StreamingResponse(
+        export_stream(format, columns, where, params, order),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @router.get("/{news_id}", response_model=News)
-def get_news(news_id: int):
-    conn = get_conn()
-    try:
+async def get_news(news_id: int):
+    async with connection() as conn:
         cur = conn.cursor()
-        cur.execute(
+        await cur.execute(
             """
             SELECT id, titulo, fecha, hora, resumen, contenido, categoria, autor,
                    tags, url, fecha_extraccion, imagenes, fuente, created_at
@@ -117,63 +249,54 @@ def get_news(news_id: int):
             """,
             [news_id],
         )
-        row = cur.fetchone()
+        row = await cur.fetchone()
         if not row:
             raise HTTPException(status_code=404, detail="Noticia no encontrada")
-        return _row_to_news(row)
-    finally:
-        put_conn(conn)
+        if VALIDATE_RESPONSES:
+            return _row_to_news(row)
+        return JSONBytesResponse({**dict(zip(NEWS_COLUMNS, row)), "snippet": None})
+
+
+async def _listing_response(column: str, request: Request, response: Response):
+    values, etag = await get_listing(column)
+    if etag_matches(request, etag):
+        return not_modified(etag, METADATA_MAX_AGE)
+    if VALIDATE_RESPONSES:
+        cache_headers(response, etag, METADATA_MAX_AGE)
+        return values
+    fast = JSONBytesResponse(values)
+    cache_headers(fast, etag, METADATA_MAX_AGE)
+    return fast
 
 
 @router.get("/categorias/listar", response_model=List[str])
-def list_categorias():
+@uncached
+async def list_categorias(request: Request, response: Response):
     """Obtiene la lista de todas las categorías disponibles"""
-    conn = get_conn()
-    try:
-        cur = conn.cursor()
-        cur.execute(
-            """
-            SELECT DISTINCT categoria FROM noticias 
-            WHERE categoria IS NOT NULL AND categoria != ''
-            ORDER BY categoria
-            """
-        )
-        rows = cur.fetchall()
-        return [row[0] for row in rows]
-    finally:
-        put_conn(conn)
+    return await _listing_response("categoria", request, response)
 
 
 @router.get("/fuentes/listar", response_model=List[str])
-def list_fuentes():
+@uncached
+async def list_fuentes(request: Request, response: Response):
     """Obtiene la lista de todas las fuentes disponibles"""
-    conn = get_conn()
-    try:
-        cur = conn.cursor()
-        cur.execute(
-            """
-            SELECT DISTINCT fuente FROM noticias 
-            WHERE fuente IS NOT NULL AND fuente != ''
-            ORDER BY fuente
-            """
-        )
-        rows = cur.fetchall()
-        return [row[0] for row in rows]
-    finally:
-        put_conn(conn)
+    return await _listing_response("fuente", request, response)
 
 
-@router.get("/fuentes/{fuente_name}", response_model=NewsListResponse)
-def get_news_by_fuente(
+@router.get("/fuentes/{fuente_name}", response_model=ListResponse, response_model_exclude_unset=True)
+async def get_news_by_fuente(
     fuente_name: str,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     order: str = Query("desc", regex="^(asc|desc)$"),
     fecha_desde: str = Query(None, description="Fecha desde (YYYY-MM-DD)"),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente (next_cursor); ignora skip"),
+    include_total: bool = Query(True, description="false: no calcular el total (total=null)"),
+    view: str = Query("full", regex="^(full|summary)$", description="summary: sin contenido y con resumen corto"),
+    fields: Optional[str] = Query(None, description="Columnas a devolver, separadas por comas (ej. id,titulo,fecha)"),
 ):
     """Obtiene todas las noticias de una fuente específica"""
-    conn = get_conn()
-    try:
+    async with connection() as conn:
         cur = conn.cursor()
         
         # Construir query con filtro de fecha
@@ -184,44 +307,35 @@ def get_news_by_fuente(
             where_clause += " AND fecha >= %s"
             params.append(fecha_desde)
         
-        # Count
-        cur.execute(
-            f"SELECT COUNT(*) FROM noticias WHERE {where_clause}",
-            params
-        )
-        total = cur.fetchone()[0]
+        # Count (rollup table, or cached per filter until the next ingest)
+        total = None
+        if include_total:
+            total, _ = await count_news(cur, [where_clause], params, rollup={"fuente": fuente_name, "desde": fecha_desde})
         
         # Data
-        order_sql = "ASC" if order == "asc" else "DESC"
-        cur.execute(
-            f"""
-            SELECT id, titulo, fecha, hora, resumen, contenido, categoria, autor,
-                   tags, url, fecha_extraccion, imagenes, fuente, created_at
-            FROM noticias
-            WHERE {where_clause}
-            ORDER BY fecha {order_sql} NULLS LAST, id {order_sql}
-            OFFSET %s LIMIT %s
-            """,
-            params + [skip, limit],
+        columns, build, item_model = _projection(view, fields)
+        rows, next_cursor = await fetch_page(cur, columns, [where_clause], params, order, limit, skip, cursor)
+        items = [build(r) for r in rows]
+        return _list_response(
+            item_model,
+            {"total": total, "total_exact": True, "items": items, "next_cursor": next_cursor, "search_mode": None},
         )
-        rows = cur.fetchall()
-        items = [_row_to_news(r) for r in rows]
-        return NewsListResponse(total=total, items=items)
-    finally:
-        put_conn(conn)
 
 
-@router.get("/categorias/{categoria_name}", response_model=NewsListResponse)
-def get_news_by_categoria(
+@router.get("/categorias/{categoria_name}", response_model=ListResponse, response_model_exclude_unset=True)
+async def get_news_by_categoria(
     categoria_name: str,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     order: str = Query("desc", regex="^(asc|desc)$"),
     fecha_desde: str = Query(None, description="Fecha desde (YYYY-MM-DD)"),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente (next_cursor); ignora skip"),
+    include_total: bool = Query(True, description="false: no calcular el total (total=null)"),
+    view: str = Query("full", regex="^(full|summary)$", description="summary: sin contenido y con resumen corto"),
+    fields: Optional[str] = Query(None, description="Columnas a devolver, separadas por comas (ej. id,titulo,fecha)"),
 ):
     """Obtiene todas las noticias de una categoría específica"""
-    conn = get_conn()
-    try:
+    async with connection() as conn:
         cur = conn.cursor()
         
         # Construir query con filtro de fecha
@@ -232,29 +346,17 @@ def get_news_by_categoria(
             where_clause += " AND fecha >= %s"
             params.append(fecha_desde)
         
-        # Count
-        cur.execute(
-            f"SELECT COUNT(*) FROM noticias WHERE {where_clause}",
-            params
-        )
-        total = cur.fetchone()[0]
+        # Count (rollup table, or cached per filter until the next ingest)
+        total = None
+        if include_total:
+            total, _ = await count_news(cur, [where_clause], params, rollup={"categoria": categoria_name, "desde": fecha_desde})
         
         # Data
-        order_sql = "ASC" if order == "asc" else "DESC"
-        cur.execute(
-            f"""
-            SELECT id, titulo, fecha, hora, resumen, contenido, categoria, autor,
-                   tags, url, fecha_extraccion, imagenes, fuente, created_at
-            FROM noticias
-            WHERE {where_clause}
-            ORDER BY fecha {order_sql} NULLS LAST, id {order_sql}
-            OFFSET %s LIMIT %s
-            """,
-            params + [skip, limit],
+        columns, build, item_model = _projection(view, fields)
+        rows, next_cursor = await fetch_page(cur, columns, [where_clause], params, order, limit, skip, cursor)
+        items = [build(r) for r in rows]
+        return _list_response(
+            item_model,
+            {"total": total, "total_exact": True, "items": items, "next_cursor": next_cursor, "search_mode": None},
         )
-        rows = cur.fetchall()
-        items = [_row_to_news(r) for r in rows]
-        return NewsListResponse(total=total, items=items)
-    finally:
-        put_conn(conn)
 
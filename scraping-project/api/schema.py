@@ -0,0 +1,51 @@
+import logging
+
+from .db import connection
+from .rollups import rollups_installed
+
+logger = logging.getLogger(__name__)
+
+# Columns and indexes the API queries rely on. They are created by
+# setup_database.py, never by the API: adding search_vector rewrites the
+# whole table under an ACCESS EXCLUSIVE lock, which would block readers and
+# the scrapers' inserts during every deploy. At startup the API only checks
+# that they are there and warns about what is missing.
+REQUIRED_COLUMNS = {
+    "search_vector": "full-text search (q) fails",
+}
+REQUIRED_INDEXES = {
+    "idx_noticias_fecha_id": "keyset pagination sorts instead of scanning an index",
+    "idx_noticias_fuente_fecha_id": "per-fuente pages sort instead of scanning an index",
+    "idx_noticias_categoria_fecha_id": "per-categoria pages sort instead of scanning an index",
+    "idx_noticias_search_vector": "full-text search scans the whole table",
+    "idx_noticias_titulo_trgm": "fuzzy title search scans the whole table",
+}
+
+
+async def check_schema() -> None:
+    """Log a warning for every column, index or rollup setup_database.py has not created."""
+    async with connection() as conn:
+        cur = conn.cursor()
+        await cur.execute(
+            """
+            SELECT column_name FROM information_schema.columns
+            WHERE table_name = 'noticias' AND table_schema = current_schema() AND column_name = ANY(%s)
+            """,
+            [list(REQUIRED_COLUMNS)],
+        )
+        columns = {row[0] for row in await cur.fetchall()}
+        await cur.execute(
+            "SELECT indexname FROM pg_indexes WHERE tablename = 'noticias' AND indexname = ANY(%s)",
+            [list(REQUIRED_INDEXES)],
+        )
+        indexes = {row[0] for row in await cur.fetchall()}
+        installed = await rollups_installed(cur)
+
+    for name, effect in REQUIRED_COLUMNS.items():
+        if name not in columns:
+            logger.warning("noticias.%s is missing: %s. Run setup_database.py", name, effect)
+    for name, effect in REQUIRED_INDEXES.items():
+        if name not in indexes:
+            logger.warning("Index %s is missing: %s. Run setup_database.py", name, effect)
+    if not installed:
+        logger.warning("Rollup tables are not installed: counts are computed on noticias. Run setup_database.py")
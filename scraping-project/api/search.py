@@ -0,0 +1,112 @@
+import os
+from typing import Any, Dict, List, Sequence
+
+# Full-text search over `noticias.search_vector`, a stored generated column
+# (created by setup_database.py) so it is maintained by PostgreSQL on every insert or
+# update, whatever process ingests the row.
+#
+# - q is parsed with websearch_to_tsquery ("comillas", OR, -exclusión) and
+#   matched through the GIN index and every match is ranked with ts_rank_cd
+#   (sort=relevance), so the page is consistent with `total`.
+# - sort=recent_relevance ranks only the SEARCH_RANK_WINDOW most recent
+#   matches: a term present in every article then costs the same as a rare
+#   one, but older matches beyond the window are never returned.
+# - If nothing matches, titles are matched fuzzily with pg_trgm
+#   (word_similarity), which tolerates typos and missing accents.
+# - Snippets are built with ts_headline only for the rows of the page.
+
+TS_CONFIG = "spanish"
+
+FTS_CONDITION = f"search_vector @@ websearch_to_tsquery('{TS_CONFIG}', %s)"
+FUZZY_CONDITION = "%s <%% titulo"
+
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=30, MinWords=10"
+
+SEARCH_MODES = ("fulltext", "fuzzy")
+
+SEARCH_RANK_WINDOW = int(os.getenv("SEARCH_RANK_WINDOW", "2000"))
+
+
+def search_condition(mode: str) -> str:
+    return FTS_CONDITION if mode == "fulltext" else FUZZY_CONDITION
+
+
+async def fetch_ranked_page(
+    cur,
+    columns: Sequence[str],
+    where: Sequence[str],
+    params: Sequence[Any],
+    q: str,
+    mode: str,
+    limit: int,
+    skip: int = 0,
+    recent_only: bool = False,
+) -> List[tuple]:
+    """
+    One page ordered by relevance. `where`/`params` must already include the
+    search condition for `mode`. With recent_only, only the
+    SEARCH_RANK_WINDOW most recent matches are ranked (sort=recent_relevance).
+    """
+    if mode == "fulltext":
+        rank_sql = f"ts_rank_cd(search_vector, websearch_to_tsquery('{TS_CONFIG}', %s))"
+    else:
+        rank_sql = "word_similarity(%s, titulo)"
+    if recent_only:
+        source_sql = f"""(
+            SELECT * FROM noticias
+            WHERE {' AND '.join(where)}
+            ORDER BY fecha DESC NULLS LAST, id DESC
+            LIMIT %s
+        ) candidates"""
+        source_params = list(params) + [max(SEARCH_RANK_WINDOW, skip + limit)]
+    else:
+        source_sql = f"noticias WHERE {' AND '.join(where)}"
+        source_params = list(params)
+    await cur.execute(
+        f"""
+        SELECT {', '.join(columns)}
+        FROM {source_sql}
+        ORDER BY {rank_sql} DESC, fecha DESC NULLS LAST, id DESC
+        OFFSET %s LIMIT %s
+        """,
+        source_params + [q, skip, limit],
+    )
+    return await cur.fetchall()
+
+
+async def headlines(cur, ids: Sequence[int], q: str, mode: str) -> Dict[int, str]:
+    """Highlighted fragments (<mark>) for the given rows."""
+    if not ids:
+        return {}
+    if mode == "fulltext":
+        query_sql = f"websearch_to_tsquery('{TS_CONFIG}', %s)"
+        source_sql = "COALESCE(contenido, resumen, titulo, '')"
+    else:
+        # Titles matched by trigram: highlight the words of q in the title
+        query_sql = f"plainto_tsquery('{TS_CONFIG}', %s)"
+        source_sql = "COALESCE(titulo, '')"
+    await cur.execute(
+        f"""
+        SELECT id, ts_headline('{TS_CONFIG}', {source_sql}, {query_sql}, %s)
+        FROM noticias
+        WHERE id = ANY(%s)
+        """,
+        [q, HEADLINE_OPTIONS, list(ids)],
+    )
+    return dict(await cur.fetchall())
+
+
+async def has_fulltext_match(cur, where: Sequence[str], params: Sequence[Any]) -> bool:
+    await cur.execute(f"SELECT EXISTS (SELECT 1 FROM noticias WHERE {' AND '.join(where)})", list(params))
+    return (await cur.fetchone())[0]
+
+
+async def choose_mode(cur, where: Sequence[str], params: Sequence[Any], q: str) -> str:
+    """
+    'fulltext' when q matches something with the other filters applied,
+    otherwise 'fuzzy' (only if the pg_trgm extension is installed).
+    """
+    if await has_fulltext_match(cur, list(where) + [FTS_CONDITION], list(params) + [q]):
+        return "fulltext"
+    await cur.execute("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+    return "fuzzy" if (await cur.fetchone())[0] else "fulltext"
@@ -0,0 +1,42 @@
+import json
+import os
+from datetime import date, datetime, time
+from typing import Any
+
+from fastapi import Response
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+# Fast response path: rows read from PostgreSQL are already typed, so they are
+# turned into plain dicts and serialized straight to bytes (orjson when
+# installed) instead of building pydantic models that FastAPI validates and
+# serializes again. The output is the same JSON the models produce.
+#
+# API_VALIDATE_RESPONSES=1 goes back to the pydantic models + response_model
+# validation, e.g. while debugging a schema change.
+
+VALIDATE_RESPONSES = os.getenv("API_VALIDATE_RESPONSES", "").lower() in ("1", "true", "yes")
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(payload: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default)
+    return json.dumps(payload, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class JSONBytesResponse(Response):
+    """JSON response rendered with dumps(); accepts pre-serialized bytes."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return content if isinstance(content, bytes) else dumps(content)
@@ -0,0 +1,155 @@
+import os
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from news_rollups import ROLLUP_TABLE
+
+from .counts import data_version
+from .rollups import rollups_installed
+
+# Aggregates for the reports page, computed in PostgreSQL.
+#
+# Every breakdown (fuente, categoria, month, weekday and the grand total) comes
+# from one GROUPING SETS query over the daily rollup table (news_rollups), or
+# over `noticias` itself when the rollups are not installed. The result is
+# cached per filter and stamped with the data version (see api/counts.py), so
+# it is recomputed after the next ingest, or after STATS_CACHE_TTL seconds.
+
+STATS_CACHE_TTL = int(os.getenv("STATS_CACHE_TTL", "600"))
+STATS_CACHE_SIZE = 64
+RECENT_DAYS = 30
+TOP_RECENT = 10
+
+# ISO day of week (1 = lunes)
+DIAS_SEMANA = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo"]
+
+_cache: Dict[Tuple[Any, ...], Tuple[Tuple[int, int], Dict[str, Any], float]] = {}
+_lock = threading.Lock()
+
+
+def _where_sql(where: Sequence[str]) -> str:
+    return f"WHERE {' AND '.join(where)}" if where else ""
+
+
+def _counts(rows) -> list:
+    return [{"nombre": name, "total": total} for name, total in sorted(rows, key=lambda r: (-r[1], r[0]))]
+
+
+async def _grouped_source(cur, date_from: Optional[date], date_to: Optional[date]) -> Tuple[str, list]:
+    """FROM clause yielding (fuente, categoria, dia, n, recent) and its params."""
+    if await rollups_installed(cur):
+        source, day, count = ROLLUP_TABLE, "dia", "total"
+    else:
+        source, day, count = "noticias", "fecha::date", "1"
+    where, params = [], []
+    if date_from:
+        where.append(f"{day} >= %s")
+        params.append(date_from)
+    if date_to:
+        where.append(f"{day} <= %s")
+        params.append(date_to)
+    return (
+        f"""
+        (
+            SELECT fuente, categoria, {day} AS dia, {count} AS n,
+                   CASE WHEN {day} > current_date - {RECENT_DAYS} THEN {count} ELSE 0 END AS recent
+            FROM {source}
+            {_where_sql(where)}
+        ) g
+        """,
+        params,
+    )
+
+
+async def compute_stats(cur, date_from: Optional[date] = None, date_to: Optional[date] = None) -> Dict[str, Any]:
+    """Breakdowns for the news with fecha between date_from and date_to (whole days)."""
+    source_sql, params = await _grouped_source(cur, date_from, date_to)
+    await cur.execute(
+        f"""
+        SELECT GROUPING(fuente, categoria, mes, dia_semana),
+               fuente, categoria, mes, dia_semana,
+               SUM(n)::bigint,
+               SUM(recent)::bigint
+        FROM (
+            SELECT fuente, categoria, n, recent,
+                   to_char(dia, 'YYYY-MM') AS mes,
+                   EXTRACT(ISODOW FROM dia)::int AS dia_semana
+            FROM {source_sql}
+        ) n
+        GROUP BY GROUPING SETS ((fuente), (categoria), (mes), (dia_semana), ())
+        """,
+        params,
+    )
+    # GROUPING() bitmask: the bit of every column *not* in the set is 1
+    by_set: Dict[int, list] = {}
+    for grouping, fuente, categoria, mes, dia, total, recent in await cur.fetchall():
+        if not total and grouping != 0b1111:
+            # Rollup rows left at 0 after deletes
+            continue
+        by_set.setdefault(grouping, []).append((fuente, categoria, mes, dia, total, recent))
+
+    _, _, _, _, total, recent = by_set.get(0b1111, [(None, None, None, None, 0, 0)])[0]
+    total, recent = total or 0, recent or 0
+    fuentes = [(r[0], r[4]) for r in by_set.get(0b0111, []) if r[0] is not None]
+    categorias = [(r[1], r[4]) for r in by_set.get(0b1011, []) if r[1] is not None]
+    meses = sorted((r[2], r[4]) for r in by_set.get(0b1101, []) if r[2] is not None)
+    dias = {r[3]: r[4] for r in by_set.get(0b1110, []) if r[3] is not None}
+
+    recent_where, recent_params = ["titulo IS NOT NULL", "titulo <> ''"], []
+    if date_from:
+        recent_where.append("fecha >= %s")
+        recent_params.append(date_from)
+    if date_to:
+        recent_where.append("fecha < %s::date + 1")
+        recent_params.append(date_to)
+    # Latest ingested (serial id): a backward primary key scan instead of a sort
+    await cur.execute(
+        f"""
+        SELECT id, titulo, COALESCE(created_at, fecha_extraccion)
+        FROM noticias
+        {_where_sql(recent_where)}
+        ORDER BY id DESC
+        LIMIT %s
+        """,
+        recent_params + [TOP_RECENT],
+    )
+    recientes = [{"id": i, "titulo": t, "created_at": c} for i, t, c in await cur.fetchall()]
+
+    return {
+        "total": total,
+        "total_fuentes": len(fuentes),
+        "total_categorias": len(categorias),
+        "promedio_diario": round(recent / RECENT_DAYS, 1),
+        "por_fuente": _counts(fuentes),
+        "por_categoria": _counts(categorias),
+        "por_mes": [{"mes": mes, "total": n} for mes, n in meses],
+        "por_dia_semana": [{"dia": name, "total": dias.get(i + 1, 0)} for i, name in enumerate(DIAS_SEMANA)],
+        "recientes": recientes,
+        "generated_at": datetime.now(),
+    }
+
+
+def invalidate_stats() -> None:
+    with _lock:
+        _cache.clear()
+
+
+async def get_stats(cur, date_from: Optional[date] = None, date_to: Optional[date] = None) -> Dict[str, Any]:
+    """compute_stats, cached until the data version changes."""
+    key = (date_from, date_to)
+    version = await data_version(cur)
+    with _lock:
+        entry: Optional[Tuple[Tuple[int, int], Dict[str, Any], float]] = _cache.get(key)
+    if entry is not None:
+        cached_version, stats, stored_at = entry
+        if cached_version == version and time.monotonic() - stored_at <= STATS_CACHE_TTL:
+            return stats
+
+    stats = await compute_stats(cur, date_from, date_to)
+    with _lock:
+        if len(_cache) >= STATS_CACHE_SIZE:
+            _cache.clear()
+        _cache[key] = (version, stats, time.monotonic())
+    return stats
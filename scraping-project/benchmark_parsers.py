@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark de parseo HTML: BeautifulSoup ('html.parser', lo de antes) frente
+al backend lxml de spiders/html_parser.py (lo de ahora).
+
+Mide por artículo el tiempo de parseo y el de aplicar los selectores CSS
+habituales de los scrapers. Los documentos salen de, por orden:
+  1. rutas de ficheros HTML o URLs pasadas como argumentos
+  2. la caché HTTP en disco (data/http_cache), si existe
+  3. un artículo de ejemplo generado en memoria
+
+Uso:
+    python benchmark_parsers.py [--repeat N] [--limit N] [fichero.html | URL ...]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from spiders.html_parser import parse_html
+from spiders.http_cache import DEFAULT_CACHE_DIR, HttpCache
+
+# Selectores representativos de los scrapers locales (título, fecha,
+# contenido, categoría, autor, etiquetas, imágenes)
+BENCHMARK_SELECTORS = [
+    'h1.entry-title', 'h1.post-title', 'article h1', 'h1',
+    'meta[property="article:published_time"]', 'time[datetime]', '.entry-date', '.post-date',
+    '.entry-content', '.post-content', '.article-content', '.content',
+    'meta[name="description"]', '.entry-summary', '.excerpt',
+    '.cat-links a', '[rel="category"]', '.breadcrumb a',
+    '.author-name', '.entry-author', '[rel="author"]',
+    '.tags-links a', '[rel="tag"]',
+    '.entry-content img', 'article img',
+]
+
+BACKENDS = ['bs4', 'lxml']
+
+
+def sample_article():
+    """Artículo WordPress sintético para cuando no hay HTML real a mano"""
+    paragraphs = ''.join(
+        f'<p>Párrafo {i} de la noticia con <a href="/tag/puno-{i}">enlace</a> y <b>texto</b>.</p>'
+        for i in range(60)
+    )
+    related = ''.join(
+        f'<li><a href="https://losandes.com.pe/region/2024/05/{i:02d}/nota-{i}/">Nota {i}</a></li>'
+        for i in range(80)
+    )
+    return (
+        '<html><head><meta charset="utf-8"><title>Noticia de prueba</title>'
+        '<meta name="description" content="Resumen de la noticia">'
+        '<meta property="article:published_time" content="2024-05-01T10:20:00-05:00">'
+        '<script>var config = {};</script><style>body {}</style></head><body>'
+        f'<nav><ul>{related}</ul></nav>'
+        '<article><h1 class="entry-title">Noticia de prueba</h1>'
+        '<time datetime="2024-05-01T10:20:00">1 de mayo</time>'
+        '<span class="cat-links"><a rel="category" href="/categoria/region">Región</a></span>'
+        '<span class="entry-author"><a rel="author" href="/autor/ana">Ana</a></span>'
+        f'<div class="entry-content">{paragraphs}<img src="/foto.jpg" width="800" height="600"></div>'
+        '<div class="tags-links"><a rel="tag" href="/tag/puno">Puno</a></div>'
+        f'</article><aside><ul>{related}</ul></aside></body></html>'
+    ).encode('utf-8')
+
+
+def load_documents(sources, limit):
+    documents = []
+    if sources:
+        from spiders.fetcher import AsyncFetcher
+        with AsyncFetcher(delay=0) as fetcher:
+            for source in sources:
+                if source.startswith('http'):
+                    response = fetcher.get(source)
+                    if response:
+                        documents.append(response.content)
+                else:
+                    with open(source, 'rb') as f:
+                        documents.append(f.read())
+        return documents[:limit]
+
+    index = os.path.join(DEFAULT_CACHE_DIR, 'index.sqlite3')
+    if os.path.exists(index):
+        cache = HttpCache(DEFAULT_CACHE_DIR, offline=True)
+        rows = cache.conn.execute(
+            "SELECT url FROM responses WHERE headers LIKE '%text/html%' LIMIT ?", (limit,)
+        ).fetchall()
+        for (url,) in rows:
+            cached = cache.lookup(url)
+            if cached:
+                documents.append(cached.body)
+        cache.close()
+        if documents:
+            return documents
+
+    return [sample_article()]
+
+
+def run_backend(backend, documents, repeat):
+    """Tiempo medio (ms) de parseo y de selección por documento"""
+    parse_total = select_total = 0.0
+    for _ in range(repeat):
+        for content in documents:
+            start = time.perf_counter()
+            doc = parse_html(content, backend=backend)
+            parsed = time.perf_counter()
+            for selector in BENCHMARK_SELECTORS:
+                for element in doc.select(selector):
+                    element.get_text(strip=True)
+            doc.find_all('a', href=True)
+            selected = time.perf_counter()
+            parse_total += parsed - start
+            select_total += selected - parsed
+    runs = repeat * len(documents)
+    return parse_total * 1000 / runs, select_total * 1000 / runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de backends de parseo HTML')
+    parser.add_argument('sources', nargs='*', help='Ficheros HTML o URLs a medir')
+    parser.add_argument('--repeat', type=int, default=20, help='Repeticiones por documento')
+    parser.add_argument('--limit', type=int, default=50, help='Máximo de documentos')
+    args = parser.parse_args()
+
+    documents = load_documents(args.sources, args.limit)
+    print(f"📄 {len(documents)} documentos, {args.repeat} repeticiones, {len(BENCHMARK_SELECTORS)} selectores")
+    print(f"{'backend':<8} {'parseo ms':>10} {'selección ms':>13} {'total ms':>9}")
+
+    results = {}
+    for backend in BACKENDS:
+        parse_ms, select_ms = run_backend(backend, documents, args.repeat)
+        results[backend] = parse_ms + select_ms
+        print(f"{backend:<8} {parse_ms:>10.3f} {select_ms:>13.3f} {parse_ms + select_ms:>9.3f}")
+
+    print(f"⚡ lxml es {results['bs4'] / results['lxml']:.1f}x más rápido por artículo")
+
+
+if __name__ == "__main__":
+    main()
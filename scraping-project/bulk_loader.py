@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Carga masiva de noticias en PostgreSQL
+Los registros (CSV, JSON o NDJSON) se envían en streaming con COPY FROM STDIN
+a una tabla temporal y se fusionan con `noticias` en una sola sentencia
+INSERT ... SELECT ... ON CONFLICT (url), dentro de una transacción.
+
+Así migrar miles de artículos son un par de viajes a la base de datos en vez
+de un SELECT + INSERT + COMMIT por fila.
+
+Cada fusión que cambia filas incrementa también, en la misma transacción, la
+versión de los datos (tabla `noticias_version`, ver install_data_version):
+la API la usa como clave de sus cachés de listados, conteos y estadísticas.
+"""
+
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+
+from url_canon import canonical_url
+
+logger = logging.getLogger(__name__)
+
+# Columnas de `noticias` que puede aportar un scraper
+NOTICIAS_COLUMNS = [
+    'titulo', 'fecha', 'hora', 'resumen', 'contenido', 'categoria', 'autor',
+    'tags', 'url', 'fecha_extraccion', 'imagenes', 'fuente', 'created_at',
+    # Solo en la tabla que crea pipelines/postgres_pipeline.py
+    'caracteres_contenido', 'palabras_contenido',
+]
+
+TIMESTAMP_COLUMNS = {'fecha', 'fecha_extraccion', 'created_at'}
+INTEGER_COLUMNS = {'caracteres_contenido', 'palabras_contenido'}
+
+DATE_FORMATS = ['%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d', '%d/%m/%Y']
+TIME_FORMATS = ['%H:%M:%S', '%H:%M']
+
+STAGING_TABLE = 'noticias_staging'
+
+ON_CONFLICT_ACTIONS = ('nothing', 'update')
+
+# Una sola fila con la versión de los datos de `noticias`
+DATA_VERSION_TABLE = 'noticias_version'
+
+DATA_VERSION_STATEMENTS = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {DATA_VERSION_TABLE} (
+        id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+        version BIGINT NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    f"INSERT INTO {DATA_VERSION_TABLE} DEFAULT VALUES ON CONFLICT DO NOTHING",
+]
+
+DATA_VERSION_INSTALLED_SQL = "SELECT to_regclass(%s) IS NOT NULL"
+
+BUMP_DATA_VERSION_SQL = f"UPDATE {DATA_VERSION_TABLE} SET version = version + 1, updated_at = CURRENT_TIMESTAMP"
+
+
+def read_csv_rows(csv_file):
+    """Filas de un CSV como diccionarios, una a una"""
+    with open(csv_file, newline='', encoding='utf-8-sig') as f:
+        yield from csv.DictReader(f)
+
+
+def read_json_rows(json_file):
+    with open(json_file, encoding='utf-8') as f:
+        yield from json.load(f)
+
+
+def read_jsonl_rows(jsonl_file):
+    with open(jsonl_file, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_rows(path):
+    """Lector según la extensión del fichero (.csv, .json o .jsonl)"""
+    if path.endswith('.csv'):
+        return read_csv_rows(path)
+    if path.endswith('.jsonl'):
+        return read_jsonl_rows(path)
+    return read_json_rows(path)
+
+
+def _normalize_timestamp(value):
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    value = str(value).strip()
+    try:
+        # ISO 8601 con zona horaria u otros formatos que entiende fromisoformat
+        return datetime.fromisoformat(value).strftime('%Y-%m-%d %H:%M:%S')
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).strftime('%Y-%m-%d %H:%M:%S')
+        except ValueError:
+            continue
+    return None
+
+
+def _normalize_time(value):
+    value = str(value).strip()
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).strftime('%H:%M:%S')
+        except ValueError:
+            continue
+    return None
+
+
+def _normalize_integer(value):
+    try:
+        return str(int(float(value)))
+    except (TypeError, ValueError):
+        return None
+
+
+def _normalize(column, value):
+    """
+    Valor listo para COPY: las fechas/horas que PostgreSQL no aceptaría
+    quedan en NULL en vez de abortar la carga completa.
+    """
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    if isinstance(value, list):
+        value = ', '.join(str(v) for v in value)
+    if column in TIMESTAMP_COLUMNS:
+        return _normalize_timestamp(value) if str(value).strip() else None
+    if column == 'hora':
+        return _normalize_time(value) if str(value).strip() else None
+    if column in INTEGER_COLUMNS:
+        return _normalize_integer(value)
+    if column == 'url':
+        # Forma canónica: las variantes de una noticia chocan en el índice único
+        return canonical_url(value)
+    value = str(value)
+    return value if value.strip() else None
+
+
+class _CopyStream(io.TextIOBase):
+    """Fichero de solo lectura que genera CSV bajo demanda para copy_expert"""
+
+    def __init__(self, lines):
+        self._lines = lines
+        self._buffer = ''
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            try:
+                self._buffer += next(self._lines)
+            except StopIteration:
+                break
+        if size < 0:
+            chunk, self._buffer = self._buffer, ''
+        else:
+            chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+
+def _table_columns(cursor, table='noticias'):
+    """Columnas existentes de la tabla y su longitud máxima (VARCHAR(n))"""
+    cursor.execute(
+        """
+        SELECT column_name, character_maximum_length
+        FROM information_schema.columns
+        WHERE table_name = %s AND table_schema = current_schema()
+        """,
+        (table,),
+    )
+    return dict(cursor.fetchall())
+
+
+def data_version_installed(cursor):
+    cursor.execute(DATA_VERSION_INSTALLED_SQL, (DATA_VERSION_TABLE,))
+    return bool(cursor.fetchone()[0])
+
+
+def install_data_version(conn):
+    """Crea la tabla de versión de los datos si falta"""
+    cursor = conn.cursor()
+    try:
+        for statement in DATA_VERSION_STATEMENTS:
+            cursor.execute(statement)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+class BulkLoader:
+    """
+    Carga de lotes de noticias en una conexión psycopg2.
+
+        loader = BulkLoader(conn, default_fuente='Los Andes')
+        inserted, skipped = loader.load(read_rows('data/losandes/losandes_x.csv'))
+
+    on_conflict='nothing' conserva las noticias ya guardadas (mismo
+    comportamiento que la comprobación de duplicados por URL);
+    on_conflict='update' las sobrescribe con los datos nuevos.
+    """
+
+    def __init__(self, conn, default_fuente=None, on_conflict='nothing'):
+        if on_conflict not in ON_CONFLICT_ACTIONS:
+            raise ValueError(f"on_conflict debe ser uno de {ON_CONFLICT_ACTIONS}")
+        self.conn = conn
+        self.default_fuente = default_fuente
+        self.on_conflict = on_conflict
+        # ¿Existe DATA_VERSION_TABLE? (se comprueba en la primera fusión)
+        self._versioned = None
+
+    def _csv_lines(self, rows, columns, counters):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        for row in rows:
+            counters['read'] += 1
+            values = {column: _normalize(column, row.get(column)) for column in columns}
+            if not values.get('url'):
+                counters['without_url'] += 1
+                continue
+            if not values.get('fuente') and 'fuente' in values:
+                values['fuente'] = self.default_fuente
+            if not values.get('created_at') and 'created_at' in values:
+                values['created_at'] = now
+            # NULL se representa como campo vacío sin comillas en COPY csv
+            writer.writerow(['' if values[c] is None else values[c] for c in columns])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    def _merge_sql(self, columns, lengths):
+        targets = ', '.join(columns)
+        expressions = []
+        for column in columns:
+            if column in TIMESTAMP_COLUMNS:
+                expressions.append(f"{column}::timestamp")
+            elif column == 'hora':
+                expressions.append("hora::time")
+            elif column in INTEGER_COLUMNS:
+                expressions.append(f"{column}::integer")
+            elif lengths.get(column):
+                expressions.append(f"left({column}, {lengths[column]})")
+            else:
+                expressions.append(column)
+
+        if self.on_conflict == 'update':
+            updates = ', '.join(f"{c} = EXCLUDED.{c}" for c in columns if c not in ('url', 'created_at'))
+            conflict = f"DO UPDATE SET {updates}"
+        else:
+            conflict = "DO NOTHING"
+
+        # DISTINCT ON: una URL repetida en el lote no puede fusionarse dos veces
+        return f"""
+            WITH merged AS (
+                INSERT INTO noticias ({targets})
+                SELECT DISTINCT ON (url) {', '.join(expressions)}
+                FROM {STAGING_TABLE}
+                ORDER BY url
+                ON CONFLICT (url) {conflict}
+                RETURNING (xmax = 0) AS inserted
+            )
+            SELECT count(*) FILTER (WHERE inserted), count(*) FROM merged
+        """
+
+    def load(self, rows):
+        """
+        Carga los registros en una sola transacción.
+        Devuelve (nuevos, omitidos); con on_conflict='update' los
+        actualizados no cuentan como omitidos.
+        """
+        counters = {'read': 0, 'without_url': 0}
+        cursor = self.conn.cursor()
+        try:
+            lengths = _table_columns(cursor)
+            columns = [c for c in NOTICIAS_COLUMNS if c in lengths] if lengths else NOTICIAS_COLUMNS
+
+            cursor.execute(
+                f"CREATE TEMP TABLE {STAGING_TABLE} ("
+                + ', '.join(f"{c} TEXT" for c in columns)
+                + ") ON COMMIT DROP"
+            )
+            cursor.copy_expert(
+                f"COPY {STAGING_TABLE} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+                _CopyStream(self._csv_lines(rows, columns, counters)),
+            )
+            cursor.execute(self._merge_sql(columns, lengths))
+            inserted, merged = cursor.fetchone()
+            if merged:
+                if self._versioned is None:
+                    self._versioned = data_version_installed(cursor)
+                if self._versioned:
+                    # Justo antes del COMMIT: el bloqueo de la fila dura lo mínimo
+                    cursor.execute(BUMP_DATA_VERSION_SQL)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+        updated = merged - inserted
+        skipped = counters['read'] - inserted - updated
+        logger.info(
+            f"📥 Carga masiva: {counters['read']} leídos, {inserted} nuevos, "
+            f"{updated} actualizados, {skipped} omitidos ({counters['without_url']} sin URL)"
+        )
+        return inserted, skipped
+
+
+def bulk_load_file(conn, path, default_fuente=None, on_conflict='nothing'):
+    """Atajo: carga un fichero CSV/JSON/NDJSON completo"""
+    return BulkLoader(conn, default_fuente=default_fuente, on_conflict=on_conflict).load(read_rows(path))
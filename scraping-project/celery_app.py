@@ -36,11 +36,18 @@ celery_app.conf.update(
     task_max_retries=CELERY_TASK_MAX_RETRIES,
 )
 
-# Configurar rutas de tareas
+# Configurar rutas de tareas (por nombre de tarea: las tareas se registran con
+# name='...', sin el módulo)
 celery_app.conf.task_routes = {
-    'celery_tasks.scraping_tasks.*': {'queue': 'scraping'},
-    'celery_tasks.migration_tasks.*': {'queue': 'migration'},
-    'celery_tasks.cleanup_tasks.*': {'queue': 'cleanup'},
+    'scrape_*': {'queue': 'scraping'},
+    'summarize_scraping': {'queue': 'scraping'},
+    'check_duplicates': {'queue': 'scraping'},
+    'migrate_*': {'queue': 'migration'},
+    'summarize_migration': {'queue': 'migration'},
+    'cleanup_*': {'queue': 'cleanup'},
+    'optimize_database': {'queue': 'cleanup'},
+    'refresh_news_stats': {'queue': 'cleanup'},
+    'database_health_check': {'queue': 'cleanup'},
 }
 
 # Configurar colas
@@ -63,7 +70,7 @@ celery_app.conf.task_queues = {
 # Configurar tareas periódicas
 celery_app.conf.beat_schedule = {
     'scrape-all-sources': {
-        'task': 'celery_tasks.scraping_tasks.scrape_all_sources',
+        'task': 'scrape_all_sources',
         'schedule': 21600.0,  # 6 horas en segundos
         'options': {'queue': 'scraping'}
     },
@@ -16,6 +16,8 @@ from celery_app import celery_app
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.redis_config import DATABASE_URL
+from news_dedup import UNIQUE_URL_INDEX, delete_duplicates, unique_url_index_exists
+from news_rollups import noticias_por, rollups_installed, total_noticias
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -92,55 +94,24 @@ def cleanup_duplicates(self):
         conn = psycopg2.connect(DATABASE_URL)
         cursor = conn.cursor()
         
-        # Encontrar duplicados por URL
-        cursor.execute("""
-            SELECT url, COUNT(*) as count
-            FROM noticias 
-            GROUP BY url 
-            HAVING COUNT(*) > 1
-            ORDER BY count DESC
-        """)
+        # Un solo DELETE con row_number() por URL normalizada: se conserva
+        # la noticia más reciente de cada grupo y se garantiza el índice único
+        had_unique_index = unique_url_index_exists(cursor)
+        deleted_count = delete_duplicates(conn)
         
-        duplicates = cursor.fetchall()
-        
-        if duplicates:
-            deleted_count = 0
-            
-            for url, count in duplicates:
-                # Mantener solo el registro más reciente
-                cursor.execute("""
-                    DELETE FROM noticias 
-                    WHERE url = %s 
-                    AND id NOT IN (
-                        SELECT id FROM noticias 
-                        WHERE url = %s 
-                        ORDER BY created_at DESC 
-                        LIMIT 1
-                    )
-                """, (url, url))
-                
-                deleted_count += cursor.rowcount
-            
-            conn.commit()
-            
+        if deleted_count:
             logger.info(f"✅ Eliminados {deleted_count} duplicados")
-            
-            return {
-                'status': 'completed',
-                'duplicates_found': len(duplicates),
-                'deleted_count': deleted_count,
-                'timestamp': datetime.now().isoformat()
-            }
         else:
             logger.info("ℹ️ No se encontraron duplicados")
-            
-            return {
-                'status': 'completed',
-                'duplicates_found': 0,
-                'deleted_count': 0,
-                'message': 'No se encontraron duplicados',
-                'timestamp': datetime.now().isoformat()
-            }
+        if not had_unique_index:
+            logger.info(f"🔒 Índice único {UNIQUE_URL_INDEX} creado sobre noticias(url)")
+        
+        return {
+            'status': 'completed',
+            'deleted_count': deleted_count,
+            'unique_index_created': not had_unique_index,
+            'timestamp': datetime.now().isoformat()
+        }
             
     except Exception as e:
         logger.error(f"❌ Error en limpieza de duplicados: {e}")
@@ -206,6 +177,42 @@ def optimize_database(self):
         if 'conn' in locals():
             conn.close()
 
+@celery_app.task(bind=True, name='refresh_news_stats')
+def refresh_news_stats(self):
+    """
+    Tarea para refrescar las estadísticas de `noticias` tras una ingesta
+    (ANALYZE: los totales estimados de la API y los planes de consulta
+    dependen de ellas)
+    """
+    logger.info("📊 Refrescando estadísticas de noticias")
+    
+    try:
+        conn = psycopg2.connect(DATABASE_URL)
+        cursor = conn.cursor()
+        
+        cursor.execute("ANALYZE noticias;")
+        conn.commit()
+        
+        total = total_noticias(cursor)
+        logger.info(f"✅ Estadísticas actualizadas ({total} noticias)")
+        
+        return {
+            'status': 'completed',
+            'total_records': total,
+            'timestamp': datetime.now().isoformat()
+        }
+        
+    except Exception as e:
+        logger.error(f"❌ Error refrescando estadísticas: {e}")
+        return {
+            'status': 'failed',
+            'error': str(e),
+            'timestamp': datetime.now().isoformat()
+        }
+    finally:
+        if 'conn' in locals():
+            conn.close()
+
 @celery_app.task(bind=True, name='database_health_check')
 def database_health_check(self):
     """
@@ -224,24 +231,24 @@ def database_health_check(self):
         cursor.execute("SELECT 1")
         health_info['connection'] = 'ok'
         
-        # Contar registros totales
-        cursor.execute("SELECT COUNT(*) FROM noticias")
-        health_info['total_records'] = cursor.fetchone()[0]
-        
-        # Contar por fuente
-        cursor.execute("SELECT fuente, COUNT(*) FROM noticias GROUP BY fuente")
-        health_info['records_by_source'] = dict(cursor.fetchall())
+        # Contar registros totales y por fuente (conteos diarios precalculados)
+        health_info['rollups_installed'] = rollups_installed(cursor)
+        health_info['total_records'] = total_noticias(cursor)
+        health_info['records_by_source'] = dict(noticias_por(cursor, 'fuente'))
         
-        # Verificar duplicados
-        cursor.execute("""
-            SELECT COUNT(*) FROM (
-                SELECT url, COUNT(*) 
-                FROM noticias 
-                GROUP BY url 
-                HAVING COUNT(*) > 1
-            ) as duplicates
-        """)
-        health_info['duplicate_count'] = cursor.fetchone()[0]
+        # Verificar duplicados: con el índice único sobre url no puede haberlos
+        if unique_url_index_exists(cursor):
+            health_info['duplicate_count'] = 0
+        else:
+            cursor.execute("""
+                SELECT COUNT(*) FROM (
+                    SELECT url, COUNT(*)
+                    FROM noticias
+                    GROUP BY url
+                    HAVING COUNT(*) > 1
+                ) as duplicates
+            """)
+            health_info['duplicate_count'] = cursor.fetchone()[0]
         
         # Verificar registros recientes
         cursor.execute("""
@@ -8,14 +8,15 @@ import os
 import sys
 from datetime import datetime
 
-import pandas as pd
 import psycopg2
+from celery import chord, group
 
 from celery_app import celery_app
 
 # Agregar el directorio raíz al path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from bulk_loader import BulkLoader, read_csv_rows, read_json_rows
 from config.redis_config import (DATABASE_URL, DUPLICATE_CHECK_ENABLED,
                                  DUPLICATE_CHECK_FIELD)
 
@@ -23,16 +24,10 @@ from config.redis_config import (DATABASE_URL, DUPLICATE_CHECK_ENABLED,
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@celery_app.task(bind=True, name='migrate_source_to_db')
-def migrate_source_to_db(self, source_key, csv_file, json_file):
-    """
-    Tarea para migrar datos de una fuente específica a PostgreSQL
-    """
-    logger.info(f"🗄️ Migrando {source_key} a PostgreSQL")
-    
+def migrate_files(source_key, csv_file, json_file):
+    """Migra los ficheros CSV/JSON de una fuente; devuelve los registros nuevos"""
+    conn = psycopg2.connect(DATABASE_URL)
     try:
-        # Conectar a la base de datos
-        conn = psycopg2.connect(DATABASE_URL)
         cursor = conn.cursor()
         
         # Crear tabla si no existe
@@ -40,17 +35,25 @@ def migrate_source_to_db(self, source_key, csv_file, json_file):
         
         total_migrated = 0
         
-        # Migrar desde CSV
+        # El CSV y el JSON de un rastreo tienen los mismos artículos: basta con uno
         if csv_file and os.path.exists(csv_file):
-            migrated_csv = migrate_from_csv(cursor, conn, csv_file, source_key)
-            total_migrated += migrated_csv
-        
-        # Migrar desde JSON
-        if json_file and os.path.exists(json_file):
-            migrated_json = migrate_from_json(cursor, conn, json_file, source_key)
-            total_migrated += migrated_json
+            total_migrated += migrate_from_csv(cursor, conn, csv_file, source_key)
+        elif json_file and os.path.exists(json_file):
+            total_migrated += migrate_from_json(cursor, conn, json_file, source_key)
         
+        return total_migrated
+    finally:
         conn.close()
+
+@celery_app.task(bind=True, name='migrate_source_to_db', max_retries=3)
+def migrate_source_to_db(self, source_key, csv_file, json_file):
+    """
+    Tarea para migrar datos de una fuente específica a PostgreSQL
+    """
+    logger.info(f"🗄️ Migrando {source_key} a PostgreSQL")
+    
+    try:
+        total_migrated = migrate_files(source_key, csv_file, json_file)
         
         logger.info(f"✅ {source_key}: {total_migrated} registros migrados")
         
@@ -63,20 +66,68 @@ def migrate_source_to_db(self, source_key, csv_file, json_file):
         
     except Exception as e:
         logger.error(f"❌ Error migrando {source_key}: {e}")
-        raise self.retry(exc=e, countdown=60, max_retries=3)
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e, countdown=60)
+        # Sin más reintentos: se devuelve el fallo (las tareas de un chord
+        # que lanzan excepción impedirían el resumen del resto)
+        return {
+            'status': 'failed',
+            'source': source_key,
+            'migrated_count': 0,
+            'error': str(e),
+            'timestamp': datetime.now().isoformat()
+        }
+
+@celery_app.task(bind=True, name='migrate_scraped_source', max_retries=3)
+def migrate_scraped_source(self, scrape_result, source_key):
+    """
+    Segundo paso de la cadena de una fuente (scraping → migración): migra los
+    ficheros que generó scrape_single_source si los artículos no llegaron a
+    PostgreSQL durante el rastreo
+    """
+    result = {
+        'status': scrape_result.get('status', 'failed'),
+        'source': source_key,
+        'scrape': scrape_result,
+        'migrated_count': 0
+    }
+    if scrape_result.get('stored_in_db'):
+        # Ya guardado en PostgreSQL durante el rastreo
+        result['migrated_count'] = scrape_result.get('inserted', 0)
+        return result
+    csv_file, json_file = scrape_result.get('csv_file'), scrape_result.get('json_file')
+    if result['status'] != 'completed' or not (csv_file or json_file):
+        # Scraping fallido o sin artículos nuevos: nada que migrar
+        return result
+    
+    logger.info(f"🗄️ Migrando {source_key} a PostgreSQL")
+    
+    try:
+        result['migrated_count'] = migrate_files(source_key, csv_file, json_file)
+        logger.info(f"✅ {source_key}: {result['migrated_count']} registros migrados")
+    
+    except Exception as e:
+        logger.error(f"❌ Error migrando {source_key}: {e}")
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e, countdown=60)
+        result['status'] = 'failed'
+        result['error'] = str(e)
+    
+    return result
 
 @celery_app.task(bind=True, name='migrate_all_sources')
 def migrate_all_sources(self):
     """
     Tarea para migrar todas las fuentes disponibles
+    Lanza la migración de cada fuente en paralelo (chord) sin esperarla;
+    summarize_migration recoge los resultados.
     """
     logger.info("🗄️ Migrando todas las fuentes a PostgreSQL")
     
     try:
         from config.redis_config import NEWS_SOURCES
         
-        results = {}
-        total_migrated = 0
+        migrations = []
         
         # Buscar archivos de datos más recientes
         data_folder = "data"
@@ -98,33 +149,14 @@ def migrate_all_sources(self):
                         csv_path = os.path.join(source_folder, latest_csv)
                         json_path = os.path.join(source_folder, latest_json)
                         
-                        # Migrar
-                        result = migrate_source_to_db.delay(source_key, csv_path, json_path)
-                        results[source_key] = {
-                            'task_id': result.id,
-                            'status': 'started'
-                        }
-        
-        # Esperar resultados
-        for source_key, result in results.items():
-            try:
-                task_result = celery_app.AsyncResult(result['task_id'])
-                final_result = task_result.get(timeout=300)
-                
-                results[source_key]['status'] = 'completed'
-                results[source_key]['migrated_count'] = final_result.get('migrated_count', 0)
-                total_migrated += final_result.get('migrated_count', 0)
-                
-            except Exception as e:
-                results[source_key]['status'] = 'failed'
-                results[source_key]['error'] = str(e)
+                        migrations.append(migrate_source_to_db.si(source_key, csv_path, json_path))
         
-        logger.info(f"🎉 Migración completada. Total: {total_migrated} registros")
+        summary = chord(group(migrations))(summarize_migration.s())
         
         return {
-            'status': 'completed',
-            'total_migrated': total_migrated,
-            'sources': results,
+            'status': 'started',
+            'summary_task_id': summary.id,
+            'sources': [m.args[0] for m in migrations],
             'timestamp': datetime.now().isoformat()
         }
         
@@ -136,6 +168,30 @@ def migrate_all_sources(self):
             'timestamp': datetime.now().isoformat()
         }
 
+@celery_app.task(bind=True, name='summarize_migration')
+def summarize_migration(self, results):
+    """Callback del chord de migrate_all_sources"""
+    sources = {}
+    total_migrated = 0
+    
+    for result in results:
+        sources[result['source']] = {
+            'status': result['status'],
+            'migrated_count': result.get('migrated_count', 0)
+        }
+        if result.get('error'):
+            sources[result['source']]['error'] = result['error']
+        total_migrated += result.get('migrated_count', 0)
+    
+    logger.info(f"🎉 Migración completada. Total: {total_migrated} registros")
+    
+    return {
+        'status': 'completed',
+        'total_migrated': total_migrated,
+        'sources': sources,
+        'timestamp': datetime.now().isoformat()
+    }
+
 def create_table_if_not_exists(cursor, conn):
     """Crear tabla si no existe"""
     try:
@@ -166,129 +222,40 @@ def create_table_if_not_exists(cursor, conn):
         logger.error(f"❌ Error al crear tabla: {e}")
         raise
 
+def bulk_loader_for(conn, source_key):
+    """Cargador COPY + merge; sin comprobación de duplicados se actualiza la noticia"""
+    from config.redis_config import NEWS_SOURCES
+    
+    fuente = NEWS_SOURCES.get(source_key, {}).get('name', source_key.title())
+    on_conflict = 'nothing' if DUPLICATE_CHECK_ENABLED else 'update'
+    return BulkLoader(conn, default_fuente=fuente, on_conflict=on_conflict)
+
 def migrate_from_csv(cursor, conn, csv_file, source_key):
-    """Migrar datos desde archivo CSV"""
+    """Migrar datos desde archivo CSV (COPY a tabla temporal + un solo INSERT)"""
     try:
         logger.info(f"📄 Migrando desde CSV: {csv_file}")
         
-        df = pd.read_csv(csv_file)
-        logger.info(f"📊 Encontrados {len(df)} registros en CSV")
-        
-        migrated_count = 0
-        skipped_count = 0
-        
-        for index, row in df.iterrows():
-            try:
-                # Verificar duplicados si está habilitado
-                if DUPLICATE_CHECK_ENABLED:
-                    cursor.execute("SELECT id FROM noticias WHERE url = %s", (row['url'],))
-                    if cursor.fetchone():
-                        skipped_count += 1
-                        continue
-                
-                # Insertar registro
-                insert_query = """
-                INSERT INTO noticias (
-                    titulo, fecha, hora, resumen, contenido, categoria, autor, 
-                    tags, url, fecha_extraccion, imagenes, fuente, created_at
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                )
-                """
-                
-                values = (
-                    row.get('titulo'),
-                    row.get('fecha'),
-                    row.get('hora'),
-                    row.get('resumen'),
-                    row.get('contenido'),
-                    row.get('categoria'),
-                    row.get('autor'),
-                    row.get('tags'),
-                    row.get('url'),
-                    row.get('fecha_extraccion'),
-                    row.get('imagenes'),
-                    row.get('fuente', source_key.title()),
-                    row.get('created_at', datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
-                )
-                
-                cursor.execute(insert_query, values)
-                conn.commit()
-                migrated_count += 1
-                
-            except Exception as e:
-                logger.warning(f"⚠️ Error en registro {index}: {e}")
-                conn.rollback()
-                continue
+        migrated_count, skipped_count = bulk_loader_for(conn, source_key).load(read_csv_rows(csv_file))
         
         logger.info(f"✅ Migración CSV completada: {migrated_count} migrados, {skipped_count} omitidos")
         return migrated_count
         
     except Exception as e:
+        # Se propaga: la tarea decide si reintenta (no es "0 artículos nuevos")
         logger.error(f"❌ Error al migrar desde CSV: {e}")
-        return 0
+        raise
 
 def migrate_from_json(cursor, conn, json_file, source_key):
-    """Migrar datos desde archivo JSON"""
+    """Migrar datos desde archivo JSON (COPY a tabla temporal + un solo INSERT)"""
     try:
         logger.info(f"📄 Migrando desde JSON: {json_file}")
         
-        import json
-        with open(json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        logger.info(f"📊 Encontrados {len(data)} registros en JSON")
-        
-        migrated_count = 0
-        skipped_count = 0
-        
-        for item in data:
-            try:
-                # Verificar duplicados si está habilitado
-                if DUPLICATE_CHECK_ENABLED:
-                    cursor.execute("SELECT id FROM noticias WHERE url = %s", (item['url'],))
-                    if cursor.fetchone():
-                        skipped_count += 1
-                        continue
-                
-                # Insertar registro
-                insert_query = """
-                INSERT INTO noticias (
-                    titulo, fecha, hora, resumen, contenido, categoria, autor, 
-                    tags, url, fecha_extraccion, imagenes, fuente, created_at
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                )
-                """
-                
-                values = (
-                    item.get('titulo'),
-                    item.get('fecha'),
-                    item.get('hora'),
-                    item.get('resumen'),
-                    item.get('contenido'),
-                    item.get('categoria'),
-                    item.get('autor'),
-                    item.get('tags'),
-                    item.get('url'),
-                    item.get('fecha_extraccion'),
-                    item.get('imagenes'),
-                    item.get('fuente', source_key.title()),
-                    item.get('created_at', datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
-                )
-                
-                cursor.execute(insert_query, values)
-                conn.commit()
-                migrated_count += 1
-                
-            except Exception as e:
-                logger.warning(f"⚠️ Error en registro: {e}")
-                conn.rollback()
-                continue
+        migrated_count, skipped_count = bulk_loader_for(conn, source_key).load(read_json_rows(json_file))
         
         logger.info(f"✅ Migración JSON completada: {migrated_count} migrados, {skipped_count} omitidos")
         return migrated_count
         
     except Exception as e:
+        # Se propaga: la tarea decide si reintenta (no es "0 artículos nuevos")
         logger.error(f"❌ Error al migrar desde JSON: {e}")
-        return 0
+        raise
@@ -8,67 +8,94 @@ import os
 import sys
 from datetime import datetime
 
-from celery import current_task
+from celery import chain, chord, group
+from celery.exceptions import SoftTimeLimitExceeded
 
 from celery_app import celery_app
 
 # Agregar el directorio raíz al path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from celery_tasks.cleanup_tasks import refresh_news_stats
+from celery_tasks.migration_tasks import migrate_scraped_source
 from config.redis_config import (DUPLICATE_CHECK_ENABLED,
-                                 DUPLICATE_CHECK_FIELD, NEWS_SOURCES)
+                                 DUPLICATE_CHECK_FIELD, NEWS_SOURCES,
+                                 SCRAPING_FULL_TIMEOUT_SECONDS,
+                                 SCRAPING_INCREMENTAL,
+                                 SCRAPING_TIMEOUT_SECONDS)
+from news_dedup import filter_new_articles
+from spiders.crawl_state import STATE_FILENAME, CrawlState
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Margen entre el límite suave (SoftTimeLimitExceeded dentro de la tarea) y el
+# límite duro, en el que el worker mata el proceso
+TIME_LIMIT_GRACE_SECONDS = 60
+
+
+def has_crawl_state(source_key):
+    """La fuente ya terminó algún rastreo (data/<fuente>/crawl_state.sqlite3)"""
+    data_folder = os.path.join('data', source_key)
+    if not os.path.exists(os.path.join(data_folder, STATE_FILENAME)):
+        return False
+    with CrawlState(data_folder) as state:
+        return state.last_crawl_time() is not None
+
+
+def source_timeout(source_key, incremental=SCRAPING_INCREMENTAL):
+    """
+    Segundos que puede tardar el scraping de una fuente. Sin estado de
+    rastreo, el modo incremental también recorre todo el sitio, así que tiene
+    el límite de un rastreo completo.
+    """
+    config = NEWS_SOURCES.get(source_key, {})
+    if incremental and has_crawl_state(source_key):
+        return config.get('timeout_seconds', SCRAPING_TIMEOUT_SECONDS)
+    return config.get('full_timeout_seconds', SCRAPING_FULL_TIMEOUT_SECONDS)
+
+
+def source_pipeline(source_key, incremental=SCRAPING_INCREMENTAL):
+    """Cadena de una fuente: scraping → migración a PostgreSQL"""
+    timeout = source_timeout(source_key, incremental)
+    return chain(
+        scrape_single_source.si(source_key, incremental).set(
+            soft_time_limit=timeout,
+            time_limit=timeout + TIME_LIMIT_GRACE_SECONDS
+        ),
+        migrate_scraped_source.s(source_key)
+    )
+
+
+def launch_sources(source_keys):
+    """
+    Lanza en paralelo la cadena de cada fuente (group) y, cuando terminan
+    todas, summarize_scraping con sus resultados (chord). No espera a nada:
+    devuelve el AsyncResult del resumen.
+    """
+    return chord(group(source_pipeline(key) for key in source_keys))(summarize_scraping.s())
+
+
 @celery_app.task(bind=True, name='scrape_all_sources')
 def scrape_all_sources(self):
     """
     Tarea principal para hacer scraping de todas las fuentes
+    Solo orquesta: no ocupa un worker esperando a las fuentes.
     """
     logger.info("🚀 Iniciando scraping de todas las fuentes")
     
-    results = {}
-    total_articles = 0
-    
     try:
-        # Ejecutar scraping de cada fuente habilitada
-        for source_key, source_config in NEWS_SOURCES.items():
-            if source_config['enabled']:
-                logger.info(f"📰 Iniciando scraping de {source_config['name']}")
-                
-                # Ejecutar tarea de scraping individual
-                task_result = scrape_single_source.delay(source_key)
-                results[source_key] = {
-                    'task_id': task_result.id,
-                    'status': 'started',
-                    'source_name': source_config['name']
-                }
-        
-        # Esperar a que terminen todas las tareas
-        for source_key, result in results.items():
-            try:
-                task_result = celery_app.AsyncResult(result['task_id'])
-                final_result = task_result.get(timeout=300)  # 5 minutos timeout
-                
-                results[source_key]['status'] = 'completed'
-                results[source_key]['articles_count'] = final_result.get('articles_count', 0)
-                total_articles += final_result.get('articles_count', 0)
-                
-                logger.info(f"✅ {result['source_name']}: {final_result.get('articles_count', 0)} artículos")
-                
-            except Exception as e:
-                results[source_key]['status'] = 'failed'
-                results[source_key]['error'] = str(e)
-                logger.error(f"❌ Error en {result['source_name']}: {e}")
+        sources = {key: config['name'] for key, config in NEWS_SOURCES.items() if config['enabled']}
+        for name in sources.values():
+            logger.info(f"📰 Iniciando scraping de {name}")
         
-        logger.info(f"🎉 Scraping completado. Total: {total_articles} artículos")
+        summary = launch_sources(list(sources))
         
         return {
-            'status': 'completed',
-            'total_articles': total_articles,
-            'sources': results,
+            'status': 'started',
+            'summary_task_id': summary.id,
+            'sources': sources,
             'timestamp': datetime.now().isoformat()
         }
         
@@ -80,53 +107,129 @@ def scrape_all_sources(self):
             'timestamp': datetime.now().isoformat()
         }
 
-@celery_app.task(bind=True, name='scrape_single_source')
-def scrape_single_source(self, source_key):
+@celery_app.task(bind=True, name='summarize_scraping')
+def summarize_scraping(self, results):
+    """
+    Callback del chord: resume el resultado de cada fuente y, si se guardaron
+    noticias, refresca las estadísticas de la tabla
+    """
+    sources = {}
+    total_articles = 0
+    total_migrated = 0
+    
+    for result in results:
+        source_key = result.get('source')
+        scrape = result.get('scrape') or {}
+        sources[source_key] = {
+            'status': result.get('status'),
+            'source_name': NEWS_SOURCES.get(source_key, {}).get('name', source_key),
+            'articles_count': scrape.get('articles_count', 0),
+            'migrated_count': result.get('migrated_count', 0)
+        }
+        if result.get('error') or scrape.get('error'):
+            sources[source_key]['error'] = result.get('error') or scrape.get('error')
+        
+        total_articles += sources[source_key]['articles_count']
+        total_migrated += sources[source_key]['migrated_count']
+        
+        if result.get('status') == 'completed':
+            logger.info(f"✅ {sources[source_key]['source_name']}: {sources[source_key]['articles_count']} artículos, {sources[source_key]['migrated_count']} migrados")
+        else:
+            logger.error(f"❌ Error en {sources[source_key]['source_name']}: {sources[source_key].get('error')}")
+    
+    stats_task_id = None
+    if total_migrated:
+        stats_task_id = refresh_news_stats.delay().id
+    
+    logger.info(f"🎉 Scraping completado. Total: {total_articles} artículos, {total_migrated} migrados")
+    
+    return {
+        'status': 'completed',
+        'total_articles': total_articles,
+        'total_migrated': total_migrated,
+        'sources': sources,
+        'stats_task_id': stats_task_id,
+        'timestamp': datetime.now().isoformat()
+    }
+
+@celery_app.task(bind=True, name='scrape_single_source', max_retries=3)
+def scrape_single_source(self, source_key, incremental=SCRAPING_INCREMENTAL):
     """
     Tarea para hacer scraping de una fuente específica
+    En modo incremental solo se descargan los artículos que no están en el
+    estado de rastreo de la fuente.
+    Los artículos se guardan en PostgreSQL durante el rastreo (spiders/db_sink.py);
+    si no fue posible, el siguiente paso de la cadena (migrate_scraped_source)
+    los migra desde los ficheros.
     """
-    logger.info(f"🕷️ Iniciando scraping de {source_key}")
+    logger.info(f"🕷️ Iniciando scraping de {source_key} ({'incremental' if incremental else 'completo'})")
+    # Antes del rastreo: al terminar, la fuente ya tiene estado
+    timeout = source_timeout(source_key, incremental)
     
     try:
         # Importar el spider correspondiente
         if source_key == 'losandes':
-            from spiders.losandes_local import main as spider_main
+            from spiders.losandes_local import run as spider_run
         elif source_key == 'punonoticias':
-            from spiders.punonoticias_local import main as spider_main
+            from spiders.punonoticias_local import run as spider_run
         elif source_key == 'pachamamaradio':
-            from spiders.pachamamaradio_local import main as spider_main
+            from spiders.pachamamaradio_local import run as spider_run
         elif source_key == 'sinfronteras':
-            from spiders.sinfronteras_local import main as spider_main
+            from spiders.sinfronteras_local import run as spider_run
         else:
             raise ValueError(f"Fuente no reconocida: {source_key}")
         
-        # Ejecutar el spider
-        csv_file, json_file = spider_main()
+        # Ejecutar el spider (los artículos se envían a PostgreSQL según se extraen)
+        summary = spider_run(incremental=incremental)
+        db_stats = summary['db'] or {}
+        articles_count = summary['articles_count']
         
-        if csv_file and json_file:
-            # Contar artículos extraídos
-            import pandas as pd
-            df = pd.read_csv(csv_file)
-            articles_count = len(df)
-            
+        if articles_count:
             logger.info(f"✅ {source_key}: {articles_count} artículos extraídos")
             
-            # Ejecutar migración a la base de datos
-            migrate_task = migrate_source_to_db.delay(source_key, csv_file, json_file)
-            
             return {
                 'status': 'completed',
+                'source': source_key,
                 'articles_count': articles_count,
-                'csv_file': csv_file,
-                'json_file': json_file,
-                'migration_task_id': migrate_task.id
+                'csv_file': summary['csv_file'],
+                'json_file': summary['json_file'],
+                'stored_in_db': db_stats.get('stored_in_db', False),
+                'inserted': db_stats.get('inserted', 0)
+            }
+        elif incremental:
+            # Sin artículos nuevos desde el último rastreo: no es un error
+            logger.info(f"ℹ️ {source_key}: sin artículos nuevos")
+            return {
+                'status': 'completed',
+                'source': source_key,
+                'articles_count': 0,
+                'csv_file': None,
+                'json_file': None
             }
         else:
-            raise Exception("No se pudieron generar los archivos de datos")
-            
+            raise Exception("No se pudieron extraer artículos")
+    
+    except SoftTimeLimitExceeded:
+        # Reintentar con el mismo límite no serviría de nada
+        logger.error(f"⏰ {source_key}: superado el límite de {timeout} s")
+        return {
+            'status': 'failed',
+            'source': source_key,
+            'articles_count': 0,
+            'error': f"Tiempo límite superado ({timeout} s)"
+        }
     except Exception as e:
         logger.error(f"❌ Error en scraping de {source_key}: {e}")
-        raise self.retry(exc=e, countdown=60, max_retries=3)
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e, countdown=60)
+        # Sin más reintentos: el fallo se devuelve para que el resto de
+        # fuentes del chord lleguen al resumen
+        return {
+            'status': 'failed',
+            'source': source_key,
+            'articles_count': 0,
+            'error': str(e)
+        }
 
 @celery_app.task(bind=True, name='scrape_source_now')
 def scrape_source_now(self, source_key):
@@ -136,14 +239,12 @@ def scrape_source_now(self, source_key):
     logger.info(f"⚡ Scraping inmediato de {source_key}")
     
     try:
-        # Ejecutar scraping
-        result = scrape_single_source.delay(source_key)
-        final_result = result.get(timeout=300)
+        summary = launch_sources([source_key])
         
         return {
-            'status': 'completed',
+            'status': 'started',
             'source': source_key,
-            'result': final_result,
+            'summary_task_id': summary.id,
             'timestamp': datetime.now().isoformat()
         }
         
@@ -175,19 +276,8 @@ def check_duplicates(self, source_key, articles_data):
         conn = psycopg2.connect(DATABASE_URL)
         cursor = conn.cursor()
         
-        # Obtener URLs existentes
-        cursor.execute(f"SELECT {DUPLICATE_CHECK_FIELD} FROM noticias")
-        existing_urls = {row[0] for row in cursor.fetchall()}
-        
-        # Filtrar duplicados
-        unique_articles = []
-        duplicates_count = 0
-        
-        for article in articles_data:
-            if article.get(DUPLICATE_CHECK_FIELD) not in existing_urls:
-                unique_articles.append(article)
-            else:
-                duplicates_count += 1
+        # Solo se consultan las URL del lote (índice único sobre url)
+        unique_articles, duplicates_count = filter_new_articles(cursor, articles_data, DUPLICATE_CHECK_FIELD)
         
         conn.close()
         
@@ -61,7 +61,7 @@ def list_queues():
         for worker, stat in stats.items():
             print(f"🔧 Worker: {worker}")
             print(f"   - Pool: {stat.get('pool', {}).get('max-concurrency', 'N/A')}")
-            print(f"   - Tareas procesadas: {stat.get('total', {}).get('celery_tasks.scraping_tasks.scrape_all_sources', 0)}")
+            print(f"   - Tareas procesadas: {stat.get('total', {}).get('scrape_all_sources', 0)}")
     
     # Tareas activas por cola
     active = inspect.active()
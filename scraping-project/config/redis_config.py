@@ -40,7 +40,18 @@ DUPLICATE_CHECK_FIELD = 'url'
 # Configuración de scraping - INTERVALO REDUCIDO PARA PRUEBA
 SCRAPING_INTERVAL_HOURS = 6  # Mantener 6 horas para producción
 SCRAPING_INTERVAL_MINUTES = 2  # 2 minutos para prueba
-SCRAPING_TIMEOUT_SECONDS = 300
+# Límite de tiempo del scraping de cada fuente (una fuente puede fijar el
+# suyo con 'timeout_seconds' en NEWS_SOURCES)
+SCRAPING_TIMEOUT_SECONDS = int(os.getenv('SCRAPING_TIMEOUT_SECONDS', '300'))
+
+# Límite de un rastreo completo, que recorre todo el sitio: el modo no
+# incremental y la primera ejecución incremental de una fuente, que aún no
+# tiene estado de rastreo ('full_timeout_seconds' en NEWS_SOURCES por fuente)
+SCRAPING_FULL_TIMEOUT_SECONDS = int(os.getenv('SCRAPING_FULL_TIMEOUT_SECONDS', '14400'))
+
+# Modo incremental: las ejecuciones programadas solo descargan artículos nuevos
+# (el estado de rastreo vive en data/<fuente>/crawl_state.sqlite3)
+SCRAPING_INCREMENTAL = os.getenv('SCRAPING_INCREMENTAL', 'true').lower() == 'true'
 
 # Configuración de logging
 LOG_LEVEL = 'INFO'
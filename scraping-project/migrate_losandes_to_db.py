@@ -4,13 +4,13 @@ Script para migrar datos de Los Andes desde CSV/JSON a PostgreSQL
 """
 
 import glob
-import json
 import os
-from datetime import datetime
 
-import pandas as pd
 import psycopg2
 
+from bulk_loader import BulkLoader, read_csv_rows, read_json_rows
+from news_rollups import noticias_por, total_noticias
+
 
 def connect_to_database():
     """Conectar a la base de datos PostgreSQL"""
@@ -64,60 +64,12 @@ def create_table_if_not_exists(conn):
         return False
 
 def migrate_from_csv(csv_file, conn):
-    """Migrar datos desde archivo CSV"""
+    """Migrar datos desde archivo CSV (COPY a tabla temporal + un solo INSERT)"""
     try:
         print(f"📄 Migrando desde CSV: {csv_file}")
         
-        # Leer CSV
-        df = pd.read_csv(csv_file)
-        print(f"📊 Encontrados {len(df)} registros en CSV")
-        
-        cursor = conn.cursor()
-        migrated_count = 0
-        skipped_count = 0
-        
-        for index, row in df.iterrows():
-            try:
-                # Verificar si la URL ya existe
-                cursor.execute("SELECT id FROM noticias WHERE url = %s", (row['url'],))
-                if cursor.fetchone():
-                    skipped_count += 1
-                    continue
-                
-                # Insertar nuevo registro
-                insert_query = """
-                INSERT INTO noticias (
-                    titulo, fecha, hora, resumen, contenido, categoria, autor, 
-                    tags, url, fecha_extraccion, imagenes, fuente
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                )
-                """
-                
-                values = (
-                    row.get('titulo'),
-                    row.get('fecha'),
-                    row.get('hora'),
-                    row.get('resumen'),
-                    row.get('contenido'),
-                    row.get('categoria'),
-                    row.get('autor'),
-                    row.get('tags'),
-                    row.get('url'),
-                    row.get('fecha_extraccion'),
-                    row.get('imagenes'),
-                    row.get('fuente', 'Los Andes')
-                )
-                
-                cursor.execute(insert_query, values)
-                migrated_count += 1
-                
-            except Exception as e:
-                print(f"⚠️  Error en registro {index}: {e}")
-                continue
-        
-        conn.commit()
-        cursor.close()
+        loader = BulkLoader(conn, default_fuente='Los Andes')
+        migrated_count, skipped_count = loader.load(read_csv_rows(csv_file))
         
         print(f"✅ Migración CSV completada:")
         print(f"   - Migrados: {migrated_count}")
@@ -130,62 +82,12 @@ def migrate_from_csv(csv_file, conn):
         return 0
 
 def migrate_from_json(json_file, conn):
-    """Migrar datos desde archivo JSON"""
+    """Migrar datos desde archivo JSON (COPY a tabla temporal + un solo INSERT)"""
     try:
         print(f"📄 Migrando desde JSON: {json_file}")
         
-        # Leer JSON
-        with open(json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        print(f"📊 Encontrados {len(data)} registros en JSON")
-        
-        cursor = conn.cursor()
-        migrated_count = 0
-        skipped_count = 0
-        
-        for item in data:
-            try:
-                # Verificar si la URL ya existe
-                cursor.execute("SELECT id FROM noticias WHERE url = %s", (item['url'],))
-                if cursor.fetchone():
-                    skipped_count += 1
-                    continue
-                
-                # Insertar nuevo registro
-                insert_query = """
-                INSERT INTO noticias (
-                    titulo, fecha, hora, resumen, contenido, categoria, autor, 
-                    tags, url, fecha_extraccion, imagenes, fuente
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                )
-                """
-                
-                values = (
-                    item.get('titulo'),
-                    item.get('fecha'),
-                    item.get('hora'),
-                    item.get('resumen'),
-                    item.get('contenido'),
-                    item.get('categoria'),
-                    item.get('autor'),
-                    item.get('tags'),
-                    item.get('url'),
-                    item.get('fecha_extraccion'),
-                    item.get('imagenes'),
-                    item.get('fuente', 'Los Andes')
-                )
-                
-                cursor.execute(insert_query, values)
-                migrated_count += 1
-                
-            except Exception as e:
-                print(f"⚠️  Error en registro: {e}")
-                continue
-        
-        conn.commit()
-        cursor.close()
+        loader = BulkLoader(conn, default_fuente='Los Andes')
+        migrated_count, skipped_count = loader.load(read_json_rows(json_file))
         
         print(f"✅ Migración JSON completada:")
         print(f"   - Migrados: {migrated_count}")
@@ -224,16 +126,12 @@ def show_database_stats(conn):
     try:
         cursor = conn.cursor()
         
-        # Contar total de registros
-        cursor.execute("SELECT COUNT(*) FROM noticias;")
-        total_count = cursor.fetchone()[0]
-        
-        # Contar por fuente
-        cursor.execute("SELECT fuente, COUNT(*) FROM noticias GROUP BY fuente;")
-        by_source = cursor.fetchall()
+        # Totales desde los conteos diarios (news_rollups), sin recorrer la tabla
+        total_count = total_noticias(cursor)
+        by_source = noticias_por(cursor, 'fuente')
         
-        # Últimos registros
-        cursor.execute("SELECT titulo, fuente, created_at FROM noticias ORDER BY created_at DESC LIMIT 5;")
+        # Últimos registros (por id: usa la clave primaria en vez de ordenar la tabla)
+        cursor.execute("SELECT titulo, fuente, created_at FROM noticias ORDER BY id DESC LIMIT 5;")
         latest = cursor.fetchall()
         
         print(f"\n📊 Estadísticas de la base de datos:")
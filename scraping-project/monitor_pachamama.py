@@ -9,6 +9,7 @@ from datetime import datetime, timedelta
 import psycopg2
 
 from config.database import get_db_connection
+from news_rollups import total_noticias
 
 
 def check_database_status():
@@ -17,13 +18,9 @@ def check_database_status():
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        # Contar total de noticias
-        cursor.execute("SELECT COUNT(*) FROM noticias")
-        total = cursor.fetchone()[0]
-        
-        # Contar noticias de Pachamama Radio
-        cursor.execute("SELECT COUNT(*) FROM noticias WHERE fuente = 'Pachamama Radio'")
-        pachamama_count = cursor.fetchone()[0]
+        # Contar total de noticias y las de Pachamama Radio (conteos diarios)
+        total = total_noticias(cursor)
+        pachamama_count = total_noticias(cursor, fuente='Pachamama Radio')
         
         # Últimas noticias de Pachamama
         cursor.execute("""
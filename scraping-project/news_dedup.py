@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Duplicados de noticias por URL, resueltos en la base de datos
+- Limpieza: un solo DELETE con row_number() sobre la URL canónica que
+  conserva la noticia más reciente de cada grupo.
+- Prevención: índice único sobre `url` (las URL se guardan en forma
+  canónica, ver url_canon y BulkLoader), que además atiende las
+  comprobaciones de existencia.
+- Comprobación: solo las URL candidatas de un lote se buscan en el índice
+  (url = ANY(...)), en vez de cargar todas las URL de la tabla.
+
+El coste de comprobar un lote depende del tamaño del lote, no de la tabla.
+
+Uso:
+    python news_dedup.py            # elimina duplicados y garantiza el índice único
+"""
+
+import csv
+import io
+import sys
+
+from url_canon import canonical_url
+
+UNIQUE_URL_INDEX = 'idx_noticias_url_unica'
+
+# URL candidatas por consulta en las comprobaciones de existencia
+EXISTS_BATCH_SIZE = 1000
+
+# URL guardadas que no están en forma canónica: (id, url canónica)
+CANONICAL_TABLE = 'urls_canonicas'
+
+# Filas leídas por viaje al recalcular las URL canónicas
+CANONICAL_FETCH_SIZE = 10000
+
+# ¿Hay un índice único sobre `url` sola? (lo necesita ON CONFLICT (url))
+UNIQUE_URL_INDEX_SQL = """
+    SELECT EXISTS (
+        SELECT 1 FROM pg_index i
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+        WHERE i.indrelid = 'noticias'::regclass AND i.indisunique
+          AND i.indnatts = 1 AND a.attname = 'url' AND i.indpred IS NULL
+    )
+"""
+
+# Todas las filas menos la más reciente de cada URL canónica
+DELETE_DUPLICATES_SQL = f"""
+    DELETE FROM noticias n
+    USING (
+        SELECT id
+        FROM (
+            SELECT t.id, row_number() OVER (
+                PARTITION BY COALESCE(c.url, t.url)
+                ORDER BY COALESCE(t.created_at, t.fecha_extraccion) DESC NULLS LAST, t.id DESC
+            ) AS posicion
+            FROM noticias t
+            LEFT JOIN {CANONICAL_TABLE} c ON c.id = t.id
+            WHERE t.url IS NOT NULL
+        ) grupos
+        WHERE posicion > 1
+    ) duplicadas
+    WHERE n.id = duplicadas.id
+"""
+
+# Las supervivientes pasan a la URL canónica (ya no puede chocar)
+CANONICALIZE_URLS_SQL = f"UPDATE noticias n SET url = c.url FROM {CANONICAL_TABLE} c WHERE n.id = c.id"
+
+
+def unique_url_index_exists(cursor):
+    cursor.execute(UNIQUE_URL_INDEX_SQL)
+    return bool(cursor.fetchone()[0])
+
+
+def _stage_canonical_urls(conn, cursor):
+    """
+    Rellena CANONICAL_TABLE con las URL que cambian al canonicalizarlas
+    (las reglas de url_canon no tienen equivalente en SQL). Devuelve cuántas.
+    """
+    cursor.execute(f"CREATE TEMP TABLE {CANONICAL_TABLE} (id INTEGER PRIMARY KEY, url TEXT NOT NULL) ON COMMIT DROP")
+    changed = io.StringIO()
+    writer = csv.writer(changed)
+    count = 0
+    reader = conn.cursor(name='urls_noticias')
+    try:
+        reader.itersize = CANONICAL_FETCH_SIZE
+        reader.execute("SELECT id, url FROM noticias WHERE url IS NOT NULL")
+        for news_id, url in reader:
+            canonical = canonical_url(url)
+            if canonical and canonical != url:
+                writer.writerow((news_id, canonical))
+                count += 1
+    finally:
+        reader.close()
+    changed.seek(0)
+    cursor.copy_expert(f"COPY {CANONICAL_TABLE} (id, url) FROM STDIN WITH (FORMAT csv)", changed)
+    return count
+
+
+def delete_duplicates(conn):
+    """
+    Elimina los duplicados por URL canónica, canonicaliza las URL restantes
+    y crea el índice único si falta, en una transacción. Con el índice ya
+    creado y todas las URL en forma canónica no hay nada que borrar y solo
+    se recorren las URL. Devuelve el número de filas eliminadas.
+    """
+    cursor = conn.cursor()
+    try:
+        # Sin escrituras concurrentes hasta el COMMIT (las lecturas siguen)
+        cursor.execute("LOCK TABLE noticias IN SHARE ROW EXCLUSIVE MODE")
+        has_index = unique_url_index_exists(cursor)
+        deleted = 0
+        # Tablas antiguas: variantes guardadas antes de canonicalizar al insertar
+        if _stage_canonical_urls(conn, cursor) or not has_index:
+            cursor.execute(DELETE_DUPLICATES_SQL)
+            deleted = cursor.rowcount
+            cursor.execute(CANONICALIZE_URLS_SQL)
+        if not has_index:
+            cursor.execute(f"CREATE UNIQUE INDEX {UNIQUE_URL_INDEX} ON noticias (url)")
+        conn.commit()
+        return deleted
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def existing_values(cursor, values, field='url'):
+    """
+    Subconjunto de `values` que ya está en noticias.<field>, consultado por
+    lotes de EXISTS_BATCH_SIZE (con field='url', búsquedas en el índice único).
+    """
+    candidates = list({v for v in values if v})
+    found = set()
+    for start in range(0, len(candidates), EXISTS_BATCH_SIZE):
+        cursor.execute(
+            f"SELECT {field} FROM noticias WHERE {field} = ANY(%s)",
+            (candidates[start:start + EXISTS_BATCH_SIZE],),
+        )
+        found.update(row[0] for row in cursor.fetchall())
+    return found
+
+
+def filter_new_articles(cursor, articles, field='url'):
+    """
+    (nuevos, duplicados) de un lote de artículos: descarta los que ya están
+    en la base de datos y los repetidos dentro del propio lote.
+    """
+    normalize = canonical_url if field == 'url' else (lambda value: value)
+    keys = [normalize(article.get(field)) for article in articles]
+    existing = existing_values(cursor, keys, field)
+
+    new_articles, seen, duplicates = [], set(), 0
+    for article, key in zip(articles, keys):
+        if key is not None and (key in existing or key in seen):
+            duplicates += 1
+            continue
+        seen.add(key)
+        new_articles.append(article)
+    return new_articles, duplicates
+
+
+def main():
+    from config.database import get_db_connection
+
+    try:
+        conn = get_db_connection()
+    except Exception as e:
+        print(f"❌ Error conectando a la base de datos: {e}")
+        sys.exit(1)
+    try:
+        had_index = unique_url_index_exists(conn.cursor())
+        deleted = delete_duplicates(conn)
+        print(f"🧹 Duplicados eliminados: {deleted}")
+        if not had_index:
+            print(f"✅ Índice único {UNIQUE_URL_INDEX} creado sobre noticias(url)")
+        else:
+            print("✅ noticias(url) ya tenía un índice único")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Conteos precalculados de noticias por día × fuente × categoría
+La tabla `noticias_diarias` se mantiene sola con triggers por sentencia
+(con tablas de transición) sobre `noticias`: una carga masiva de miles de
+filas actualiza unas pocas filas del resumen en la misma transacción.
+
+Los paneles, chequeos de salud y la API leen estos conteos (O(días) filas)
+en vez de recorrer `noticias` con COUNT/GROUP BY/DISTINCT.
+
+Uso:
+    python news_rollups.py            # instala (si falta) y muestra los conteos
+    python news_rollups.py --rebuild  # recalcula todo desde `noticias`
+"""
+
+import argparse
+import sys
+
+ROLLUP_TABLE = 'noticias_diarias'
+
+ROLLUP_COLUMNS = ('fuente', 'categoria')
+
+# Clave única: las columnas pueden ser NULL (noticias sin fecha, fuente o categoría)
+_KEY = "(COALESCE(dia, '-infinity'::date)), (COALESCE(fuente, '')), (COALESCE(categoria, ''))"
+
+
+def _upsert(select_sql):
+    return f"""
+        INSERT INTO {ROLLUP_TABLE} AS r (dia, fuente, categoria, total)
+        {select_sql}
+        ORDER BY 1, 2, 3
+        ON CONFLICT ({_KEY}) DO UPDATE SET total = r.total + EXCLUDED.total;
+    """
+
+
+ROLLUP_STATEMENTS = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {ROLLUP_TABLE} (
+        dia DATE,
+        fuente TEXT,
+        categoria TEXT,
+        total BIGINT NOT NULL DEFAULT 0
+    )
+    """,
+    f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{ROLLUP_TABLE}_clave ON {ROLLUP_TABLE} ({_KEY})",
+    f"""
+    CREATE OR REPLACE FUNCTION {ROLLUP_TABLE}_actualizar() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'TRUNCATE' THEN
+            TRUNCATE {ROLLUP_TABLE};
+        ELSIF TG_OP = 'INSERT' THEN
+            {_upsert("SELECT fecha::date, fuente, categoria, COUNT(*) FROM nuevas GROUP BY 1, 2, 3")}
+        ELSIF TG_OP = 'DELETE' THEN
+            {_upsert("SELECT fecha::date, fuente, categoria, -COUNT(*) FROM antiguas GROUP BY 1, 2, 3")}
+        ELSE
+            -- Solo cambian los conteos si se modificó fecha, fuente o categoría
+            {_upsert('''
+            SELECT dia, fuente, categoria, SUM(n) FROM (
+                SELECT fecha::date AS dia, fuente, categoria, 1 AS n FROM nuevas
+                UNION ALL
+                SELECT fecha::date, fuente, categoria, -1 FROM antiguas
+            ) cambios
+            GROUP BY 1, 2, 3
+            HAVING SUM(n) <> 0''')}
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+]
+
+# Una tabla de transición solo admite un evento por trigger
+ROLLUP_TRIGGERS = {
+    f'{ROLLUP_TABLE}_insert': "AFTER INSERT ON noticias REFERENCING NEW TABLE AS nuevas FOR EACH STATEMENT",
+    f'{ROLLUP_TABLE}_update': (
+        "AFTER UPDATE ON noticias REFERENCING OLD TABLE AS antiguas NEW TABLE AS nuevas FOR EACH STATEMENT"
+    ),
+    f'{ROLLUP_TABLE}_delete': "AFTER DELETE ON noticias REFERENCING OLD TABLE AS antiguas FOR EACH STATEMENT",
+    f'{ROLLUP_TABLE}_truncate': "AFTER TRUNCATE ON noticias FOR EACH STATEMENT",
+}
+
+
+# Consulta de comprobación (la usan también los lectores asíncronos de la API)
+ROLLUPS_INSTALLED_SQL = (
+    "SELECT COUNT(*) = %s FROM pg_trigger WHERE tgrelid = to_regclass('noticias') AND tgname = ANY(%s)"
+)
+ROLLUPS_INSTALLED_PARAMS = (len(ROLLUP_TRIGGERS), list(ROLLUP_TRIGGERS))
+
+
+def rollups_installed(cursor):
+    """True si los triggers están activos (y por tanto los conteos al día)"""
+    cursor.execute(ROLLUPS_INSTALLED_SQL, ROLLUPS_INSTALLED_PARAMS)
+    return bool(cursor.fetchone()[0])
+
+
+def _rebuild(cursor):
+    # SHARE bloquea las escrituras en `noticias` mientras se recalcula
+    cursor.execute("LOCK TABLE noticias IN SHARE MODE")
+    cursor.execute(f"DELETE FROM {ROLLUP_TABLE}")
+    cursor.execute(
+        f"""
+        INSERT INTO {ROLLUP_TABLE} (dia, fuente, categoria, total)
+        SELECT fecha::date, fuente, categoria, COUNT(*) FROM noticias GROUP BY 1, 2, 3
+        """
+    )
+
+
+def install_rollups(conn):
+    """
+    Crea la tabla, la función y los triggers si faltan.
+    Si los triggers no existían, los conteos se calculan desde cero en la
+    misma transacción. Devuelve True si hubo que instalarlos.
+    """
+    cursor = conn.cursor()
+    try:
+        installed = rollups_installed(cursor)
+        for statement in ROLLUP_STATEMENTS:
+            cursor.execute(statement)
+        if not installed:
+            for name, definition in ROLLUP_TRIGGERS.items():
+                cursor.execute(f"DROP TRIGGER IF EXISTS {name} ON noticias")
+                cursor.execute(f"CREATE TRIGGER {name} {definition} EXECUTE FUNCTION {ROLLUP_TABLE}_actualizar()")
+            _rebuild(cursor)
+        conn.commit()
+        return not installed
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def rebuild_rollups(conn):
+    """Recalcula `noticias_diarias` completa desde `noticias`"""
+    cursor = conn.cursor()
+    try:
+        _rebuild(cursor)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def total_query(installed, fuente=None, categoria=None, desde=None):
+    """(sql, params) del conteo; sobre el resumen si está instalado"""
+    if installed:
+        table, expression, date_column = ROLLUP_TABLE, "COALESCE(SUM(total), 0)", "dia"
+    else:
+        table, expression, date_column = "noticias", "COUNT(*)", "fecha"
+
+    conditions, params = [], []
+    if fuente is not None:
+        conditions.append("fuente = %s")
+        params.append(fuente)
+    if categoria is not None:
+        conditions.append("categoria = %s")
+        params.append(categoria)
+    if desde is not None:
+        conditions.append(f"{date_column} >= %s::date")
+        params.append(desde)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return f"SELECT {expression} FROM {table} {where}", params
+
+
+def total_noticias(cursor, fuente=None, categoria=None, desde=None):
+    """
+    Número de noticias, opcionalmente de una fuente/categoría y con
+    fecha >= desde (YYYY-MM-DD). Sin resumen instalado cuenta sobre `noticias`.
+    """
+    cursor.execute(*total_query(rollups_installed(cursor), fuente, categoria, desde))
+    return int(cursor.fetchone()[0])
+
+
+def noticias_por(cursor, columna):
+    """[(valor, total)] por fuente o por categoría, de mayor a menor"""
+    if columna not in ROLLUP_COLUMNS:
+        raise ValueError(f"columna debe ser una de {ROLLUP_COLUMNS}")
+    if rollups_installed(cursor):
+        cursor.execute(
+            f"""
+            SELECT {columna}, SUM(total)::bigint FROM {ROLLUP_TABLE}
+            GROUP BY {columna} HAVING SUM(total) > 0
+            ORDER BY 2 DESC, 1
+            """
+        )
+    else:
+        cursor.execute(f"SELECT {columna}, COUNT(*) FROM noticias GROUP BY {columna} ORDER BY 2 DESC, 1")
+    return cursor.fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conteos diarios de noticias por fuente y categoría")
+    parser.add_argument('--rebuild', action='store_true', help="recalcular desde la tabla noticias")
+    args = parser.parse_args()
+
+    from config.database import get_db_connection
+
+    try:
+        conn = get_db_connection()
+    except Exception as e:
+        print(f"❌ Error conectando a la base de datos: {e}")
+        sys.exit(1)
+    try:
+        if install_rollups(conn):
+            print(f"✅ Tabla {ROLLUP_TABLE} y triggers instalados")
+        elif args.rebuild:
+            rebuild_rollups(conn)
+            print(f"✅ Tabla {ROLLUP_TABLE} recalculada")
+
+        cursor = conn.cursor()
+        print(f"📊 Total de noticias: {total_noticias(cursor)}")
+        for fuente, count in noticias_por(cursor, 'fuente'):
+            print(f"   * {fuente}: {count}")
+        cursor.close()
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
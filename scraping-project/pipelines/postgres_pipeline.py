@@ -1,16 +1,49 @@
-import logging
-from datetime import datetime
+import os
+import sys
 
 import psycopg2
 from itemadapter import ItemAdapter
-from psycopg2.extras import RealDictCursor
+from twisted.internet import defer, task, threads
+
+# bulk_loader.py está en la raíz del proyecto
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bulk_loader import BulkLoader
 
 
 class PostgresPipeline:
-    def __init__(self):
+    """
+    Guarda las noticias en PostgreSQL por lotes.
+
+    Los items se acumulan en memoria y se escriben con BulkLoader (COPY a una
+    tabla temporal + INSERT ... ON CONFLICT (url) DO NOTHING) cuando el lote
+    llega a POSTGRES_BATCH_SIZE items, cada POSTGRES_FLUSH_INTERVAL segundos
+    y al cerrar el spider. La escritura se hace en el pool de hilos de Twisted,
+    así el reactor sigue descargando páginas mientras se guarda un lote; solo
+    el item que completa un lote espera a que se escriba (contrapresión si la
+    base de datos va más lenta que el crawl).
+    """
+
+    def __init__(self, batch_size=100, flush_interval=5.0):
         self.connection = None
-        self.cursor = None
-        
+        self.loader = None
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffer = []
+        self.stats = None
+        # Un solo lote en curso: la conexión no se comparte entre hilos a la vez
+        self._lock = defer.DeferredLock()
+        self._timer = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        pipeline = cls(
+            batch_size=crawler.settings.getint('POSTGRES_BATCH_SIZE', 100),
+            flush_interval=crawler.settings.getfloat('POSTGRES_FLUSH_INTERVAL', 5.0),
+        )
+        pipeline.stats = crawler.stats
+        return pipeline
+
     def open_spider(self, spider):
         """Abre la conexión a PostgreSQL cuando inicia el spider"""
         try:
@@ -22,16 +55,19 @@ class PostgresPipeline:
                 password="123456",  # Cambia por tu contraseña
                 port="5432"
             )
-            self.cursor = self.connection.cursor(cursor_factory=RealDictCursor)
             spider.logger.info("Conexión a PostgreSQL establecida correctamente")
-            
+
             # Crear tabla si no existe
             self.create_table()
-            
+
         except Exception as e:
             spider.logger.error(f"Error al conectar con PostgreSQL: {e}")
             raise
 
+        self.loader = BulkLoader(self.connection, default_fuente=getattr(spider, 'fuente', None))
+        self._timer = task.LoopingCall(self.flush, spider)
+        self._timer.start(self.flush_interval, now=False)
+
     def create_table(self):
         """Crea la tabla de noticias si no existe"""
         create_table_query = """
@@ -53,72 +89,59 @@ class PostgresPipeline:
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
         """
-        
+
+        cursor = self.connection.cursor()
         try:
-            self.cursor.execute(create_table_query)
+            cursor.execute(create_table_query)
             self.connection.commit()
             print("Tabla 'noticias' creada o verificada correctamente")
         except Exception as e:
             print(f"Error al crear tabla: {e}")
             raise
+        finally:
+            cursor.close()
 
     def process_item(self, item, spider):
-        """Procesa cada item y lo guarda en PostgreSQL"""
-        adapter = ItemAdapter(item)
-        
-        try:
-            # Verificar si la URL ya existe
-            check_query = "SELECT id FROM noticias WHERE url = %s"
-            self.cursor.execute(check_query, (adapter.get('url'),))
-            existing_record = self.cursor.fetchone()
-            
-            if existing_record:
-                spider.logger.info(f"Noticia ya existe en BD: {adapter.get('url')}")
-                return item
-            
-            # Insertar nueva noticia
-            insert_query = """
-            INSERT INTO noticias (
-                titulo, fecha, resumen, contenido, categoria, autor, 
-                tags, url, fecha_extraccion, caracteres_contenido, 
-                palabras_contenido, imagenes, fuente
-            ) VALUES (
-                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-            )
-            """
-            
-            values = (
-                adapter.get('titulo'),
-                adapter.get('fecha'),
-                adapter.get('resumen'),
-                adapter.get('contenido'),
-                adapter.get('categoria'),
-                adapter.get('autor'),
-                adapter.get('tags'),
-                adapter.get('url'),
-                adapter.get('fecha_extraccion'),
-                adapter.get('caracteres_contenido'),
-                adapter.get('palabras_contenido'),
-                adapter.get('imagenes'),
-                adapter.get('fuente')
-            )
-            
-            self.cursor.execute(insert_query, values)
-            self.connection.commit()
-            
-            spider.logger.info(f"Noticia guardada en BD: {adapter.get('titulo')}")
-            
-        except Exception as e:
-            spider.logger.error(f"Error al guardar noticia en BD: {e}")
-            self.connection.rollback()
-            raise
-            
-        return item
+        """Añade el item al lote; si el lote está completo, lo guarda"""
+        self.buffer.append(ItemAdapter(item).asdict())
+        if len(self.buffer) < self.batch_size:
+            return item
+        d = self.flush(spider)
+        d.addCallback(lambda _: item)
+        return d
+
+    def flush(self, spider):
+        """Guarda el lote pendiente (Deferred que se dispara al terminar)"""
+        return self._lock.run(self._write_batch, spider)
+
+    def _write_batch(self, spider):
+        if not self.buffer:
+            return defer.succeed(None)
+        batch, self.buffer = self.buffer, []
+        d = threads.deferToThread(self.loader.load, batch)
+        d.addCallbacks(self._batch_saved, self._batch_failed, callbackArgs=(batch, spider), errbackArgs=(batch, spider))
+        return d
+
+    def _batch_saved(self, result, batch, spider):
+        inserted, skipped = result
+        spider.logger.info(f"💾 Lote guardado en BD: {inserted} nuevas, {skipped} ya existentes o sin URL")
+        if self.stats is not None:
+            self.stats.inc_value('postgres/items_inserted', inserted)
+            self.stats.inc_value('postgres/items_skipped', skipped)
+
+    def _batch_failed(self, failure, batch, spider):
+        # BulkLoader ya hizo rollback; el crawl sigue con el siguiente lote
+        spider.logger.error(f"Error al guardar lote de {len(batch)} noticias en BD: {failure.getErrorMessage()}")
+        if self.stats is not None:
+            self.stats.inc_value('postgres/items_failed', len(batch))
 
+    @defer.inlineCallbacks
     def close_spider(self, spider):
-        """Cierra la conexión cuando termina el spider"""
-        if self.cursor:
-            self.cursor.close()
+        """Guarda lo que quede en el lote y cierra la conexión"""
+        if self._timer and self._timer.running:
+            self._timer.stop()
+        if self.loader:
+            yield self.flush(spider)
         if self.connection:
             self.connection.close()
         spider.logger.info("Conexión a PostgreSQL cerrada")
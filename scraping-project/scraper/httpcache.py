@@ -0,0 +1,44 @@
+"""
+Almacenamiento HTTPCACHE de Scrapy sobre la caché de spiders/http_cache.py
+Los spiders Scrapy y los scrapers locales comparten así el mismo directorio:
+lo que descarga uno lo revalida (o lo reproduce offline) el otro.
+"""
+
+from datetime import datetime
+
+from scrapy.http import Headers
+from scrapy.responsetypes import responsetypes
+
+from spiders.http_cache import HttpCache
+
+
+class SharedHttpCacheStorage:
+    """Backend para HTTPCACHE_STORAGE con cuerpos gzip direccionados por hash"""
+
+    def __init__(self, settings):
+        self.cache_dir = settings.get('HTTPCACHE_DIR')
+        self.expiration_secs = settings.getint('HTTPCACHE_EXPIRATION_SECS')
+        self.cache = None
+
+    def open_spider(self, spider):
+        self.cache = HttpCache(self.cache_dir)
+        spider.logger.debug(f"Caché HTTP compartida en {self.cache_dir}")
+
+    def close_spider(self, spider):
+        self.cache.close()
+
+    def retrieve_response(self, spider, request):
+        cached = self.cache.lookup(request.url)
+        if cached is None:
+            return None
+        if self.expiration_secs > 0:
+            stored_at = datetime.strptime(cached.stored_at, '%Y-%m-%d %H:%M:%S')
+            if (datetime.now() - stored_at).total_seconds() > self.expiration_secs:
+                return None
+        headers = Headers(cached.headers)
+        body = cached.body
+        respcls = responsetypes.from_args(headers=headers, url=request.url, body=body)
+        return respcls(url=request.url, headers=headers, status=cached.status, body=body)
+
+    def store_response(self, spider, request, response):
+        self.cache.store(request.url, response.status, response.headers.to_unicode_dict(), response.body)
@@ -1,5 +1,7 @@
 # Scrapy settings for scraper project
 
+import os
+
 BOT_NAME = "scraper"
 
 SPIDER_MODULES = ["scraper.spiders"]
@@ -12,6 +14,11 @@ ITEM_PIPELINES = {
    "pipelines.postgres_pipeline.PostgresPipeline": 400,
 }
 
+# PostgresPipeline guarda por lotes: al llegar a POSTGRES_BATCH_SIZE items,
+# cada POSTGRES_FLUSH_INTERVAL segundos y al cerrar el spider
+POSTGRES_BATCH_SIZE = 100
+POSTGRES_FLUSH_INTERVAL = 5
+
 FEEDS = {
     'data/%(name)s_%(time)s.json': {'format': 'json'},
     'data/%(name)s_%(time)s.csv': {'format': 'csv'},
@@ -27,3 +34,16 @@ AUTOTHROTTLE_ENABLED = True
 AUTOTHROTTLE_START_DELAY = 1
 AUTOTHROTTLE_MAX_DELAY = 60
 AUTOTHROTTLE_TARGET_CONCURRENCY = 1.0
+
+# Caché HTTP en disco compartida con los scrapers locales (spiders/http_cache.py)
+# Con HTTP_CACHE_OFFLINE=true se reproducen las respuestas guardadas sin tocar la red
+HTTPCACHE_ENABLED = os.getenv('HTTP_CACHE_ENABLED', 'true').lower() == 'true'
+HTTPCACHE_STORAGE = 'scraper.httpcache.SharedHttpCacheStorage'
+HTTPCACHE_DIR = os.getenv('HTTP_CACHE_DIR', 'data/http_cache')
+HTTPCACHE_EXPIRATION_SECS = 0
+if os.getenv('HTTP_CACHE_OFFLINE', 'false').lower() == 'true':
+    HTTPCACHE_POLICY = 'scrapy.extensions.httpcache.DummyPolicy'
+    HTTPCACHE_IGNORE_MISSING = True
+else:
+    # Revalida con If-None-Match / If-Modified-Since y usa el cuerpo guardado ante un 304
+    HTTPCACHE_POLICY = 'scrapy.extensions.httpcache.RFC2616Policy'
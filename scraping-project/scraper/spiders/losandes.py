@@ -6,11 +6,13 @@ import time
 from collections import deque
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urlparse
 
 import pandas as pd
 import requests
-from bs4 import BeautifulSoup
+
+from spiders.extraction import ArticleExtractor
+from spiders.html_parser import parse_html
 
 # Configuración de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -33,6 +35,7 @@ class LosAndesScraper:
         self.articles_data = []
         self.lock = threading.Lock()
         self.categories_found = set()
+        self.extractor = ArticleExtractor.load('losandes')
         
     def get_page(self, url, retries=3):
         """Obtiene el contenido de una página con reintentos"""
@@ -50,41 +53,12 @@ class LosAndesScraper:
                 time.sleep(2)
         return None
 
-    def extract_article_links(self, soup, base_url):
-        """Extrae todos los links de artículos de una página"""
-        links = set()
-        
-        # Diferentes selectores para encontrar links de artículos
-        selectors = [
-            'a[href*="/2024/"]',
-            'a[href*="/2023/"]', 
-            'a[href*="/2022/"]',
-            'a[href*="/blog/"]',
-            'a[href*="/actualidad/"]',
-            'a[href*="/deportes/"]',
-            'a[href*="/economia/"]',
-            'a[href*="/cultura/"]',
-            'a[href*="/politica/"]',
-            'h1 a', 'h2 a', 'h3 a', 'h4 a',
-            '.entry-title a',
-            '.post-title a',
-            '.article-title a',
-            'article a',
-            '.news-item a',
-            '.post a[href]'
-        ]
-        
-        for selector in selectors:
-            elements = soup.select(selector)
-            for element in elements:
-                href = element.get('href')
-                if href:
-                    full_url = urljoin(base_url, href)
-                    # Filtrar solo URLs que parezcan artículos
-                    if self.is_article_url(full_url):
-                        links.add(full_url)
-        
-        return links
+    def extract_article_links(self, document, base_url):
+        """Extrae todos los links de artículos de una página (selectores "listing" del perfil)"""
+        return {
+            url for url in self.extractor.listing_links(document, 'articles', base_url)
+            if self.is_article_url(url)
+        }
 
     def is_article_url(self, url):
         """Determina si una URL es de un artículo"""
@@ -139,189 +113,28 @@ class LosAndesScraper:
             response = self.get_page(url)
             if not response:
                 return None
-                
-            soup = BeautifulSoup(response.content, 'html.parser')
             
-            # Datos básicos
+            # Mismo perfil de selectores que el scraper local (spiders/profiles/losandes.json)
+            extracted = self.extractor.extract(parse_html(response.content), url)
+            
             data = {
                 'url': url,
-                'titulo': '',
-                'fecha': '',
-                'hora': '',
-                'resumen': '',
-                'contenido': '',
-                'categoria': '',
-                'autor': '',
-                'tags': '',
-                'link_imagenes': '',
+                'titulo': extracted['titulo'] or '',
+                'fecha': extracted['fecha'] or '',
+                'hora': extracted['hora'] or '',
+                'resumen': extracted['resumen'] or '',
+                'contenido': extracted['contenido'] or '',
+                'categoria': ', '.join(extracted['categoria']),
+                'autor': extracted['autor'] or '',
+                'tags': ', '.join(extracted['tags']),
+                'link_imagenes': ', '.join(extracted['imagenes']),
                 'fecha_extraccion': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
                 'fuente': 'Los Andes'
             }
             
-            # Extraer título
-            title_selectors = [
-                'h1.entry-title',
-                'h1.post-title', 
-                'h1.article-title',
-                '.single-title h1',
-                'article h1',
-                'h1',
-                '.title h1',
-                'header h1'
-            ]
-            
-            for selector in title_selectors:
-                title_elem = soup.select_one(selector)
-                if title_elem:
-                    data['titulo'] = title_elem.get_text(strip=True)
-                    break
-            
-            # Extraer fecha y hora
-            date_selectors = [
-                'time[datetime]',
-                '.entry-date',
-                '.post-date',
-                '.date',
-                '.published',
-                '[class*="date"]',
-                '[class*="time"]'
-            ]
-            
-            for selector in date_selectors:
-                date_elem = soup.select_one(selector)
-                if date_elem:
-                    date_text = date_elem.get('datetime') or date_elem.get_text(strip=True)
-                    parsed_date = self.parse_date(date_text)
-                    if parsed_date:
-                        data['fecha'] = parsed_date.strftime('%Y-%m-%d')
-                        data['hora'] = parsed_date.strftime('%H:%M:%S')
-                        break
-            
-            # Extraer resumen/excerpt
-            summary_selectors = [
-                '.entry-summary',
-                '.excerpt',
-                '.post-excerpt',
-                '.article-summary',
-                'meta[name="description"]',
-                '.lead'
-            ]
-            
-            for selector in summary_selectors:
-                if selector.startswith('meta'):
-                    summary_elem = soup.select_one(selector)
-                    if summary_elem:
-                        data['resumen'] = summary_elem.get('content', '').strip()
-                        break
-                else:
-                    summary_elem = soup.select_one(selector)
-                    if summary_elem:
-                        data['resumen'] = summary_elem.get_text(strip=True)
-                        break
-            
-            # Extraer contenido principal
-            content_selectors = [
-                '.entry-content',
-                '.post-content',
-                '.article-content',
-                '.content',
-                'article .text',
-                '.single-content',
-                'main article p'
-            ]
-            
-            content_parts = []
-            for selector in content_selectors:
-                content_elem = soup.select_one(selector)
-                if content_elem:
-                    # Remover scripts y estilos
-                    for script in content_elem(["script", "style"]):
-                        script.decompose()
-                    
-                    paragraphs = content_elem.find_all(['p', 'div'], string=True)
-                    for p in paragraphs:
-                        text = p.get_text(strip=True)
-                        if len(text) > 20:  # Solo párrafos con contenido sustancial
-                            content_parts.append(text)
-                    break
-            
-            data['contenido'] = '\n\n'.join(content_parts)
-            
-            # Extraer categoría
-            category_selectors = [
-                '.category a',
-                '.cat-links a',
-                '.entry-categories a',
-                '[rel="category tag"]',
-                '.post-categories a'
-            ]
-            
-            categories = []
-            for selector in category_selectors:
-                cat_elems = soup.select(selector)
-                for elem in cat_elems:
-                    cat_text = elem.get_text(strip=True)
-                    if cat_text and cat_text not in categories:
-                        categories.append(cat_text)
-            
-            data['categoria'] = ', '.join(categories)
             if data['categoria']:
                 self.categories_found.add(data['categoria'])
             
-            # Extraer autor
-            author_selectors = [
-                '.author-name',
-                '.entry-author',
-                '.post-author',
-                '[rel="author"]',
-                '.by-author',
-                '.author'
-            ]
-            
-            for selector in author_selectors:
-                author_elem = soup.select_one(selector)
-                if author_elem:
-                    data['autor'] = author_elem.get_text(strip=True)
-                    break
-            
-            # Extraer tags
-            tag_selectors = [
-                '.tags a',
-                '.post-tags a',
-                '.entry-tags a',
-                '[rel="tag"]'
-            ]
-            
-            tags = []
-            for selector in tag_selectors:
-                tag_elems = soup.select(selector)
-                for elem in tag_elems:
-                    tag_text = elem.get_text(strip=True)
-                    if tag_text and tag_text not in tags:
-                        tags.append(tag_text)
-            
-            data['tags'] = ', '.join(tags)
-            
-            # Extraer imágenes
-            img_selectors = [
-                '.entry-content img',
-                '.post-content img',
-                '.article-content img',
-                'article img',
-                '.featured-image img'
-            ]
-            
-            images = set()
-            for selector in img_selectors:
-                img_elems = soup.select(selector)
-                for img in img_elems:
-                    src = img.get('src') or img.get('data-src')
-                    if src:
-                        full_img_url = urljoin(url, src)
-                        images.add(full_img_url)
-            
-            data['link_imagenes'] = ', '.join(list(images))
-            
             logger.info(f"Extraído artículo: {data['titulo'][:50]}...")
             return data
             
@@ -329,77 +142,16 @@ class LosAndesScraper:
             logger.error(f"Error extrayendo artículo {url}: {e}")
             return None
 
-    def parse_date(self, date_string):
-        """Parsea diferentes formatos de fecha"""
-        if not date_string:
-            return None
-            
-        # Patrones comunes de fecha
-        patterns = [
-            '%Y-%m-%d %H:%M:%S',
-            '%Y-%m-%dT%H:%M:%S',
-            '%Y-%m-%d',
-            '%d/%m/%Y',
-            '%d-%m-%Y',
-            '%B %d, %Y',
-            '%d de %B de %Y',
-        ]
-        
-        date_string = re.sub(r'[^\w\s:/-]', '', str(date_string)).strip()
-        
-        for pattern in patterns:
-            try:
-                return datetime.strptime(date_string, pattern)
-            except ValueError:
-                continue
-        
-        return None
-
-    def discover_pagination_urls(self, base_soup, base_url):
+    def discover_pagination_urls(self, document, base_url):
         """Descubre URLs de paginación"""
-        pagination_urls = set()
-        
-        # Buscar enlaces de paginación
-        pagination_selectors = [
-            '.pagination a',
-            '.page-numbers a',
-            '.nav-links a',
-            'a[href*="page"]',
-            'a[href*="paged"]'
-        ]
-        
-        for selector in pagination_selectors:
-            elems = base_soup.select(selector)
-            for elem in elems:
-                href = elem.get('href')
-                if href:
-                    full_url = urljoin(base_url, href)
-                    pagination_urls.add(full_url)
-        
-        return pagination_urls
+        return set(self.extractor.listing_links(document, 'pagination', base_url))
 
-    def discover_category_urls(self, soup, base_url):
+    def discover_category_urls(self, document, base_url):
         """Descubre URLs de categorías"""
-        category_urls = set()
-        
-        category_selectors = [
-            '.menu a',
-            '.nav a',
-            '.category-list a',
-            '.categories a',
-            '[href*="category"]'
-        ]
-        
-        for selector in category_selectors:
-            elems = soup.select(selector)
-            for elem in elems:
-                href = elem.get('href')
-                if href:
-                    full_url = urljoin(base_url, href)
-                    if 'category' in full_url or 'actualidad' in full_url or 'deportes' in full_url:
-                        category_urls.add(full_url)
-        
-        return category_urls
+        return {
+            url for url in self.extractor.listing_links(document, 'categories', base_url)
+            if 'category' in url or 'actualidad' in url or 'deportes' in url
+        }
 
     def crawl_all_pages(self):
         """Crawlea todas las páginas para encontrar artículos"""
@@ -441,15 +193,15 @@ class LosAndesScraper:
                 continue
                 
             crawled_pages.add(url)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            document = parse_html(response.content)
             
             # Encontrar artículos en esta página
-            article_links = self.extract_article_links(soup, self.base_url)
+            article_links = self.extract_article_links(document, self.base_url)
             all_article_urls.update(article_links)
             
             # Encontrar más páginas para crawlear
-            pagination_urls = self.discover_pagination_urls(soup, url)
-            category_urls = self.discover_category_urls(soup, url)
+            pagination_urls = self.discover_pagination_urls(document, url)
+            category_urls = self.discover_category_urls(document, url)
             
             for new_url in pagination_urls.union(category_urls):
                 if new_url not in crawled_pages and new_url not in urls_to_crawl:
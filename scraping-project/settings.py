@@ -10,6 +10,11 @@ ITEM_PIPELINES = {
    "pipelines.postgres_pipeline.PostgresPipeline": 400,
 }
 
+# PostgresPipeline guarda por lotes: al llegar a POSTGRES_BATCH_SIZE items,
+# cada POSTGRES_FLUSH_INTERVAL segundos y al cerrar el spider
+POSTGRES_BATCH_SIZE = 100
+POSTGRES_FLUSH_INTERVAL = 5
+
 FEEDS = {
     'data/%(name)s_%(time)s.json': {'format': 'json'},
     'data/%(name)s_%(time)s.csv': {'format': 'csv'},
@@ -8,6 +8,10 @@ import sys
 import psycopg2
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 
+from bulk_loader import DATA_VERSION_TABLE, install_data_version
+from news_dedup import delete_duplicates
+from news_rollups import ROLLUP_TABLE, install_rollups
+
 
 def verify_database():
     """Verifica que la base de datos 'noticias' existe y es accesible"""
@@ -83,7 +87,20 @@ def create_table():
             "CREATE INDEX IF NOT EXISTS idx_noticias_url ON noticias(url);",
             "CREATE INDEX IF NOT EXISTS idx_noticias_fecha ON noticias(fecha);",
             "CREATE INDEX IF NOT EXISTS idx_noticias_fuente ON noticias(fuente);",
-            "CREATE INDEX IF NOT EXISTS idx_noticias_categoria ON noticias(categoria);"
+            "CREATE INDEX IF NOT EXISTS idx_noticias_categoria ON noticias(categoria);",
+            # Paginación por cursor (fecha, id) en /news, /news/fuentes y /news/categorias
+            "CREATE INDEX IF NOT EXISTS idx_noticias_fecha_id ON noticias(fecha DESC NULLS LAST, id DESC);",
+            "CREATE INDEX IF NOT EXISTS idx_noticias_fuente_fecha_id ON noticias(fuente, fecha DESC NULLS LAST, id DESC);",
+            "CREATE INDEX IF NOT EXISTS idx_noticias_categoria_fecha_id ON noticias(categoria, fecha DESC NULLS LAST, id DESC);",
+            # Búsqueda de texto completo (español) y respaldo por similitud de títulos
+            """ALTER TABLE noticias ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+                setweight(to_tsvector('spanish', COALESCE(titulo, '')), 'A') ||
+                setweight(to_tsvector('spanish', COALESCE(resumen, '')), 'B') ||
+                setweight(to_tsvector('spanish', COALESCE(contenido, '')), 'C')
+            ) STORED;""",
+            "CREATE INDEX IF NOT EXISTS idx_noticias_search_vector ON noticias USING GIN (search_vector);",
+            "CREATE EXTENSION IF NOT EXISTS pg_trgm;",
+            "CREATE INDEX IF NOT EXISTS idx_noticias_titulo_trgm ON noticias USING GIN (titulo gin_trgm_ops);"
         ]
         
         for index_query in indexes:
@@ -92,6 +109,21 @@ def create_table():
         conn.commit()
         print("✅ Índices creados correctamente")
         
+        # Una sola fila por URL canónica: borra las variantes guardadas antes de
+        # canonicalizar al insertar y crea el índice único si falta
+        deleted = delete_duplicates(conn)
+        if deleted:
+            print(f"🧹 {deleted} noticias duplicadas eliminadas")
+        print("✅ Índice único sobre url verificado")
+        
+        # Conteos diarios por fuente y categoría (mantenidos por triggers)
+        install_rollups(conn)
+        print(f"✅ Tabla {ROLLUP_TABLE} lista")
+        
+        # Versión de los datos que incrementa cada carga (claves de caché de la API)
+        install_data_version(conn)
+        print(f"✅ Tabla {DATA_VERSION_TABLE} lista")
+        
         cursor.close()
         conn.close()
         
@@ -1,6 +1,7 @@
 import csv
 import json
-import re
+import os
+import sys
 import threading
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -11,6 +12,12 @@ import pandas as pd
 import requests
 from bs4 import BeautifulSoup
 
+# Agregar el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spiders.extraction import ArticleExtractor
+from spiders.html_parser import parse_html
+
 
 class LosAndesScraper:
     def __init__(self):
@@ -27,6 +34,7 @@ class LosAndesScraper:
         self.all_news = []
         self.processed_urls = set()
         self.lock = threading.Lock()
+        self.extractor = ArticleExtractor.load('losandes')
         
     def get_page(self, url, retries=3):
         """Obtiene el contenido de una página con reintentos"""
@@ -42,183 +50,28 @@ class LosAndesScraper:
                 else:
                     return None
     
-    def extract_images(self, soup):
-        """Extrae todas las imágenes de un artículo"""
-        images = []
-        img_tags = soup.find_all('img')
-        for img in img_tags:
-            src = img.get('src') or img.get('data-src') or img.get('data-lazy-src')
-            if src:
-                full_url = urljoin(self.base_url, src)
-                images.append(full_url)
-        return images
-    
-    def clean_text(self, text):
-        """Limpia y normaliza el texto"""
-        if not text:
-            return ""
-        # Eliminar espacios extra y caracteres especiales
-        text = re.sub(r'\s+', ' ', text.strip())
-        text = re.sub(r'[\r\n\t]', ' ', text)
-        return text
-    
     def extract_article_data(self, article_url):
         """Extrae todos los datos de un artículo específico"""
         try:
             response = self.get_page(article_url)
             if not response:
                 return None
-                
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extraer título
-            title_selectors = [
-                'h1.entry-title',
-                'h1.post-title', 
-                'h1.article-title',
-                '.post-header h1',
-                'article h1',
-                'h1'
-            ]
-            title = ""
-            for selector in title_selectors:
-                title_elem = soup.select_one(selector)
-                if title_elem:
-                    title = self.clean_text(title_elem.get_text())
-                    break
-            
-            # Extraer fecha y hora
-            date_selectors = [
-                'time',
-                '.post-date',
-                '.entry-date',
-                '.published',
-                '.date',
-                '[datetime]'
-            ]
-            fecha = ""
-            hora = ""
-            for selector in date_selectors:
-                date_elem = soup.select_one(selector)
-                if date_elem:
-                    datetime_attr = date_elem.get('datetime') or date_elem.get('content')
-                    if datetime_attr:
-                        try:
-                            dt = datetime.fromisoformat(datetime_attr.replace('Z', '+00:00'))
-                            fecha = dt.strftime('%Y-%m-%d')
-                            hora = dt.strftime('%H:%M:%S')
-                            break
-                        except:
-                            pass
-                    # Si no hay datetime, extraer texto
-                    date_text = self.clean_text(date_elem.get_text())
-                    if date_text:
-                        fecha = date_text
-                        break
-            
-            # Extraer resumen/excerpt
-            summary_selectors = [
-                '.entry-excerpt',
-                '.post-excerpt',
-                '.excerpt',
-                '.lead',
-                '.summary',
-                'meta[name="description"]'
-            ]
-            resumen = ""
-            for selector in summary_selectors:
-                if selector.startswith('meta'):
-                    summary_elem = soup.select_one(selector)
-                    if summary_elem:
-                        resumen = self.clean_text(summary_elem.get('content', ''))
-                        break
-                else:
-                    summary_elem = soup.select_one(selector)
-                    if summary_elem:
-                        resumen = self.clean_text(summary_elem.get_text())
-                        break
-            
-            # Extraer contenido principal
-            content_selectors = [
-                '.entry-content',
-                '.post-content',
-                '.article-content',
-                '.content',
-                'article .text',
-                '.post-body'
-            ]
-            contenido = ""
-            for selector in content_selectors:
-                content_elem = soup.select_one(selector)
-                if content_elem:
-                    # Eliminar elementos no deseados
-                    for unwanted in content_elem.find_all(['script', 'style', 'nav', 'aside', 'footer']):
-                        unwanted.decompose()
-                    contenido = self.clean_text(content_elem.get_text())
-                    break
-            
-            # Extraer categoría
-            category_selectors = [
-                '.category',
-                '.post-category',
-                '.entry-category',
-                '.cat-links a',
-                '[rel="category"]',
-                '.breadcrumb a'
-            ]
-            categoria = ""
-            for selector in category_selectors:
-                cat_elems = soup.select(selector)
-                if cat_elems:
-                    categories = [self.clean_text(cat.get_text()) for cat in cat_elems]
-                    categoria = ", ".join(categories)
-                    break
-            
-            # Extraer autor
-            author_selectors = [
-                '.author',
-                '.post-author',
-                '.entry-author',
-                '[rel="author"]',
-                '.byline',
-                '.writer'
-            ]
-            autor = ""
-            for selector in author_selectors:
-                author_elem = soup.select_one(selector)
-                if author_elem:
-                    autor = self.clean_text(author_elem.get_text())
-                    break
-            
-            # Extraer tags
-            tag_selectors = [
-                '.tags a',
-                '.post-tags a',
-                '.entry-tags a',
-                '[rel="tag"]'
-            ]
-            tags = []
-            for selector in tag_selectors:
-                tag_elems = soup.select(selector)
-                if tag_elems:
-                    tags = [self.clean_text(tag.get_text()) for tag in tag_elems]
-                    break
             
-            # Extraer imágenes
-            images = self.extract_images(soup)
+            # Selectores declarados en spiders/profiles/losandes.json
+            data = self.extractor.extract(parse_html(response.content), article_url)
             
             return {
-                'titulo': title,
-                'fecha': fecha,
-                'hora': hora,
-                'resumen': resumen,
-                'contenido': contenido,
-                'categoria': categoria,
-                'autor': autor,
-                'tags': ", ".join(tags) if tags else "",
+                'titulo': data['titulo'] or "",
+                'fecha': data['fecha'] or "",
+                'hora': data['hora'] or "",
+                'resumen': data['resumen'] or "",
+                'contenido': data['contenido'] or "",
+                'categoria': ", ".join(data['categoria']),
+                'autor': data['autor'] or "",
+                'tags': ", ".join(data['tags']),
                 'url': article_url,
                 'fecha_extraccion': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'link_imagenes': ", ".join(images) if images else ""
+                'link_imagenes': ", ".join(data['imagenes'])
             }
             
         except Exception as e:
@@ -1,13 +1,19 @@
 import json
 import logging
-import re
+import os
+import sys
 import time
 from datetime import datetime
 from urllib.parse import urljoin, urlparse
 
 import pandas as pd
 import requests
-from bs4 import BeautifulSoup
+
+# Agregar el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spiders.extraction import ArticleExtractor
+from spiders.html_parser import parse_html
 
 
 class PachamamaRadioScraper:
@@ -19,6 +25,7 @@ class PachamamaRadioScraper:
         })
         self.articles_data = []
         self.visited_urls = set()
+        self.extractor = ArticleExtractor.load('pachamamaradio')
         
         # Configurar logging
         logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -29,7 +36,7 @@ class PachamamaRadioScraper:
         try:
             response = self.session.get(url, timeout=30)
             response.raise_for_status()
-            return BeautifulSoup(response.content, 'html.parser')
+            return parse_html(response.content)
         except Exception as e:
             self.logger.error(f"Error obteniendo {url}: {e}")
             return None
@@ -157,33 +164,24 @@ class PachamamaRadioScraper:
             return None
         
         try:
-            # Extraer título
-            titulo = self.extract_title(soup)
+            # Selectores declarados en spiders/profiles/pachamamaradio.json
+            data = self.extractor.extract(soup, url)
+            titulo = data['titulo']
             if not titulo:
                 return None
             
-            # Extraer datos básicos
-            fecha = self.extract_date(soup)
-            hora = self.extract_time(soup)
-            contenido = self.extract_content(soup)
-            resumen = self.extract_summary(soup, contenido)
-            categoria = self.extract_category(soup, url)
-            autor = self.extract_author(soup)
-            tags = self.extract_tags(soup)
-            imagenes = self.extract_images(soup)
-            
             article_data = {
                 'titulo': titulo,
-                'fecha': fecha,
-                'hora': hora,
-                'resumen': resumen,
-                'contenido': contenido,
-                'categoria': categoria,
-                'autor': autor,
-                'tags': tags,
+                'fecha': data['fecha'],
+                'hora': data['hora'],
+                'resumen': data['resumen'] or self.summarize(data['contenido']),
+                'contenido': data['contenido'],
+                'categoria': data['categoria'] or self.category_from_url(url),
+                'autor': data['autor'],
+                'tags': data['tags'],
                 'url': url,
                 'fecha_extraccion': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'link_imagenes': imagenes
+                'link_imagenes': data['imagenes']
             }
             
             self.logger.info(f"Extraído: {titulo[:50]}...")
@@ -193,168 +191,16 @@ class PachamamaRadioScraper:
             self.logger.error(f"Error extrayendo datos de {url}: {e}")
             return None
     
-    def extract_title(self, soup):
-        """Extrae el título del artículo"""
-        selectors = [
-            'h1.entry-title',
-            'h1.post-title',
-            '.single-title h1',
-            'article h1',
-            'h1',
-            '.title h1',
-            '.entry-header h1'
-        ]
-        
-        for selector in selectors:
-            element = soup.select_one(selector)
-            if element:
-                return element.get_text(strip=True)
-        
-        # Fallback al título de la página
-        title_tag = soup.find('title')
-        if title_tag:
-            title_text = title_tag.get_text(strip=True)
-            # Limpiar el título removiendo el nombre del sitio
-            return title_text.replace(' – Pachamama Radio', '').replace(' | Pachamama Radio', '')
-        
-        return None
-    
-    def extract_date(self, soup):
-        """Extrae la fecha de publicación"""
-        # Buscar en diferentes selectores
-        date_selectors = [
-            'time[datetime]',
-            '.entry-date',
-            '.post-date',
-            '.published',
-            '[datetime]'
-        ]
-        
-        for selector in date_selectors:
-            element = soup.select_one(selector)
-            if element:
-                datetime_attr = element.get('datetime')
-                if datetime_attr:
-                    try:
-                        return datetime.fromisoformat(datetime_attr.replace('Z', '+00:00')).strftime('%Y-%m-%d')
-                    except:
-                        pass
-                
-                text_date = element.get_text(strip=True)
-                if text_date:
-                    return self.parse_date_text(text_date)
-        
-        return datetime.now().strftime('%Y-%m-%d')
-    
-    def extract_time(self, soup):
-        """Extrae la hora de publicación"""
-        time_selectors = [
-            'time[datetime]',
-            '.entry-time',
-            '.post-time'
-        ]
-        
-        for selector in time_selectors:
-            element = soup.select_one(selector)
-            if element:
-                datetime_attr = element.get('datetime')
-                if datetime_attr:
-                    try:
-                        return datetime.fromisoformat(datetime_attr.replace('Z', '+00:00')).strftime('%H:%M:%S')
-                    except:
-                        pass
-        
-        return datetime.now().strftime('%H:%M:%S')
-    
-    def parse_date_text(self, date_text):
-        """Convierte texto de fecha a formato estándar"""
-        # Patrones comunes en español
-        months = {
-            'enero': '01', 'febrero': '02', 'marzo': '03', 'abril': '04',
-            'mayo': '05', 'junio': '06', 'julio': '07', 'agosto': '08',
-            'septiembre': '09', 'octubre': '10', 'noviembre': '11', 'diciembre': '12'
-        }
-        
-        date_text = date_text.lower()
-        for month_name, month_num in months.items():
-            if month_name in date_text:
-                # Buscar día y año
-                numbers = re.findall(r'\d+', date_text)
-                if len(numbers) >= 2:
-                    day = numbers[0].zfill(2)
-                    year = numbers[-1] if len(numbers[-1]) == 4 else f"20{numbers[-1]}"
-                    return f"{year}-{month_num}-{day}"
-        
-        return datetime.now().strftime('%Y-%m-%d')
-    
-    def extract_content(self, soup):
-        """Extrae el contenido completo del artículo"""
-        content_selectors = [
-            '.entry-content',
-            '.post-content',
-            'article .content',
-            '.single-content',
-            '[class*="content"]',
-            'article p'
-        ]
-        
-        content_text = ""
-        for selector in content_selectors:
-            elements = soup.select(selector)
-            for element in elements:
-                # Remover scripts y estilos
-                for script in element(["script", "style"]):
-                    script.decompose()
-                
-                text = element.get_text(separator=' ', strip=True)
-                if len(text) > len(content_text):
-                    content_text = text
-        
-        return content_text if content_text else "Contenido no disponible"
-    
-    def extract_summary(self, soup, content):
-        """Extrae o genera un resumen del artículo"""
-        # Buscar resumen explícito
-        summary_selectors = [
-            '.excerpt',
-            '.entry-summary',
-            '.post-excerpt',
-            'meta[name="description"]'
-        ]
-        
-        for selector in summary_selectors:
-            element = soup.select_one(selector)
-            if element:
-                if element.name == 'meta':
-                    return element.get('content', '').strip()
-                return element.get_text(strip=True)
-        
-        # Generar resumen de las primeras líneas del contenido
+    def summarize(self, content):
+        """Genera un resumen con las primeras frases del contenido"""
         if content and len(content) > 100:
             sentences = content.split('. ')[:2]
             return '. '.join(sentences) + '.' if sentences else content[:200] + '...'
         
         return content[:200] + '...' if content else "Resumen no disponible"
     
-    def extract_category(self, soup, url):
-        """Extrae la categoría del artículo"""
-        # Buscar en breadcrumbs y categorías
-        category_selectors = [
-            '.category',
-            '.post-category',
-            '.entry-category',
-            '.breadcrumb a',
-            'meta[property="article:section"]'
-        ]
-        
-        for selector in category_selectors:
-            element = soup.select_one(selector)
-            if element:
-                if element.name == 'meta':
-                    return element.get('content', '').strip()
-                return element.get_text(strip=True)
-        
-        # Extraer de la URL
+    def category_from_url(self, url):
+        """Categoría deducida de la URL cuando la página no la indica"""
         url_parts = url.split('/')
         for part in url_parts:
             if part in ['puno', 'nacional', 'internacional', 'deportes', 'cultura', 'politica']:
@@ -362,61 +208,6 @@ class PachamamaRadioScraper:
         
         return "General"
     
-    def extract_author(self, soup):
-        """Extrae el autor del artículo"""
-        author_selectors = [
-            '.author',
-            '.post-author',
-            '.entry-author',
-            '[rel="author"]',
-            'meta[name="author"]'
-        ]
-        
-        for selector in author_selectors:
-            element = soup.select_one(selector)
-            if element:
-                if element.name == 'meta':
-                    return element.get('content', '').strip()
-                return element.get_text(strip=True)
-        
-        return "Redacción Pachamama Radio"
-    
-    def extract_tags(self, soup):
-        """Extrae las etiquetas del artículo"""
-        tags = []
-        tag_selectors = [
-            '.tag',
-            '.post-tag',
-            '.entry-tags a',
-            'meta[property="article:tag"]'
-        ]
-        
-        for selector in tag_selectors:
-            elements = soup.select(selector)
-            for element in elements:
-                if element.name == 'meta':
-                    tags.append(element.get('content', '').strip())
-                else:
-                    tag_text = element.get_text(strip=True)
-                    if tag_text:
-                        tags.append(tag_text)
-        
-        return list(set(tags)) if tags else []
-    
-    def extract_images(self, soup):
-        """Extrae las URLs de las imágenes del artículo"""
-        images = []
-        img_elements = soup.find_all('img')
-        
-        for img in img_elements:
-            src = img.get('src') or img.get('data-src')
-            if src:
-                full_url = urljoin(self.base_url, src)
-                if full_url not in images:
-                    images.append(full_url)
-        
-        return images
-    
     def scrape_all_articles(self):
         """Función principal que extrae todas las noticias"""
         self.logger.info("Iniciando scraping de Pachamamaradio.org...")
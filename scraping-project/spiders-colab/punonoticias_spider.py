@@ -1,5 +1,6 @@
 import json
-import re
+import os
+import sys
 import time
 from datetime import datetime
 from urllib.parse import urljoin, urlparse
@@ -8,6 +9,12 @@ import pandas as pd
 import requests
 from bs4 import BeautifulSoup
 
+# Agregar el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spiders.extraction import ArticleExtractor
+from spiders.html_parser import parse_html
+
 
 class PunoNoticiasScraper:
     def __init__(self):
@@ -18,6 +25,7 @@ class PunoNoticiasScraper:
         })
         self.all_news = []
         self.processed_urls = set()
+        self.extractor = ArticleExtractor.load('punonoticias')
         
     def get_page_content(self, url, retries=3):
         """Obtener contenido de una página con reintentos"""
@@ -34,32 +42,6 @@ class PunoNoticiasScraper:
                     print(f"No se pudo acceder a {url} después de {retries} intentos")
                     return None
                     
-    def extract_date_from_text(self, text):
-        """Extraer fecha del texto"""
-        # Patrones comunes de fecha
-        patterns = [
-            r'(\d{1,2})\s+(enero|febrero|marzo|abril|mayo|junio|julio|agosto|septiembre|octubre|noviembre|diciembre),?\s+(\d{4})',
-            r'(\d{1,2})/(\d{1,2})/(\d{4})',
-            r'(\d{4})-(\d{1,2})-(\d{1,2})'
-        ]
-        
-        months = {
-            'enero': '01', 'febrero': '02', 'marzo': '03', 'abril': '04',
-            'mayo': '05', 'junio': '06', 'julio': '07', 'agosto': '08',
-            'septiembre': '09', 'octubre': '10', 'noviembre': '11', 'diciembre': '12'
-        }
-        
-        for pattern in patterns:
-            match = re.search(pattern, text.lower())
-            if match:
-                if 'enero' in pattern:  # Formato con nombre de mes
-                    day, month_name, year = match.groups()
-                    month = months.get(month_name, '01')
-                    return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
-                else:  # Otros formatos
-                    return match.group(0)
-        return None
-    
     def get_all_article_links(self):
         """Obtener todos los enlaces de artículos del sitio"""
         article_links = set()
@@ -157,166 +139,28 @@ class PunoNoticiasScraper:
         if not page:
             return None
         
-        soup = BeautifulSoup(page.content, 'html.parser')
-        
-        # Extraer datos
-        article_data = {
-            'url': url,
-            'fecha_extraccion': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        
-        # Título
-        title_selectors = [
-            'h1.entry-title',
-            'h1.post-title',
-            'h1.article-title',
-            'h1',
-            '.entry-title',
-            '.post-title',
-            'title'
-        ]
-        
-        article_data['titulo'] = None
-        for selector in title_selectors:
-            title_elem = soup.select_one(selector)
-            if title_elem:
-                article_data['titulo'] = title_elem.get_text().strip()
-                break
-        
-        # Si no se encuentra título en los selectores, usar el title de la página
-        if not article_data['titulo']:
-            page_title = soup.find('title')
-            if page_title:
-                article_data['titulo'] = page_title.get_text().replace(' - Puno Noticias', '').strip()
-        
-        # Fecha y hora
-        date_selectors = [
-            '.entry-date',
-            '.post-date',
-            '.published',
-            '.date',
-            'time',
-            '.entry-meta'
-        ]
-        
-        article_data['fecha'] = None
-        article_data['hora'] = None
-        
-        for selector in date_selectors:
-            date_elem = soup.select_one(selector)
-            if date_elem:
-                date_text = date_elem.get_text().strip()
-                extracted_date = self.extract_date_from_text(date_text)
-                if extracted_date:
-                    article_data['fecha'] = extracted_date
-                    # Intentar extraer hora
-                    time_match = re.search(r'(\d{1,2}):(\d{2})', date_text)
-                    if time_match:
-                        article_data['hora'] = time_match.group(0)
-                    break
-        
-        # Contenido completo
-        content_selectors = [
-            '.entry-content',
-            '.post-content',
-            '.article-content',
-            '.content',
-            'article'
-        ]
-        
-        article_data['contenido'] = None
-        for selector in content_selectors:
-            content_elem = soup.select_one(selector)
-            if content_elem:
-                # Limpiar scripts y estilos
-                for script in content_elem(["script", "style"]):
-                    script.decompose()
-                article_data['contenido'] = content_elem.get_text().strip()
-                break
+        # Selectores declarados en spiders/profiles/punonoticias.json
+        data = self.extractor.extract(parse_html(page.content), url)
+        contenido = data['contenido']
         
         # Resumen (primeros 200 caracteres del contenido si no hay excerpt)
-        excerpt_selectors = ['.entry-summary', '.post-excerpt', '.excerpt']
-        article_data['resumen'] = None
-        
-        for selector in excerpt_selectors:
-            excerpt_elem = soup.select_one(selector)
-            if excerpt_elem:
-                article_data['resumen'] = excerpt_elem.get_text().strip()
-                break
-        
-        if not article_data['resumen'] and article_data['contenido']:
-            article_data['resumen'] = article_data['contenido'][:200] + "..." if len(article_data['contenido']) > 200 else article_data['contenido']
-        
-        # Categoría
-        category_selectors = [
-            '.entry-categories a',
-            '.post-categories a',
-            '.category a',
-            '.categories a'
-        ]
-        
-        categories = []
-        for selector in category_selectors:
-            cat_elems = soup.select(selector)
-            for cat_elem in cat_elems:
-                categories.append(cat_elem.get_text().strip())
-        
-        article_data['categoria'] = ', '.join(categories) if categories else None
-        
-        # Autor
-        author_selectors = [
-            '.author a',
-            '.entry-author a',
-            '.post-author a',
-            '.by-author',
-            '.author-name'
-        ]
-        
-        article_data['autor'] = None
-        for selector in author_selectors:
-            author_elem = soup.select_one(selector)
-            if author_elem:
-                article_data['autor'] = author_elem.get_text().strip()
-                break
-        
-        # Tags
-        tag_selectors = [
-            '.entry-tags a',
-            '.post-tags a',
-            '.tags a',
-            '.tag a'
-        ]
-        
-        tags = []
-        for selector in tag_selectors:
-            tag_elems = soup.select(selector)
-            for tag_elem in tag_elems:
-                tags.append(tag_elem.get_text().strip())
-        
-        article_data['tags'] = ', '.join(tags) if tags else None
-        
-        # Imágenes
-        img_selectors = [
-            '.entry-content img',
-            '.post-content img',
-            '.featured-image img',
-            'article img',
-            'img'
-        ]
+        resumen = data['resumen']
+        if not resumen and contenido:
+            resumen = contenido[:200] + "..." if len(contenido) > 200 else contenido
         
-        images = []
-        for selector in img_selectors:
-            img_elems = soup.select(selector)
-            for img in img_elems:
-                src = img.get('src') or img.get('data-src')
-                if src:
-                    full_img_url = urljoin(url, src)
-                    if full_img_url not in images:
-                        images.append(full_img_url)
-        
-        article_data['link_imagenes'] = ', '.join(images) if images else None
-        
-        return article_data
+        return {
+            'url': url,
+            'fecha_extraccion': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'titulo': data['titulo'],
+            'fecha': data['fecha'],
+            'hora': data['hora'],
+            'contenido': contenido,
+            'resumen': resumen,
+            'categoria': ', '.join(data['categoria']) or None,
+            'autor': data['autor'],
+            'tags': ', '.join(data['tags']) or None,
+            'link_imagenes': ', '.join(data['imagenes']) or None
+        }
     
     def scrape_all_news(self):
         """Scraping completo de todas las noticias"""
@@ -1,6 +1,8 @@
 import csv
 import json
+import os
 import re
+import sys
 import threading
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -11,6 +13,12 @@ import pandas as pd
 import requests
 from bs4 import BeautifulSoup
 
+# Agregar el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spiders.extraction import ArticleExtractor
+from spiders.html_parser import parse_html
+
 
 class DiarioSinFronterasScraper:
     def __init__(self):
@@ -28,6 +36,7 @@ class DiarioSinFronterasScraper:
         self.all_news = []
         self.processed_urls = set()
         self.lock = threading.Lock()
+        self.extractor = ArticleExtractor.load('sinfronteras')
         
     def get_page(self, url, retries=3):
         """Obtiene el contenido de una página con reintentos"""
@@ -43,266 +52,28 @@ class DiarioSinFronterasScraper:
                 else:
                     return None
     
-    def extract_images(self, soup):
-        """Extrae todas las imágenes de un artículo"""
-        images = []
-        img_selectors = [
-            'img[src]',
-            'img[data-src]',
-            'img[data-lazy-src]',
-            '.wp-post-image',
-            '.featured-image img',
-            '.post-thumbnail img',
-            '.entry-content img',
-            '.article-content img'
-        ]
-        
-        for selector in img_selectors:
-            img_tags = soup.select(selector)
-            for img in img_tags:
-                src = (img.get('src') or 
-                      img.get('data-src') or 
-                      img.get('data-lazy-src') or 
-                      img.get('data-original'))
-                if src and src not in [img.split('?')[0] for img in images]:
-                    full_url = urljoin(self.base_url, src)
-                    if self.is_valid_image_url(full_url):
-                        images.append(full_url)
-        return images
-    
-    def is_valid_image_url(self, url):
-        """Verifica si la URL es una imagen válida"""
-        image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg']
-        return any(ext in url.lower() for ext in image_extensions)
-    
-    def clean_text(self, text):
-        """Limpia y normaliza el texto"""
-        if not text:
-            return ""
-        # Eliminar espacios extra y caracteres especiales
-        text = re.sub(r'\s+', ' ', text.strip())
-        text = re.sub(r'[\r\n\t]', ' ', text)
-        text = re.sub(r'[^\w\s\-.,;:!?()áéíóúüñÁÉÍÓÚÜÑ]', ' ', text)
-        return text.strip()
-    
-    def extract_date_time(self, soup):
-        """Extrae fecha y hora del artículo"""
-        fecha = ""
-        hora = ""
-        
-        # Múltiples selectores para fecha
-        date_selectors = [
-            'time[datetime]',
-            '.entry-date',
-            '.post-date',
-            '.published',
-            '.date',
-            '.post-meta time',
-            '.entry-meta time',
-            'meta[property="article:published_time"]',
-            'meta[name="article:published_time"]',
-            '.post-published-date'
-        ]
-        
-        for selector in date_selectors:
-            if selector.startswith('meta'):
-                date_elem = soup.select_one(selector)
-                if date_elem:
-                    content = date_elem.get('content')
-                    if content:
-                        try:
-                            dt = datetime.fromisoformat(content.replace('Z', '+00:00'))
-                            fecha = dt.strftime('%Y-%m-%d')
-                            hora = dt.strftime('%H:%M:%S')
-                            return fecha, hora
-                        except:
-                            continue
-            else:
-                date_elem = soup.select_one(selector)
-                if date_elem:
-                    datetime_attr = date_elem.get('datetime')
-                    if datetime_attr:
-                        try:
-                            dt = datetime.fromisoformat(datetime_attr.replace('Z', '+00:00'))
-                            fecha = dt.strftime('%Y-%m-%d')
-                            hora = dt.strftime('%H:%M:%S')
-                            return fecha, hora
-                        except:
-                            pass
-                    
-                    # Extraer texto de fecha
-                    date_text = self.clean_text(date_elem.get_text())
-                    if date_text and len(date_text) > 5:
-                        fecha = date_text
-                        return fecha, hora
-        
-        return fecha, hora
-    
     def extract_article_data(self, article_url):
         """Extrae todos los datos de un artículo específico"""
         try:
             response = self.get_page(article_url)
             if not response:
                 return None
-                
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extraer título con múltiples selectores
-            title_selectors = [
-                'h1.entry-title',
-                'h1.post-title',
-                'h1.article-title',
-                '.post-header h1',
-                '.entry-header h1',
-                'article h1',
-                '.single-post h1',
-                'h1',
-                'title'
-            ]
-            
-            title = ""
-            for selector in title_selectors:
-                title_elem = soup.select_one(selector)
-                if title_elem:
-                    title = self.clean_text(title_elem.get_text())
-                    if title and len(title) > 5:
-                        break
-            
-            # Extraer fecha y hora
-            fecha, hora = self.extract_date_time(soup)
-            
-            # Extraer resumen/excerpt
-            summary_selectors = [
-                '.entry-excerpt',
-                '.post-excerpt',
-                '.excerpt',
-                '.lead',
-                '.summary',
-                '.post-summary',
-                'meta[name="description"]',
-                'meta[property="og:description"]',
-                '.entry-content p:first-of-type'
-            ]
-            
-            resumen = ""
-            for selector in summary_selectors:
-                if selector.startswith('meta'):
-                    summary_elem = soup.select_one(selector)
-                    if summary_elem:
-                        content = summary_elem.get('content')
-                        if content:
-                            resumen = self.clean_text(content)
-                            break
-                else:
-                    summary_elem = soup.select_one(selector)
-                    if summary_elem:
-                        text = self.clean_text(summary_elem.get_text())
-                        if text and len(text) > 20:
-                            resumen = text[:300] + "..." if len(text) > 300 else text
-                            break
-            
-            # Extraer contenido principal
-            content_selectors = [
-                '.entry-content',
-                '.post-content',
-                '.article-content',
-                '.content',
-                'article .text',
-                '.post-body',
-                '.single-content',
-                '.post-text',
-                'article'
-            ]
-            
-            contenido = ""
-            for selector in content_selectors:
-                content_elem = soup.select_one(selector)
-                if content_elem:
-                    # Eliminar elementos no deseados
-                    for unwanted in content_elem.find_all(['script', 'style', 'nav', 'aside', 'footer', 'header', '.ads', '.advertisement']):
-                        unwanted.decompose()
-                    
-                    text = self.clean_text(content_elem.get_text())
-                    if text and len(text) > 50:
-                        contenido = text
-                        break
-            
-            # Extraer categoría
-            category_selectors = [
-                '.category a',
-                '.post-category a',
-                '.entry-category a',
-                '.cat-links a',
-                '[rel="category tag"]',
-                '.breadcrumb a',
-                '.post-categories a',
-                '.entry-meta .category'
-            ]
-            
-            categorias = []
-            for selector in category_selectors:
-                cat_elems = soup.select(selector)
-                for cat_elem in cat_elems:
-                    cat_text = self.clean_text(cat_elem.get_text())
-                    if cat_text and cat_text not in categorias:
-                        categorias.append(cat_text)
-            
-            categoria = ", ".join(categorias) if categorias else ""
-            
-            # Extraer autor
-            author_selectors = [
-                '.author a',
-                '.post-author a',
-                '.entry-author a',
-                '[rel="author"]',
-                '.byline a',
-                '.writer a',
-                '.author-name',
-                '.post-meta .author',
-                '.entry-meta .author'
-            ]
-            
-            autor = ""
-            for selector in author_selectors:
-                author_elem = soup.select_one(selector)
-                if author_elem:
-                    autor = self.clean_text(author_elem.get_text())
-                    if autor and len(autor) > 2:
-                        break
-            
-            # Extraer tags
-            tag_selectors = [
-                '.tags a',
-                '.post-tags a',
-                '.entry-tags a',
-                '[rel="tag"]',
-                '.tag-links a',
-                '.post-meta .tags a'
-            ]
-            
-            tags = []
-            for selector in tag_selectors:
-                tag_elems = soup.select(selector)
-                for tag_elem in tag_elems:
-                    tag_text = self.clean_text(tag_elem.get_text())
-                    if tag_text and tag_text not in tags:
-                        tags.append(tag_text)
             
-            # Extraer imágenes
-            images = self.extract_images(soup)
+            # Selectores declarados en spiders/profiles/sinfronteras.json
+            data = self.extractor.extract(parse_html(response.content), article_url)
             
             return {
-                'titulo': title,
-                'fecha': fecha,
-                'hora': hora,
-                'resumen': resumen,
-                'contenido': contenido,
-                'categoria': categoria,
-                'autor': autor,
-                'tags': ", ".join(tags) if tags else "",
+                'titulo': data['titulo'] or "",
+                'fecha': data['fecha'] or "",
+                'hora': data['hora'] or "",
+                'resumen': data['resumen'] or "",
+                'contenido': data['contenido'] or "",
+                'categoria': ", ".join(data['categoria']),
+                'autor': data['autor'] or "",
+                'tags': ", ".join(data['tags']),
                 'url': article_url,
                 'fecha_extraccion': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'link_imagenes': ", ".join(images) if images else ""
+                'link_imagenes': ", ".join(data['imagenes'])
             }
             
         except Exception as e:
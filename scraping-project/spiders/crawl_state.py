@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Estado de rastreo persistente por fuente (SQLite en data/<fuente>/)
+Guarda las URLs ya vistas con su ETag, Last-Modified, hash del contenido y
+fecha del último rastreo, para que el modo incremental no vuelva a
+descargar lo que ya está guardado.
+"""
+
+import hashlib
+import os
+import sqlite3
+from datetime import datetime
+
+STATE_FILENAME = 'crawl_state.sqlite3'
+
+# Tamaño de lote para las consultas IN (...) de SQLite
+QUERY_CHUNK = 500
+
+
+def content_hash(content):
+    """Hash estable del cuerpo descargado"""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return hashlib.sha1(content or b'').hexdigest()
+
+
+class CrawlState:
+    """Almacén de URLs rastreadas de una fuente"""
+
+    def __init__(self, data_folder, commit_every=50):
+        os.makedirs(data_folder, exist_ok=True)
+        self.path = os.path.join(data_folder, STATE_FILENAME)
+        self.commit_every = commit_every
+        self._pending_writes = 0
+        self._run_id = None
+
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                lastmod TEXT,
+                content_hash TEXT,
+                first_seen TEXT,
+                last_crawled TEXT
+            );
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                mode TEXT,
+                started_at TEXT,
+                finished_at TEXT,
+                new_articles INTEGER
+            );
+        """)
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+    def get(self, url):
+        """Metadatos guardados de una URL o None si nunca se rastreó"""
+        row = self.conn.execute(
+            "SELECT etag, last_modified, lastmod, content_hash, last_crawled FROM urls WHERE url = ?",
+            (url,)
+        ).fetchone()
+        if not row:
+            return None
+        return dict(zip(('etag', 'last_modified', 'lastmod', 'content_hash', 'last_crawled'), row))
+
+    def known_lastmods(self, urls):
+        """{url: lastmod} de las URLs que ya están en el estado"""
+        urls = list(urls)
+        known = {}
+        for start in range(0, len(urls), QUERY_CHUNK):
+            chunk = urls[start:start + QUERY_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            for url, lastmod in self.conn.execute(
+                f"SELECT url, lastmod FROM urls WHERE url IN ({placeholders})", chunk
+            ):
+                known[url] = lastmod
+        return known
+
+    def all_known(self, urls):
+        """True si todas las URLs ya fueron rastreadas (una racha conocida)"""
+        urls = set(urls)
+        return bool(urls) and len(self.known_lastmods(urls)) == len(urls)
+
+    def filter_new(self, urls, lastmods=None):
+        """
+        Devuelve solo las URLs que hay que descargar: las desconocidas y las
+        que el sitemap marca con un lastmod distinto al guardado.
+        """
+        lastmods = lastmods or {}
+        known = self.known_lastmods(urls)
+        pending = []
+        for url in urls:
+            if url not in known:
+                pending.append(url)
+            elif lastmods.get(url) and lastmods[url] != known[url]:
+                pending.append(url)
+        return pending
+
+    def last_crawl_time(self):
+        row = self.conn.execute(
+            "SELECT MAX(finished_at) FROM runs WHERE finished_at IS NOT NULL"
+        ).fetchone()
+        return row[0] if row else None
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+    def record(self, url, response=None, lastmod=None):
+        """Marca una URL como rastreada con sus validadores y hash"""
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        headers = response.headers if response is not None else {}
+        self.conn.execute("""
+            INSERT INTO urls (url, etag, last_modified, lastmod, content_hash, first_seen, last_crawled)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                etag = COALESCE(excluded.etag, urls.etag),
+                last_modified = COALESCE(excluded.last_modified, urls.last_modified),
+                lastmod = COALESCE(excluded.lastmod, urls.lastmod),
+                content_hash = COALESCE(excluded.content_hash, urls.content_hash),
+                last_crawled = excluded.last_crawled
+        """, (
+            url,
+            headers.get('ETag'),
+            headers.get('Last-Modified'),
+            lastmod,
+            content_hash(response.content) if response is not None else None,
+            now,
+            now,
+        ))
+        self._pending_writes += 1
+        if self._pending_writes >= self.commit_every:
+            self.commit()
+
+    def start_run(self, mode):
+        cursor = self.conn.execute(
+            "INSERT INTO runs (mode, started_at) VALUES (?, ?)",
+            (mode, datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        )
+        self._run_id = cursor.lastrowid
+        self.commit()
+
+    def finish_run(self, new_articles):
+        if self._run_id is None:
+            return
+        self.conn.execute(
+            "UPDATE runs SET finished_at = ?, new_articles = ? WHERE id = ?",
+            (datetime.now().strftime('%Y-%m-%d %H:%M:%S'), new_articles, self._run_id)
+        )
+        self._run_id = None
+        self.commit()
+
+    def commit(self):
+        self.conn.commit()
+        self._pending_writes = 0
+
+    def close(self):
+        self.commit()
+        self.conn.close()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Envío de los artículos a PostgreSQL durante el rastreo
+Cada artículo extraído se escribe en el NDJSON del rastreo (JsonlSink) y se
+pone en una cola; un hilo la vacía en micro-lotes con BulkLoader (COPY +
+INSERT ... ON CONFLICT (url)), así las noticias aparecen en la API a los
+pocos segundos de extraerse y no hay que migrar ficheros al final.
+
+Un lote se escribe al juntar SINK_DB_BATCH_SIZE artículos o cuando el más
+antiguo lleva SINK_DB_FLUSH_SECONDS esperando. Si la base de datos va más
+lenta que el rastreo, la cola se llena (SINK_DB_MAX_PENDING artículos) y
+`append` espera: las descargas se frenan en vez de acumular memoria.
+
+Los CSV/JSON pasan a ser un archivo opcional (SINK_ARCHIVE_FILES). Se
+generan igualmente si algún lote no se pudo guardar, para poder migrarlo
+después desde los ficheros.
+
+Variables de entorno: SINK_DB_ENABLED, SINK_DB_BATCH_SIZE,
+SINK_DB_FLUSH_SECONDS, SINK_DB_MAX_PENDING, SINK_ARCHIVE_FILES
+"""
+
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+
+import psycopg2
+
+# Agregar el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bulk_loader import BulkLoader
+from config.redis_config import DATABASE_URL
+from spiders.fetcher import ABORT_ERRORS
+from spiders.jsonl_sink import JsonlSink
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_FLUSH_SECONDS = 15
+DEFAULT_MAX_PENDING = 500
+
+_CLOSE = object()
+
+
+def db_enabled():
+    return os.getenv('SINK_DB_ENABLED', 'true').lower() == 'true'
+
+
+def archive_enabled():
+    return os.getenv('SINK_ARCHIVE_FILES', 'true').lower() == 'true'
+
+
+class DbSink:
+    """
+    JsonlSink que además guarda cada artículo en PostgreSQL.
+
+    Se usa igual que el JsonlSink que envuelve (`append`, `len`, iterar,
+    `export_csv`...); `close()` espera a que se escriba el último lote.
+    La conexión se abre con el primer artículo, no al crear el spider; si
+    no hay conexión con PostgreSQL se comporta como el JsonlSink solo.
+    """
+
+    def __init__(self, sink, fuente, batch_size=None, flush_seconds=None, max_pending=None, connect=None):
+        self.sink = sink
+        self.fuente = fuente
+        self.batch_size = batch_size or int(os.getenv('SINK_DB_BATCH_SIZE', DEFAULT_BATCH_SIZE))
+        self.flush_seconds = flush_seconds or float(os.getenv('SINK_DB_FLUSH_SECONDS', DEFAULT_FLUSH_SECONDS))
+        max_pending = max_pending or int(os.getenv('SINK_DB_MAX_PENDING', DEFAULT_MAX_PENDING))
+        self._connect = connect or (lambda: psycopg2.connect(DATABASE_URL))
+        self._queue = queue.Queue(maxsize=max_pending)
+        self.inserted = 0
+        self.skipped = 0
+        self.failed = 0
+        self.batches = 0
+        self.connected = False
+        self._started = False
+        self._writer = None
+        self._conn = None
+
+    def _start(self):
+        """Conecta y arranca el hilo escritor con el primer artículo (una sola vez)"""
+        self._started = True
+        try:
+            self._conn = self._connect()
+            self.connected = True
+        except ABORT_ERRORS:
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️ PostgreSQL no disponible ({e}): {self.fuente} solo se guardará en ficheros")
+            return
+        self._loader = BulkLoader(self._conn, default_fuente=self.fuente)
+        self._writer = threading.Thread(target=self._run, name=f"db-sink-{self.fuente}", daemon=True)
+        self._writer.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.sink)
+
+    def __bool__(self):
+        return bool(self.sink)
+
+    def __iter__(self):
+        return iter(self.sink)
+
+    def __getattr__(self, name):
+        # files, iter_articles, export_csv, export_json... del JsonlSink
+        return getattr(self.sink, name)
+
+    @property
+    def stored_in_db(self):
+        """Todos los artículos del rastreo llegaron a PostgreSQL"""
+        return (self.connected or not self._started) and self.failed == 0
+
+    def append(self, article):
+        self.sink.append(article)
+        if not self._started:
+            self._start()
+        if self._writer is not None:
+            # Bloquea si la cola está llena (contrapresión sobre el rastreo)
+            self._queue.put(article)
+
+    def _run(self):
+        closing = False
+        while not closing:
+            article = self._queue.get()
+            if article is _CLOSE:
+                break
+            batch = [article]
+            deadline = time.monotonic() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    article = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if article is _CLOSE:
+                    closing = True
+                    break
+                batch.append(article)
+            self._write(batch)
+
+    def _write(self, batch):
+        try:
+            inserted, skipped = self._loader.load(batch)
+            self.inserted += inserted
+            self.skipped += skipped
+            self.batches += 1
+        except Exception as e:
+            self.failed += len(batch)
+            logger.error(f"❌ Error guardando {len(batch)} artículos de {self.fuente} en PostgreSQL: {e}")
+            if self._conn.closed:
+                # Conexión perdida: se reintenta con el siguiente lote
+                try:
+                    self._conn = self._connect()
+                    self._loader = BulkLoader(self._conn, default_fuente=self.fuente)
+                except Exception as reconnect_error:
+                    logger.error(f"❌ No se pudo reconectar con PostgreSQL: {reconnect_error}")
+
+    def close(self):
+        """Escribe lo pendiente, cierra la conexión y el NDJSON"""
+        if self._writer is not None:
+            self._queue.put(_CLOSE)
+            self._writer.join()
+            self._writer = None
+            self._conn.close()
+            logger.info(
+                f"🗄️ {self.fuente}: {self.inserted} noticias nuevas guardadas durante el rastreo "
+                f"({self.batches} lotes, {self.skipped} ya existentes, {self.failed} con error)"
+            )
+        self.sink.close()
+
+    def db_stats(self):
+        return {
+            'stored_in_db': self.stored_in_db,
+            'inserted': self.inserted,
+            'skipped': self.skipped,
+            'failed': self.failed,
+        }
+
+
+def open_sink(data_folder, prefix, fuente):
+    """NDJSON del rastreo, enviado también a PostgreSQL salvo SINK_DB_ENABLED=false"""
+    sink = JsonlSink(data_folder, prefix)
+    return DbSink(sink, fuente) if db_enabled() else sink
+
+
+def needs_files(news_data):
+    """Hay que generar los CSV/JSON: archivo activado o datos que no llegaron a la BD"""
+    return archive_enabled() or not getattr(news_data, 'stored_in_db', False)
+
+
+def crawl_summary(news_data, csv_file, json_file):
+    """Resumen de un rastreo para quien lo lanzó (p. ej. la tarea de Celery)"""
+    db_stats = news_data.db_stats() if isinstance(news_data, DbSink) else None
+    return {
+        'articles_count': len(news_data),
+        'csv_file': csv_file,
+        'json_file': json_file,
+        'db': db_stats,
+    }
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Descubrimiento de artículos a partir de sitemaps, feeds RSS/Atom y la API
+REST de WordPress. Unas pocas descargas XML/JSON sustituyen a recorrer
+miles de páginas HTML; si el sitio no expone nada, el scraper vuelve a su
+rastreo HTML de siempre.
+"""
+
+import gzip
+import json
+import logging
+import re
+import xml.etree.ElementTree as ET
+from urllib.parse import urljoin, urlsplit
+
+from spiders.fetcher import ABORT_ERRORS
+from url_canon import canonical_url
+
+# Sitemaps hijos que nunca contienen artículos (taxonomías, autores, páginas),
+# reconocidos por una palabra completa del nombre del fichero: post_tag-sitemap,
+# category-sitemap, wp-sitemap-users-1, wp-sitemap-posts-page-1... pero no
+# post-sitemap ni news-sitemap, aunque el dominio o la ruta contengan 'tag'
+SKIP_SITEMAP_RE = re.compile(
+    r'(^|[-_])(taxonomies|tags?|categor(y|ies|ia|ias)|authors?|users?|page)([-_]|$)'
+)
+
+SITEMAP_CANDIDATES = ['/sitemap.xml', '/sitemap_index.xml', '/wp-sitemap.xml', '/post-sitemap.xml']
+FEED_CANDIDATES = ['/feed/']
+WP_POSTS_ENDPOINT = '/wp-json/wp/v2/posts'
+WP_PER_PAGE = 100
+
+logger = logging.getLogger(__name__)
+
+
+def _skip_sitemap(url):
+    """True si el nombre del sitemap indica que no lista artículos"""
+    name = urlsplit(url).path.rstrip('/').rsplit('/', 1)[-1].lower()
+    stem = name.split('.', 1)[0]
+    return bool(SKIP_SITEMAP_RE.search(stem))
+
+
+def _local_name(tag):
+    """Nombre de la etiqueta sin el namespace XML"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _parse_xml(content):
+    """Parsea XML (plano o gzip); devuelve None si no es XML válido"""
+    if content[:2] == b'\x1f\x8b':
+        try:
+            content = gzip.decompress(content)
+        except OSError:
+            return None
+    try:
+        return ET.fromstring(content)
+    except ET.ParseError:
+        return None
+
+
+class SiteDiscovery:
+    """
+    Descubre URLs de artículos de un sitio sin recorrer su HTML.
+
+    `discover()` devuelve un dict {url: lastmod} (lastmod puede ser None).
+    Un dict vacío significa que el sitio no expone un listado completo
+    (sitemap o API) y que hay que rastrear el HTML. El feed solo trae los
+    últimos artículos, así que por sí solo no basta.
+    """
+
+    def __init__(self, fetcher, base_url, is_article_url=None, max_sitemaps=500, max_wp_pages=200):
+        self.fetcher = fetcher
+        self.base_url = base_url.rstrip('/')
+        self.is_article_url = is_article_url or (lambda url: url.startswith(self.base_url))
+        self.max_sitemaps = max_sitemaps
+        self.max_wp_pages = max_wp_pages
+
+    def discover(self):
+        """Versión síncrona de adiscover"""
+        return self.fetcher.run(self.adiscover())
+
+    async def adiscover(self):
+        found = {}
+
+        sitemap_urls = await self._discover_sitemaps()
+        if sitemap_urls:
+            found.update(sitemap_urls)
+            logger.info(f"Sitemaps: {len(sitemap_urls)} artículos en {self.base_url}")
+        else:
+            wp_urls = await self._discover_wp_api()
+            found.update(wp_urls)
+            if wp_urls:
+                logger.info(f"API WordPress: {len(wp_urls)} artículos en {self.base_url}")
+
+        if not found:
+            return {}
+
+        # El feed es barato y trae lo más reciente aunque el sitemap esté desfasado
+        for url, lastmod in (await self._discover_feeds()).items():
+            found.setdefault(url, lastmod)
+
+        # Una entrada por artículo aunque sitemap, feed y API lo enlacen con
+        # variantes (http/https, www, barra final, ?utm_*...)
+        articles = {}
+        for url, lastmod in found.items():
+            url = canonical_url(url, self.base_url)
+            if url and self.is_article_url(url) and articles.get(url) is None:
+                articles[url] = lastmod
+        return articles
+
+    # ------------------------------------------------------------------
+    # Sitemaps
+    # ------------------------------------------------------------------
+    async def _sitemap_roots(self):
+        """Sitemaps declarados en robots.txt más las rutas habituales"""
+        roots = []
+        robots = await self.fetcher.fetch(self.base_url + '/robots.txt')
+        if robots:
+            for line in robots.text.splitlines():
+                if line.lower().startswith('sitemap:'):
+                    roots.append(line.split(':', 1)[1].strip())
+        roots.extend(self.base_url + path for path in SITEMAP_CANDIDATES)
+        return list(dict.fromkeys(roots))
+
+    async def _discover_sitemaps(self):
+        found = {}
+        pending = await self._sitemap_roots()
+        seen = set()
+
+        while pending and len(seen) < self.max_sitemaps:
+            batch = [url for url in pending if url not in seen][:self.max_sitemaps - len(seen)]
+            seen.update(batch)
+            pending = []
+
+            async for _, response in self.fetcher.fetch_many(batch):
+                root = _parse_xml(response.content) if response else None
+                if root is None:
+                    continue
+
+                kind = _local_name(root.tag)
+                if kind == 'sitemapindex':
+                    for loc in self._iter_locs(root, 'sitemap'):
+                        if not _skip_sitemap(loc[0]):
+                            pending.append(loc[0])
+                elif kind == 'urlset':
+                    for url, lastmod in self._iter_locs(root, 'url'):
+                        found[url] = lastmod
+
+        return found
+
+    def _iter_locs(self, root, entry_tag):
+        for entry in root:
+            if _local_name(entry.tag) != entry_tag:
+                continue
+            loc = lastmod = None
+            for child in entry:
+                name = _local_name(child.tag)
+                if name == 'loc' and child.text:
+                    loc = child.text.strip()
+                elif name == 'lastmod' and child.text:
+                    lastmod = child.text.strip()
+            if loc:
+                yield loc, lastmod
+
+    # ------------------------------------------------------------------
+    # Feeds RSS / Atom
+    # ------------------------------------------------------------------
+    async def _discover_feeds(self):
+        found = {}
+        async for _, response in self.fetcher.fetch_many([self.base_url + path for path in FEED_CANDIDATES]):
+            root = _parse_xml(response.content) if response else None
+            if root is None:
+                continue
+            for element in root.iter():
+                name = _local_name(element.tag)
+                if name == 'item':
+                    link = date = None
+                    for child in element:
+                        child_name = _local_name(child.tag)
+                        if child_name == 'link' and child.text:
+                            link = child.text.strip()
+                        elif child_name == 'pubDate' and child.text:
+                            date = child.text.strip()
+                    if link:
+                        found[link] = date
+                elif name == 'entry':
+                    link = date = None
+                    for child in element:
+                        child_name = _local_name(child.tag)
+                        if child_name == 'link' and child.get('href') and child.get('rel', 'alternate') == 'alternate':
+                            link = child.get('href')
+                        elif child_name == 'updated' and child.text:
+                            date = child.text.strip()
+                    if link:
+                        found[link] = date
+        return found
+
+    # ------------------------------------------------------------------
+    # API REST de WordPress
+    # ------------------------------------------------------------------
+    def _wp_page_url(self, page):
+        return (f"{self.base_url}{WP_POSTS_ENDPOINT}?per_page={WP_PER_PAGE}"
+                f"&page={page}&_fields=link,modified_gmt")
+
+    def _parse_wp_posts(self, response):
+        if not response or 'json' not in response.headers.get('Content-Type', ''):
+            return None
+        try:
+            posts = json.loads(response.content)
+        except ValueError:
+            return None
+        if not isinstance(posts, list):
+            return None
+        return {urljoin(self.base_url, post['link']): post.get('modified_gmt')
+                for post in posts if isinstance(post, dict) and post.get('link')}
+
+    async def _discover_wp_api(self):
+        first = await self.fetcher.fetch(self._wp_page_url(1))
+        found = self._parse_wp_posts(first)
+        if not found:
+            return {}
+
+        try:
+            total_pages = int(first.headers.get('X-WP-TotalPages', '1'))
+        except ValueError:
+            total_pages = 1
+        total_pages = min(total_pages, self.max_wp_pages)
+
+        # El resto de páginas del listado se piden todas a la vez
+        rest = [self._wp_page_url(page) for page in range(2, total_pages + 1)]
+        async for _, response in self.fetcher.fetch_many(rest):
+            found.update(self._parse_wp_posts(response) or {})
+        return found
+
+
+def discover_articles(fetcher, base_url, is_article_url=None):
+    """Atajo síncrono: {url: lastmod} o {} si hay que recurrir al HTML"""
+    try:
+        return SiteDiscovery(fetcher, base_url, is_article_url).discover()
+    except ABORT_ERRORS:
+        raise
+    except Exception as e:
+        logger.warning(f"Descubrimiento por sitemap/feed falló en {base_url}: {e}")
+        return {}
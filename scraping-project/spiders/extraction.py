@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Motor de extracción de artículos guiado por perfiles por fuente
+Cada sitio describe en spiders/profiles/<fuente>.json qué selectores CSS
+probar para cada campo (título, fecha, contenido, categoría, autor, tags,
+imágenes). El perfil se carga y se compila una sola vez por proceso, y el
+motor aprende qué selector acierta en cada sitio para probarlo primero.
+
+Tipos de campo:
+- text:     primer elemento encontrado (de un <meta> se toma `content`)
+- list:     textos de varios elementos; collect=first (primer selector con
+            resultados) o collect=all (todos los selectores)
+- content:  cuerpo del artículo, quitando etiquetas `remove`;
+            strategy=first o strategy=longest
+- datetime: fecha y hora desde atributos ISO o desde el texto en español
+- images:   URLs de imágenes filtrando iconos y tamaños pequeños
+
+La sección opcional "listing" da los selectores de los enlaces de las
+páginas de listado (portada, secciones): articles, pagination y categories.
+"""
+
+import json
+import logging
+import os
+import re
+from datetime import datetime
+from urllib.parse import urljoin
+
+from spiders.html_parser import compile_selector
+from url_canon import canonical_urls
+
+PROFILES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles')
+STATS_FILENAME = 'selector_stats.json'
+
+SPANISH_MONTHS = {
+    'enero': '01', 'febrero': '02', 'marzo': '03', 'abril': '04',
+    'mayo': '05', 'junio': '06', 'julio': '07', 'agosto': '08',
+    'septiembre': '09', 'setiembre': '09', 'octubre': '10', 'noviembre': '11', 'diciembre': '12'
+}
+MONTH_RE = re.compile('|'.join(SPANISH_MONTHS))
+NUMERIC_DATE_RE = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})')
+ISO_DATE_RE = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})')
+TIME_RE = re.compile(r'\b(\d{1,2}):(\d{2})(?::(\d{2}))?\b')
+
+logger = logging.getLogger(__name__)
+
+
+def clean_text(text, mode='normalize'):
+    """
+    Limpieza de texto según el perfil:
+    strip (solo extremos), normalize (colapsa espacios) o strict (además
+    quita símbolos que no sean puntuación básica)
+    """
+    if not text:
+        return ""
+    if mode == 'strip':
+        return text.strip()
+    text = re.sub(r'\s+', ' ', text).strip()
+    if mode == 'strict':
+        text = re.sub(r'[^\w\s\-.,;:!?()áéíóúüñÁÉÍÓÚÜÑ]', ' ', text).strip()
+    return text
+
+
+def parse_iso_datetime(value):
+    """datetime desde un atributo ISO 8601 o None"""
+    try:
+        return datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+
+
+def parse_spanish_date(text):
+    """
+    Fecha YYYY-MM-DD desde texto libre: '5 de mayo de 2024', 'mayo 5, 2024',
+    '05/05/2024' o '2024-05-05'. Devuelve None si no reconoce nada.
+    """
+    if not text:
+        return None
+    text = text.lower()
+
+    match = ISO_DATE_RE.search(text)
+    if match:
+        year, month, day = match.groups()
+        return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
+
+    match = NUMERIC_DATE_RE.search(text)
+    if match:
+        day, month, year = match.groups()
+        return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
+
+    month = MONTH_RE.search(text)
+    if month:
+        numbers = re.findall(r'\d+', TIME_RE.sub(' ', text))
+        days = [n for n in numbers if len(n) <= 2]
+        years = [n for n in numbers if len(n) == 4]
+        if days and (years or len(days) >= 2):
+            year = years[0] if years else f"20{days[-1]}"
+            return f"{year}-{SPANISH_MONTHS[month.group(0)]}-{days[0].zfill(2)}"
+    return None
+
+
+def parse_time(text):
+    """Hora HH:MM:SS desde texto libre o None"""
+    match = TIME_RE.search(text or '')
+    if not match:
+        return None
+    hour, minute, second = match.groups()
+    return f"{hour.zfill(2)}:{minute}:{second or '00'}"
+
+
+class FieldRule:
+    """Campo de un perfil con sus selectores y el recuento de aciertos"""
+
+    def __init__(self, name, spec):
+        self.name = name
+        self.kind = spec.get('type', 'text')
+        self.selectors = list(spec['selectors'])
+        self.options = spec
+        self.hits = {selector: 0 for selector in self.selectors}
+        self._ordered = list(self.selectors)
+
+        # Compilar los selectores una sola vez al cargar el perfil
+        for selector in self.selectors:
+            compile_selector(selector)
+
+    def ordered_selectors(self):
+        """Selectores con los que más aciertan en este sitio primero"""
+        return self._ordered
+
+    def _reorder(self):
+        # Lista nueva en vez de sort() en el sitio: los hilos que comparten el
+        # extractor siempre recorren una lista completa
+        self._ordered = sorted(self.selectors, key=lambda s: (-self.hits[s], self.selectors.index(s)))
+
+    def record_hit(self, selector):
+        self.hits[selector] += 1
+        # Solo se reordena si el selector adelanta al anterior
+        ordered = self._ordered
+        index = ordered.index(selector)
+        if index and self.hits[selector] > self.hits[ordered[index - 1]]:
+            self._reorder()
+
+    def load_hits(self, hits):
+        for selector, count in hits.items():
+            if selector in self.hits:
+                self.hits[selector] = count
+        self._reorder()
+
+
+class ArticleExtractor:
+    """Extrae los campos de un artículo según el perfil de su fuente"""
+
+    _instances = {}
+
+    def __init__(self, profile, stats_path=None, profile_name=None):
+        self.profile_name = profile_name
+        self.source = profile['source']
+        self.base_url = profile.get('base_url', '')
+        text_options = profile.get('text', {})
+        self.clean_mode = text_options.get('clean', 'normalize')
+        self.strip_strings = text_options.get('strip_strings', False)
+        self.defaults = profile.get('defaults', {})
+        self.fields = {name: FieldRule(name, spec) for name, spec in profile['fields'].items()}
+        self.listing = profile.get('listing', {})
+
+        self.stats_path = stats_path
+        if stats_path and os.path.exists(stats_path):
+            try:
+                with open(stats_path, 'r', encoding='utf-8') as f:
+                    for name, hits in json.load(f).items():
+                        if name in self.fields:
+                            self.fields[name].load_hits(hits)
+            except (OSError, ValueError) as e:
+                logger.warning(f"No se pudieron leer las estadísticas de selectores {stats_path}: {e}")
+        # Lo cargado del disco no se vuelve a reportar desde los procesos del pool
+        self._reported = {name: dict(rule.hits) for name, rule in self.fields.items()}
+
+    @classmethod
+    def load(cls, source, stats_dir=None):
+        """Extractor de una fuente; el perfil se lee y compila una vez por proceso"""
+        if source not in cls._instances:
+            with open(os.path.join(PROFILES_DIR, f'{source}.json'), 'r', encoding='utf-8') as f:
+                profile = json.load(f)
+            stats_path = os.path.join(stats_dir, STATS_FILENAME) if stats_dir else None
+            cls._instances[source] = cls(profile, stats_path, profile_name=source)
+        return cls._instances[source]
+
+    def take_hits(self):
+        """Aciertos acumulados desde la última llamada (para los procesos del pool)"""
+        delta = {}
+        for name, rule in self.fields.items():
+            reported = self._reported.setdefault(name, {})
+            changed = {s: n - reported.get(s, 0) for s, n in rule.hits.items() if n != reported.get(s, 0)}
+            if changed:
+                delta[name] = changed
+                reported.update({s: rule.hits[s] for s in changed})
+        return delta
+
+    def add_hits(self, hits):
+        """Suma aciertos registrados en otro proceso"""
+        for name, counts in hits.items():
+            rule = self.fields.get(name)
+            if rule:
+                rule.load_hits({s: rule.hits.get(s, 0) + n for s, n in counts.items()})
+
+    def save_stats(self):
+        """Guarda los aciertos por selector para la próxima ejecución"""
+        if not self.stats_path:
+            return
+        stats = {name: rule.hits for name, rule in self.fields.items()}
+        with open(self.stats_path, 'w', encoding='utf-8') as f:
+            json.dump(stats, f, ensure_ascii=False, indent=2)
+
+    # ------------------------------------------------------------------
+    # Extracción
+    # ------------------------------------------------------------------
+    def extract(self, soup, url, defaults=True):
+        """
+        Devuelve un dict con titulo, fecha, hora, resumen, contenido,
+        categoria, autor (str o None), tags e imagenes (listas).
+        Con defaults=False los campos no encontrados quedan vacíos en vez de
+        tomar los valores "defaults" del perfil.
+        """
+        data = {}
+        for name, rule in self.fields.items():
+            if rule.kind == 'datetime':
+                data['fecha'], data['hora'] = self._extract_datetime(soup, rule)
+            elif rule.kind == 'list':
+                data[name] = self._extract_list(soup, rule)
+            elif rule.kind == 'content':
+                data[name] = self._extract_content(soup, rule)
+            elif rule.kind == 'images':
+                data[name] = self._extract_images(soup, rule, url)
+            else:
+                data[name] = self._extract_text(soup, rule)
+
+        for name, default in (self.defaults.items() if defaults else ()):
+            if not data.get(name):
+                data[name] = self._default_value(default)
+        return data
+
+    def listing_links(self, soup, kind, base_url=None):
+        """
+        URLs canónicas de los enlaces `kind` (articles, pagination o
+        categories) de una página de listado, sin repetir y en el orden de
+        los selectores del perfil.
+        """
+        hrefs = []
+        for selector in self.listing.get(kind, []):
+            hrefs.extend(element.get('href') for element in soup.select(selector))
+        return canonical_urls(filter(None, hrefs), base_url or self.base_url)
+
+    def _default_value(self, default):
+        if default == '{today}':
+            return datetime.now().strftime('%Y-%m-%d')
+        if default == '{now_time}':
+            return datetime.now().strftime('%H:%M:%S')
+        return default
+
+    def _text(self, element, separator=''):
+        """Texto de un elemento; de un <meta> se usa su atributo content"""
+        if element.name == 'meta':
+            return clean_text(element.get('content', ''), self.clean_mode)
+        return clean_text(element.get_text(separator=separator, strip=self.strip_strings), self.clean_mode)
+
+    def _extract_text(self, soup, rule):
+        for selector in rule.ordered_selectors():
+            element = soup.select_one(selector)
+            if not element:
+                continue
+            value = self._text(element)
+            for suffix in rule.options.get('strip_suffixes', []):
+                value = value.replace(suffix, '').strip()
+            if value:
+                rule.record_hit(selector)
+                return value
+        return None
+
+    def _extract_list(self, soup, rule):
+        collect_all = rule.options.get('collect', 'first') == 'all'
+        values = []
+        for selector in rule.ordered_selectors():
+            found = [text for text in (self._text(element) for element in soup.select(selector)) if text]
+            if not found:
+                continue
+            rule.record_hit(selector)
+            values.extend(found)
+            if not collect_all:
+                break
+        if rule.options.get('unique'):
+            values = list(dict.fromkeys(values))
+        return values[:rule.options['max']] if rule.options.get('max') else values
+
+    def _extract_content(self, soup, rule):
+        remove = rule.options.get('remove', ['script', 'style'])
+        separator = rule.options.get('separator', '')
+        longest = rule.options.get('strategy', 'first') == 'longest'
+        best, best_selector = '', None
+        for selector in rule.ordered_selectors():
+            for element in soup.select(selector) if longest else filter(None, [soup.select_one(selector)]):
+                for unwanted in element.find_all(remove):
+                    unwanted.decompose()
+                text = self._text(element, separator)
+                if len(text) > len(best):
+                    best, best_selector = text, selector
+            if best and not longest:
+                break
+        if best_selector:
+            rule.record_hit(best_selector)
+        return best or None
+
+    def _extract_datetime(self, soup, rule):
+        attrs = rule.options.get('attrs', ['datetime', 'content'])
+        raw_text = rule.options.get('text_fallback', 'parse') == 'raw'
+        for selector in rule.ordered_selectors():
+            element = soup.select_one(selector)
+            if not element:
+                continue
+            for attr in attrs:
+                dt = parse_iso_datetime(element.get(attr))
+                if dt:
+                    rule.record_hit(selector)
+                    return dt.strftime('%Y-%m-%d'), dt.strftime('%H:%M:%S')
+            text = clean_text(element.get_text(), 'normalize')
+            fecha = parse_spanish_date(text) or (text if raw_text else None)
+            if fecha:
+                rule.record_hit(selector)
+                return fecha, parse_time(text)
+        return None, None
+
+    def _extract_images(self, soup, rule, url):
+        src_attrs = rule.options.get('src_attrs', ['src', 'data-src'])
+        min_size = rule.options.get('min_size', 100)
+        skip = rule.options.get('skip', ['icon', 'logo', 'avatar', 'button', 'banner'])
+        extensions = rule.options.get('extensions')
+        limit = rule.options.get('max', 2)
+        base = url if rule.options.get('relative_to') == 'page' else self.base_url
+
+        images = []
+        for selector in rule.ordered_selectors():
+            for img in soup.select(selector):
+                src = next((img.get(attr) for attr in src_attrs if img.get(attr)), None)
+                if not src or any(pattern in src.lower() for pattern in skip):
+                    continue
+                try:
+                    if int(img.get('width')) < min_size or int(img.get('height')) < min_size:
+                        continue
+                except (TypeError, ValueError):
+                    pass
+                full_url = urljoin(base, src)
+                if extensions and not any(ext in full_url.lower() for ext in extensions):
+                    continue
+                if full_url.split('?')[0] not in [image.split('?')[0] for image in images]:
+                    images.append(full_url)
+                    if len(images) >= limit:
+                        rule.record_hit(selector)
+                        return images
+            if images:
+                rule.record_hit(selector)
+        return images
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Motor de descarga asíncrono compartido por los spiders locales
+Concurrencia acotada por host, conexiones keep-alive reutilizadas y pausas
+de cortesía que no bloquean el resto de descargas
+"""
+
+import asyncio
+import logging
+from urllib.parse import urlparse
+
+import aiohttp
+from multidict import CIMultiDict
+
+from spiders.html_parser import parse_html
+
+try:
+    # Límite suave de una tarea de Celery: la tarea debe terminar, así que los
+    # `except Exception` del rastreo lo dejan pasar en vez de seguir con otra URL
+    from celery.exceptions import SoftTimeLimitExceeded
+    ABORT_ERRORS = (SoftTimeLimitExceeded,)
+except ImportError:
+    ABORT_ERRORS = ()
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'es-ES,es;q=0.8,en-US;q=0.5,en;q=0.3',
+    'Accept-Encoding': 'gzip, deflate',
+}
+
+# Códigos que merecen reintento; el resto de 4xx se consideran definitivos
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+logger = logging.getLogger(__name__)
+
+
+class FetchResponse:
+    """Respuesta descargada: solo bytes y metadatos, sin parsear"""
+
+    def __init__(self, url, status_code, content, headers, from_cache=False):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.from_cache = from_cache
+        self._document = None
+
+    @property
+    def encoding(self):
+        content_type = self.headers.get('Content-Type', '')
+        if 'charset=' in content_type:
+            return content_type.split('charset=')[-1].split(';')[0].strip()
+        return 'utf-8'
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors='replace')
+
+    @property
+    def document(self):
+        """Árbol HTML del cuerpo; se parsea una única vez por respuesta"""
+        if self._document is None:
+            declared = self.encoding if 'charset=' in self.headers.get('Content-Type', '') else None
+            self._document = parse_html(self.content, encoding=declared)
+        return self._document
+
+
+class AsyncFetcher:
+    """
+    Descargador asíncrono con un pool de conexiones keep-alive.
+
+    - `per_host_concurrency` limita las peticiones simultáneas a un mismo host.
+    - `delay` es la separación mínima entre inicios de petición al mismo host;
+      se espera con asyncio.sleep, así que no frena las demás descargas.
+    - Con `cache` (spiders.http_cache.HttpCache) cada petición se revalida
+      con If-None-Match/If-Modified-Since y un 304 se sirve desde disco; en
+      modo offline no se toca la red.
+    - Los métodos `get` y `for_each` permiten usarlo desde código síncrono.
+    """
+
+    def __init__(self, headers=None, per_host_concurrency=4, delay=0.5, timeout=30,
+                 retries=3, backoff=2, max_connections=32, cache=None):
+        self.headers = dict(DEFAULT_HEADERS)
+        if headers:
+            self.headers.update(headers)
+        self.per_host_concurrency = per_host_concurrency
+        self.delay = delay
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_connections = max_connections
+        self.cache = cache
+
+        self._loop = None
+        self._session = None
+        self._host_semaphores = {}
+        self._host_next_slot = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Núcleo asíncrono
+    # ------------------------------------------------------------------
+    async def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.per_host_concurrency,
+                keepalive_timeout=30,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    def _host_semaphore(self, host):
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.per_host_concurrency)
+        return self._host_semaphores[host]
+
+    async def _wait_turn(self, host):
+        """Reserva el siguiente hueco libre del host y espera sin bloquear"""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        slot = max(now, self._host_next_slot.get(host, 0))
+        self._host_next_slot[host] = slot + self.delay
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def _from_cache(self, cached):
+        if cached is None:
+            return None
+        return FetchResponse(cached.url, cached.status, cached.body, CIMultiDict(cached.headers), from_cache=True)
+
+    async def fetch(self, url, headers=None):
+        """Descarga una URL con reintentos; devuelve FetchResponse o None"""
+        cached = self.cache.lookup(url) if self.cache else None
+        if self.cache and self.cache.offline:
+            # Reproducción offline: solo lo que ya está en disco
+            return self._from_cache(cached)
+
+        request_headers = dict(headers or {})
+        if cached:
+            request_headers.update(cached.conditional_headers())
+
+        host = urlparse(url).netloc
+        semaphore = self._host_semaphore(host)
+        session = await self._get_session()
+
+        for attempt in range(self.retries):
+            try:
+                async with semaphore:
+                    await self._wait_turn(host)
+                    async with session.get(url, headers=request_headers or None) as resp:
+                        content = await resp.read()
+                        response = FetchResponse(str(resp.url), resp.status, content, resp.headers.copy())
+
+                if response.status_code == 304 and cached:
+                    # Sin cambios: el cuerpo sale de la caché
+                    self.cache.touch(url)
+                    return self._from_cache(cached)
+                if response.status_code < 400:
+                    if self.cache:
+                        self.cache.store(url, response.status_code, response.headers, response.content)
+                    return response
+                if response.status_code not in RETRY_STATUS:
+                    logger.warning(f"HTTP {response.status_code} para {url}")
+                    return None
+                logger.warning(f"Error en intento {attempt + 1} para {url}: HTTP {response.status_code}")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"Error en intento {attempt + 1} para {url}: {e}")
+
+            if attempt < self.retries - 1:
+                await asyncio.sleep(self.backoff ** attempt)
+
+        logger.error(f"No se pudo acceder a {url} después de {self.retries} intentos")
+        return None
+
+    async def fetch_many(self, urls, headers=None):
+        """Descarga varias URLs en paralelo y las entrega a medida que terminan"""
+        async def _one(url):
+            return url, await self.fetch(url, headers=headers)
+
+        tasks = [asyncio.ensure_future(_one(url)) for url in urls]
+        try:
+            for future in asyncio.as_completed(tasks):
+                yield await future
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def aclose(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    # ------------------------------------------------------------------
+    # Fachada síncrona para los scrapers existentes
+    # ------------------------------------------------------------------
+    def _get_loop(self):
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        return self._loop
+
+    def run(self, coro):
+        """Ejecuta una corrutina en el event loop propio del fetcher"""
+        return self._get_loop().run_until_complete(coro)
+
+    def get(self, url, headers=None):
+        """Versión síncrona de fetch"""
+        return self.run(self.fetch(url, headers=headers))
+
+    def for_each(self, urls, callback, headers=None):
+        """
+        Descarga `urls` en paralelo y llama a callback(url, response) por cada
+        una en cuanto llega. Devuelve la lista de resultados del callback.
+        """
+        async def _consume():
+            results = []
+            async for url, response in self.fetch_many(urls, headers=headers):
+                results.append(callback(url, response))
+            return results
+
+        return self.run(_consume())
+
+    def close(self):
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.run_until_complete(self.aclose())
+            self._loop.close()
+        self._loop = None
+        # Los semáforos quedan ligados al loop cerrado
+        self._host_semaphores = {}
+        self._host_next_slot = {}
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Capa de parseo HTML de los spiders locales
+- Por defecto usa lxml (C) con selectores CSS compilados una sola vez.
+- Si lxml/cssselect no están instalados, o el documento no se puede
+  parsear, se recurre a BeautifulSoup con 'html.parser'.
+- Los nodos exponen el mismo subconjunto de la API de BeautifulSoup que usan
+  los scrapers (select, select_one, find, find_all, get, get_text,
+  decompose, name), así que el código de extracción no cambia.
+
+Variable de entorno: HTML_PARSER=lxml|bs4
+"""
+
+import logging
+import os
+import re
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    from lxml import etree
+    from lxml.cssselect import CSSSelector
+    from cssselect import SelectorError
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Como BeautifulSoup, get_text no incluye el código de estas etiquetas
+SKIP_TEXT_TAGS = {'script', 'style', 'template'}
+
+META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+
+_compiled_selectors = {}
+
+
+def compile_selector(css):
+    """CSSSelector compilado y memorizado; None si lxml no lo soporta"""
+    if not LXML_AVAILABLE:
+        return None
+    if css not in _compiled_selectors:
+        try:
+            _compiled_selectors[css] = CSSSelector(css)
+        except SelectorError as e:
+            logger.warning(f"Selector CSS no soportado por lxml '{css}': {e}")
+            _compiled_selectors[css] = None
+    return _compiled_selectors[css]
+
+
+def _sniff_encoding(content, declared=None):
+    """Codificación de la cabecera HTTP, del <meta charset> o utf-8"""
+    if declared:
+        return declared
+    match = META_CHARSET_RE.search(content[:4096])
+    if match:
+        return match.group(1).decode('ascii')
+    return 'utf-8'
+
+
+class HtmlNode:
+    """Envoltorio fino de un elemento lxml con la API de BeautifulSoup"""
+
+    __slots__ = ('_element',)
+
+    def __init__(self, element):
+        self._element = element
+
+    @property
+    def name(self):
+        return self._element.tag
+
+    @property
+    def attrs(self):
+        return dict(self._element.attrib)
+
+    def get(self, key, default=None):
+        return self._element.get(key, default)
+
+    def __getitem__(self, key):
+        return self._element.attrib[key]
+
+    def has_attr(self, key):
+        return key in self._element.attrib
+
+    def _iter_strings(self, element, include_tail=False):
+        if element.tag not in SKIP_TEXT_TAGS and isinstance(element.tag, str):
+            if element.text:
+                yield element.text
+            for child in element:
+                yield from self._iter_strings(child, include_tail=True)
+        if include_tail and element.tail:
+            yield element.tail
+
+    def get_text(self, separator='', strip=False):
+        strings = self._iter_strings(self._element)
+        if strip:
+            strings = (text.strip() for text in strings)
+            strings = (text for text in strings if text)
+        return separator.join(strings)
+
+    @property
+    def text(self):
+        return self.get_text()
+
+    def select(self, css):
+        selector = compile_selector(css)
+        if selector is None:
+            return []
+        return [HtmlNode(element) for element in selector(self._element)]
+
+    def select_one(self, css):
+        selector = compile_selector(css)
+        if selector is None:
+            return None
+        for element in selector(self._element):
+            return HtmlNode(element)
+        return None
+
+    def find_all(self, name=None, **attrs):
+        """find_all('a', href=True) / find_all(['script', 'style'])"""
+        names = {name} if isinstance(name, str) else set(name or ())
+        found = []
+        for element in self._element.iter(*names) if names else self._element.iter():
+            if not isinstance(element.tag, str) or element is self._element:
+                continue
+            if all(
+                (key in element.attrib) if value is True else element.get(key) == value
+                for key, value in attrs.items()
+            ):
+                found.append(HtmlNode(element))
+        return found
+
+    # tag(['script', 'style']) equivale a find_all, como en BeautifulSoup
+    __call__ = find_all
+
+    def find(self, name=None, **attrs):
+        found = self.find_all(name, **attrs)
+        return found[0] if found else None
+
+    def decompose(self):
+        """Quita el elemento del árbol conservando el texto que lo sigue"""
+        if self._element.getparent() is not None:
+            self._element.drop_tree()
+
+    def __bool__(self):
+        return True
+
+    def __repr__(self):
+        return f"<HtmlNode {self.name}>"
+
+
+def parse_html(content, encoding=None, backend=None):
+    """
+    Parsea un documento HTML (bytes o str) con el backend configurado.
+    Devuelve un HtmlNode (lxml) o un BeautifulSoup (respaldo).
+    """
+    backend = backend or os.getenv('HTML_PARSER', 'lxml')
+    if backend == 'lxml' and LXML_AVAILABLE and content:
+        try:
+            if isinstance(content, bytes):
+                parser = lxml.html.HTMLParser(encoding=_sniff_encoding(content, encoding))
+                root = lxml.html.document_fromstring(content, parser=parser)
+            else:
+                root = lxml.html.document_fromstring(content)
+            return HtmlNode(root)
+        except (etree.ParserError, LookupError, ValueError) as e:
+            logger.warning(f"lxml no pudo parsear el documento, se usa BeautifulSoup: {e}")
+    return BeautifulSoup(content or b'', 'html.parser')
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Caché HTTP en disco compartida por los spiders locales y el proyecto Scrapy
+- Los cuerpos se guardan comprimidos (gzip) y direccionados por su hash,
+  así dos URLs con el mismo HTML ocupan un solo fichero.
+- Un índice SQLite relaciona cada URL con su cuerpo, estado y cabeceras,
+  y aporta ETag/Last-Modified para revalidar con peticiones condicionales.
+- En modo offline solo se sirve lo cacheado, sin tocar la red.
+
+Variables de entorno: HTTP_CACHE_ENABLED, HTTP_CACHE_OFFLINE, HTTP_CACHE_DIR
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+from datetime import datetime
+
+DEFAULT_CACHE_DIR = 'data/http_cache'
+
+# Cabeceras que no tiene sentido reproducir desde la caché
+SKIP_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection', 'set-cookie'}
+
+
+class CachedResponse:
+    """Entrada del índice; el cuerpo se lee del disco solo si se pide"""
+
+    def __init__(self, cache, url, status, headers, body_hash, stored_at):
+        self._cache = cache
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body_hash = body_hash
+        self.stored_at = stored_at
+
+    @property
+    def body(self):
+        return self._cache.load_body(self.body_hash)
+
+    def conditional_headers(self):
+        """Cabeceras If-None-Match / If-Modified-Since para revalidar"""
+        validators = {}
+        lowered = {key.lower(): value for key, value in self.headers.items()}
+        if lowered.get('etag'):
+            validators['If-None-Match'] = lowered['etag']
+        if lowered.get('last-modified'):
+            validators['If-Modified-Since'] = lowered['last-modified']
+        return validators
+
+
+class HttpCache:
+    """Caché direccionada por contenido con índice por URL"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, offline=False):
+        self.cache_dir = cache_dir
+        self.offline = offline
+        self.objects_dir = os.path.join(cache_dir, 'objects')
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+        self.conn = sqlite3.connect(os.path.join(cache_dir, 'index.sqlite3'))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                status INTEGER,
+                headers TEXT,
+                body_hash TEXT,
+                stored_at TEXT,
+                validated_at TEXT
+            )
+        """)
+        self.conn.commit()
+
+    @classmethod
+    def from_env(cls):
+        """Caché configurada por entorno, o None si está deshabilitada"""
+        if os.getenv('HTTP_CACHE_ENABLED', 'true').lower() != 'true':
+            return None
+        return cls(
+            cache_dir=os.getenv('HTTP_CACHE_DIR', DEFAULT_CACHE_DIR),
+            offline=os.getenv('HTTP_CACHE_OFFLINE', 'false').lower() == 'true',
+        )
+
+    # ------------------------------------------------------------------
+    # Cuerpos direccionados por contenido
+    # ------------------------------------------------------------------
+    def _object_path(self, body_hash):
+        return os.path.join(self.objects_dir, body_hash[:2], body_hash[2:] + '.gz')
+
+    def load_body(self, body_hash):
+        with gzip.open(self._object_path(body_hash), 'rb') as f:
+            return f.read()
+
+    def _write_body(self, body):
+        body_hash = hashlib.sha1(body).hexdigest()
+        path = self._object_path(body_hash)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Escritura atómica: nunca queda un objeto a medias
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+        return body_hash
+
+    # ------------------------------------------------------------------
+    # Índice
+    # ------------------------------------------------------------------
+    def lookup(self, url):
+        row = self.conn.execute(
+            "SELECT status, headers, body_hash, stored_at FROM responses WHERE url = ?", (url,)
+        ).fetchone()
+        if not row:
+            return None
+        status, headers, body_hash, stored_at = row
+        if not os.path.exists(self._object_path(body_hash)):
+            return None
+        return CachedResponse(self, url, status, json.loads(headers), body_hash, stored_at)
+
+    def store(self, url, status, headers, body):
+        """Guarda (o reemplaza) la respuesta de una URL"""
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        headers = {key: value for key, value in headers.items() if key.lower() not in SKIP_HEADERS}
+        body_hash = self._write_body(body)
+        self.conn.execute("""
+            INSERT INTO responses (url, status, headers, body_hash, stored_at, validated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                status = excluded.status,
+                headers = excluded.headers,
+                body_hash = excluded.body_hash,
+                stored_at = excluded.stored_at,
+                validated_at = excluded.validated_at
+        """, (url, status, json.dumps(headers), body_hash, now, now))
+        self.conn.commit()
+
+    def touch(self, url):
+        """Marca una entrada como revalidada (respuesta 304)"""
+        self.conn.execute(
+            "UPDATE responses SET validated_at = ? WHERE url = ?",
+            (datetime.now().strftime('%Y-%m-%d %H:%M:%S'), url)
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Salida en streaming de los scrapers locales (NDJSON en data/<fuente>/)
+Cada artículo se escribe como una línea JSON en cuanto se extrae, en vez de
+acumularlo en memoria hasta el final. El fichero se sincroniza a disco cada
+pocos artículos y rota al superar un tamaño máximo, así que un rastreo
+interrumpido conserva todo lo extraído hasta ese momento.
+
+Los CSV/JSON de siempre se generan al final leyendo los .jsonl línea a
+línea: la memoria usada no depende del tamaño del sitio.
+
+Variables de entorno: SINK_MAX_BYTES, SINK_FSYNC_EVERY
+"""
+
+import csv
+import json
+import logging
+import os
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_FSYNC_EVERY = 50
+
+
+class JsonlSink:
+    """
+    Almacén de artículos de un rastreo respaldado por ficheros NDJSON.
+
+    Se usa como la lista que sustituye: `append(article)` escribe una línea,
+    `len(sink)` cuenta los artículos y `for article in sink` los relee del
+    disco de uno en uno.
+    """
+
+    def __init__(self, data_folder, prefix, max_bytes=None, fsync_every=None):
+        os.makedirs(data_folder, exist_ok=True)
+        self.data_folder = data_folder
+        self.prefix = prefix
+        self.max_bytes = max_bytes or int(os.getenv('SINK_MAX_BYTES', DEFAULT_MAX_BYTES))
+        self.fsync_every = fsync_every or int(os.getenv('SINK_FSYNC_EVERY', DEFAULT_FSYNC_EVERY))
+        self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.files = []
+        self.count = 0
+        self._file = None
+        self._unsynced = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def __bool__(self):
+        return self.count > 0
+
+    def __iter__(self):
+        return self.iter_articles()
+
+    def _open_next(self):
+        self._close_file()
+        path = os.path.join(
+            self.data_folder, f"{self.prefix}_{self.timestamp}_{len(self.files) + 1:03d}.jsonl"
+        )
+        self._file = open(path, 'a', encoding='utf-8')
+        self.files.append(path)
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def _close_file(self):
+        if self._file is not None:
+            self._sync()
+            self._file.close()
+            self._file = None
+
+    def append(self, article):
+        """Escribe un artículo al final del fichero actual"""
+        if self._file is None or self._file.tell() >= self.max_bytes:
+            self._open_next()
+        self._file.write(json.dumps(article, ensure_ascii=False) + '\n')
+        self.count += 1
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every:
+            self._sync()
+
+    def close(self):
+        self._close_file()
+
+    def iter_articles(self):
+        """Relee los artículos escritos, en orden, sin cargarlos todos"""
+        if self._file is not None:
+            self._file.flush()
+        for path in self.files:
+            with open(path, encoding='utf-8') as f:
+                for line_number, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        # Última línea a medio escribir de un rastreo cortado
+                        logger.warning(f"Línea inválida en {path}:{line_number}, se omite")
+
+    def fieldnames(self):
+        """Columnas en el orden en que aparecen, como pandas.DataFrame"""
+        columns = {}
+        for article in self.iter_articles():
+            for key in article:
+                columns.setdefault(key)
+        return list(columns)
+
+    def export_csv(self, filename, encoding='utf-8'):
+        with open(filename, 'w', newline='', encoding=encoding) as f:
+            writer = csv.DictWriter(f, fieldnames=self.fieldnames())
+            writer.writeheader()
+            for article in self.iter_articles():
+                writer.writerow(article)
+        return filename
+
+    def export_json(self, filename, indent=2):
+        """Mismo contenido que json.dump(lista, indent=2), escrito por partes"""
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write('[')
+            for position, article in enumerate(self.iter_articles()):
+                f.write(',\n' if position else '\n')
+                item = json.dumps(article, ensure_ascii=False, indent=indent)
+                f.write(' ' * indent + item.replace('\n', '\n' + ' ' * indent))
+            f.write('\n]' if self.count else ']')
+        return filename
@@ -4,51 +4,60 @@ Spider local para Pachamama Radio - Adaptado desde Colab
 Extrae noticias y las guarda en CSV/JSON en la carpeta data/pachamamaradio
 """
 
-import json
 import logging
 import os
-import re
-import time
+import sys
 from datetime import datetime
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urlparse
 
-import pandas as pd
-import requests
-from bs4 import BeautifulSoup
+# Agregar el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spiders.crawl_state import CrawlState
+from spiders.db_sink import crawl_summary, needs_files, open_sink
+from spiders.discovery import discover_articles
+from spiders.extraction import ArticleExtractor
+from spiders.fetcher import ABORT_ERRORS, AsyncFetcher
+from spiders.http_cache import HttpCache
+from spiders.parse_pool import ParsePool
+from url_canon import canonical_url
 
 
 class PachamamaRadioLocalScraper:
     def __init__(self):
         self.base_url = "https://pachamamaradio.org"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
-        self.articles_data = []
+        # Descargas asíncronas con keep-alive; 0.5 s entre peticiones al mismo host
+        self.fetcher = AsyncFetcher(per_host_concurrency=4, delay=0.5, cache=HttpCache.from_env())
         self.visited_urls = set()
+        self.incremental = False
+        self.lastmods = {}
         
         # Crear carpeta de datos si no existe
         self.data_folder = "data/pachamamaradio"
         os.makedirs(self.data_folder, exist_ok=True)
         
+        # Artículos extraídos: se escriben a disco (NDJSON) y a PostgreSQL según llegan
+        self.articles_data = open_sink(self.data_folder, 'pachamamaradio', fuente='Pachamama Radio')
+        
+        # URLs ya rastreadas en ejecuciones anteriores (modo incremental)
+        self.crawl_state = CrawlState(self.data_folder)
+        
+        # Perfil de extracción compilado una vez; aprende qué selectores aciertan
+        self.extractor = ArticleExtractor.load('pachamamaradio', stats_dir=self.data_folder)
+        
         # Configurar logging
         logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
         self.logger = logging.getLogger(__name__)
     
-    def get_page_content(self, url, retries=3):
+    def get_page_content(self, url):
         """Obtiene el contenido HTML de una página con reintentos"""
-        for attempt in range(retries):
-            try:
-                response = self.session.get(url, timeout=30)
-                response.raise_for_status()
-                return BeautifulSoup(response.content, 'html.parser')
-            except Exception as e:
-                self.logger.error(f"Error en intento {attempt + 1} para {url}: {e}")
-                if attempt < retries - 1:
-                    time.sleep(2 ** attempt)
-                else:
-                    self.logger.error(f"No se pudo acceder a {url} después de {retries} intentos")
-                    return None
+        return self.parse_html(self.fetcher.get(url))
+    
+    def parse_html(self, response):
+        """Convierte una respuesta descargada en un árbol HTML"""
+        if not response:
+            return None
+        return response.document
     
     def extract_article_links_from_home(self):
         """Extrae todos los enlaces de artículos de la página principal"""
@@ -72,15 +81,22 @@ class PachamamaRadioLocalScraper:
             links = soup.select(selector)
             for link in links:
                 href = link.get('href')
-                if href and self.is_valid_article_url(href):
-                    full_url = urljoin(self.base_url, href)
-                    article_links.add(full_url)
+                if href:
+                    full_url = canonical_url(href, self.base_url)
+                    if self.is_valid_article_url(full_url):
+                        article_links.add(full_url)
         
         return list(article_links)
     
+    def discover_article_links(self):
+        """Descubre artículos por sitemap, feed o API de WordPress; vacío si no hay"""
+        self.lastmods = discover_articles(self.fetcher, self.base_url, self.is_valid_article_url)
+        return set(self.lastmods)
+    
     def find_archive_pages(self):
-        """Encuentra TODAS las páginas de archivo"""
-        archive_urls = set()
+        """Encuentra TODAS las páginas de archivo, en orden de paginación"""
+        # Lista ordenada: el corte por página vacía (o ya conocida) depende del orden
+        archive_urls = []
         
         # URLs base de categorías conocidas
         category_bases = [
@@ -93,7 +109,7 @@ class PachamamaRadioLocalScraper:
         
         # Agregar páginas numeradas
         for i in range(1, 500):  # Hasta 500 páginas
-            archive_urls.add(f"{self.base_url}/page/{i}/")
+            archive_urls.append(f"{self.base_url}/page/{i}/")
         
         # Buscar subcategorías específicas encontradas
         subcategories = [
@@ -104,14 +120,17 @@ class PachamamaRadioLocalScraper:
         
         for subcat in subcategories:
             for i in range(1, 100):  # Hasta 100 páginas por subcategoría
-                archive_urls.add(f"{self.base_url}/seccion/puno/{subcat}/page/{i}/")
-                archive_urls.add(f"{self.base_url}/tag/{subcat}/page/{i}/")
+                archive_urls.append(f"{self.base_url}/seccion/puno/{subcat}/page/{i}/")
+                archive_urls.append(f"{self.base_url}/tag/{subcat}/page/{i}/")
         
-        return list(archive_urls)
+        return list(dict.fromkeys(archive_urls))
     
     def extract_articles_from_archive(self, archive_url):
-        """Extrae enlaces de artículos de una página de archivo"""
-        soup = self.get_page_content(archive_url)
+        """Descarga una página de archivo y extrae sus enlaces de artículos"""
+        return self.extract_articles_from_soup(self.get_page_content(archive_url))
+    
+    def extract_articles_from_soup(self, soup):
+        """Extrae enlaces de artículos de una página de archivo ya parseada"""
         if not soup:
             return []
         
@@ -133,9 +152,10 @@ class PachamamaRadioLocalScraper:
             links = soup.select(selector)
             for link in links:
                 href = link.get('href')
-                if href and self.is_valid_article_url(href):
-                    full_url = urljoin(self.base_url, href)
-                    article_links.add(full_url)
+                if href:
+                    full_url = canonical_url(href, self.base_url)
+                    if self.is_valid_article_url(full_url):
+                        article_links.add(full_url)
         
         return list(article_links)
     
@@ -156,220 +176,66 @@ class PachamamaRadioLocalScraper:
                 return False
         
         # Debe contener el dominio base
-        return 'pachamamaradio.org' in url and len(url.split('/')) > 3
+        return 'pachamamaradio.org' in url and len(url.rstrip('/').split('/')) > 3
     
     def extract_article_data(self, url):
-        """Extrae todos los datos de un artículo"""
+        """Descarga y extrae todos los datos de un artículo"""
         if url in self.visited_urls:
             return None
             
         self.visited_urls.add(url)
-        soup = self.get_page_content(url)
-        
+        return self.parse_article(url, self.get_page_content(url))
+    
+    def parse_article(self, url, soup):
+        """Extrae todos los datos de un artículo ya parseado"""
         if not soup:
             return None
         
         try:
-            # Extraer título
-            titulo = self.extract_title(soup)
-            if not titulo:
-                return None
-            
-            # Extraer datos básicos
-            fecha = self.extract_date(soup)
-            hora = self.extract_time(soup)
-            contenido = self.extract_content(soup)
-            resumen = self.extract_summary(soup, contenido)
-            categoria = self.extract_category(soup, url)
-            autor = self.extract_author(soup)
-            tags = self.extract_tags(soup)
-            imagenes = self.extract_images(soup)
-            
-            article_data = {
-                'titulo': titulo,
-                'fecha': fecha,
-                'hora': hora,
-                'resumen': resumen,
-                'contenido': contenido,
-                'categoria': categoria,
-                'autor': autor,
-                'tags': ', '.join(tags) if tags else None,
-                'url': url,
-                'fecha_extraccion': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'imagenes': ', '.join(imagenes) if imagenes else None,
-                'fuente': 'Pachamama Radio',
-                'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            }
-            
-            self.logger.info(f"Extraído: {titulo[:50]}...")
-            return article_data
+            # Selectores declarados en spiders/profiles/pachamamaradio.json
+            return self.build_article(url, self.extractor.extract(soup, url))
             
+        except ABORT_ERRORS:
+            raise
         except Exception as e:
             self.logger.error(f"Error extrayendo datos de {url}: {e}")
             return None
     
-    def extract_title(self, soup):
-        """Extrae el título del artículo"""
-        selectors = [
-            'h1.entry-title',
-            'h1.post-title',
-            '.single-title h1',
-            'article h1',
-            'h1',
-            '.title h1',
-            '.entry-header h1'
-        ]
-        
-        for selector in selectors:
-            element = soup.select_one(selector)
-            if element:
-                return element.get_text(strip=True)
-        
-        # Fallback al título de la página
-        title_tag = soup.find('title')
-        if title_tag:
-            title_text = title_tag.get_text(strip=True)
-            # Limpiar el título removiendo el nombre del sitio
-            return title_text.replace(' – Pachamama Radio', '').replace(' | Pachamama Radio', '')
-        
-        return None
-    
-    def extract_date(self, soup):
-        """Extrae la fecha de publicación"""
-        # Buscar en diferentes selectores
-        date_selectors = [
-            'time[datetime]',
-            '.entry-date',
-            '.post-date',
-            '.published',
-            '[datetime]'
-        ]
-        
-        for selector in date_selectors:
-            element = soup.select_one(selector)
-            if element:
-                datetime_attr = element.get('datetime')
-                if datetime_attr:
-                    try:
-                        return datetime.fromisoformat(datetime_attr.replace('Z', '+00:00')).strftime('%Y-%m-%d')
-                    except:
-                        pass
-                
-                text_date = element.get_text(strip=True)
-                if text_date:
-                    return self.parse_date_text(text_date)
-        
-        return datetime.now().strftime('%Y-%m-%d')
-    
-    def extract_time(self, soup):
-        """Extrae la hora de publicación"""
-        time_selectors = [
-            'time[datetime]',
-            '.entry-time',
-            '.post-time'
-        ]
+    def build_article(self, url, data):
+        """Da formato a los campos extraídos (en línea o en el pool de procesos)"""
+        titulo = data['titulo']
+        if not titulo:
+            return None
         
-        for selector in time_selectors:
-            element = soup.select_one(selector)
-            if element:
-                datetime_attr = element.get('datetime')
-                if datetime_attr:
-                    try:
-                        return datetime.fromisoformat(datetime_attr.replace('Z', '+00:00')).strftime('%H:%M:%S')
-                    except:
-                        pass
-        
-        return datetime.now().strftime('%H:%M:%S')
-    
-    def parse_date_text(self, date_text):
-        """Convierte texto de fecha a formato estándar"""
-        # Patrones comunes en español
-        months = {
-            'enero': '01', 'febrero': '02', 'marzo': '03', 'abril': '04',
-            'mayo': '05', 'junio': '06', 'julio': '07', 'agosto': '08',
-            'septiembre': '09', 'octubre': '10', 'noviembre': '11', 'diciembre': '12'
+        article_data = {
+            'titulo': titulo,
+            'fecha': data['fecha'],
+            'hora': data['hora'],
+            'resumen': data['resumen'] or self.summarize(data['contenido']),
+            'contenido': data['contenido'],
+            'categoria': data['categoria'] or self.category_from_url(url),
+            'autor': data['autor'],
+            'tags': ', '.join(data['tags']) or None,
+            'url': url,
+            'fecha_extraccion': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'imagenes': ', '.join(data['imagenes']) or None,
+            'fuente': 'Pachamama Radio',
+            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
         
-        date_text = date_text.lower()
-        for month_name, month_num in months.items():
-            if month_name in date_text:
-                # Buscar día y año
-                numbers = re.findall(r'\d+', date_text)
-                if len(numbers) >= 2:
-                    day = numbers[0].zfill(2)
-                    year = numbers[-1] if len(numbers[-1]) == 4 else f"20{numbers[-1]}"
-                    return f"{year}-{month_num}-{day}"
-        
-        return datetime.now().strftime('%Y-%m-%d')
-    
-    def extract_content(self, soup):
-        """Extrae el contenido completo del artículo"""
-        content_selectors = [
-            '.entry-content',
-            '.post-content',
-            'article .content',
-            '.single-content',
-            '[class*="content"]',
-            'article p'
-        ]
-        
-        content_text = ""
-        for selector in content_selectors:
-            elements = soup.select(selector)
-            for element in elements:
-                # Remover scripts y estilos
-                for script in element(["script", "style"]):
-                    script.decompose()
-                
-                text = element.get_text(separator=' ', strip=True)
-                if len(text) > len(content_text):
-                    content_text = text
-        
-        return content_text if content_text else "Contenido no disponible"
+        self.logger.info(f"Extraído: {titulo[:50]}...")
+        return article_data
     
-    def extract_summary(self, soup, content):
-        """Extrae o genera un resumen del artículo"""
-        # Buscar resumen explícito
-        summary_selectors = [
-            '.excerpt',
-            '.entry-summary',
-            '.post-excerpt',
-            'meta[name="description"]'
-        ]
-        
-        for selector in summary_selectors:
-            element = soup.select_one(selector)
-            if element:
-                if element.name == 'meta':
-                    return element.get('content', '').strip()
-                return element.get_text(strip=True)
-        
-        # Generar resumen de las primeras líneas del contenido
+    def summarize(self, content):
+        """Genera un resumen con las primeras frases del contenido"""
         if content and len(content) > 100:
             sentences = content.split('. ')[:2]
             return '. '.join(sentences) + '.' if sentences else content[:200] + '...'
         
         return content[:200] + '...' if content else "Resumen no disponible"
     
-    def extract_category(self, soup, url):
-        """Extrae la categoría del artículo"""
-        # Buscar en breadcrumbs y categorías
-        category_selectors = [
-            '.category',
-            '.post-category',
-            '.entry-category',
-            '.breadcrumb a',
-            'meta[property="article:section"]'
-        ]
-        
-        for selector in category_selectors:
-            element = soup.select_one(selector)
-            if element:
-                if element.name == 'meta':
-                    return element.get('content', '').strip()
-                return element.get_text(strip=True)
-        
-        # Extraer de la URL
+    def category_from_url(self, url):
+        """Categoría deducida de la URL cuando la página no la indica"""
         url_parts = url.split('/')
         for part in url_parts:
             if part in ['puno', 'nacional', 'internacional', 'deportes', 'cultura', 'politica']:
@@ -377,126 +243,114 @@ class PachamamaRadioLocalScraper:
         
         return "General"
     
-    def extract_author(self, soup):
-        """Extrae el autor del artículo"""
-        author_selectors = [
-            '.author',
-            '.post-author',
-            '.entry-author',
-            '[rel="author"]',
-            'meta[name="author"]'
-        ]
-        
-        for selector in author_selectors:
-            element = soup.select_one(selector)
-            if element:
-                if element.name == 'meta':
-                    return element.get('content', '').strip()
-                return element.get_text(strip=True)
-        
-        return "Redacción Pachamama Radio"
-    
-    def extract_tags(self, soup):
-        """Extrae las etiquetas del artículo"""
-        tags = []
-        tag_selectors = [
-            '.tag',
-            '.post-tag',
-            '.entry-tags a',
-            'meta[property="article:tag"]'
-        ]
-        
-        for selector in tag_selectors:
-            elements = soup.select(selector)
-            for element in elements:
-                if element.name == 'meta':
-                    tags.append(element.get('content', '').strip())
-                else:
-                    tag_text = element.get_text(strip=True)
-                    if tag_text:
-                        tags.append(tag_text)
-        
-        return list(set(tags)) if tags else []
-    
-    def extract_images(self, soup):
-        """Extrae las URLs de las imágenes del artículo (máximo 2)"""
-        images = []
-        img_elements = soup.find_all('img')
-        
-        for img in img_elements:
-            src = img.get('src') or img.get('data-src')
-            if src:
-                # Filtrar imágenes muy pequeñas o de interface
-                width = img.get('width')
-                height = img.get('height')
-                
-                if width and height:
-                    try:
-                        w, h = int(width), int(height)
-                        if w < 100 or h < 100:  # Muy pequeñas, probablemente iconos
-                            continue
-                    except ValueError:
-                        pass
-                
-                # Filtrar por nombre de archivo
-                if any(skip in src.lower() for skip in ['icon', 'logo', 'avatar', 'button', 'banner']):
-                    continue
-                
-                full_url = urljoin(self.base_url, src)
-                if full_url not in images:
-                    images.append(full_url)
-                    
-                    # Limitar a máximo 2 imágenes
-                    if len(images) >= 2:
-                        break
-        
-        return images
-    
-    def scrape_news(self):
-        """Scraping COMPLETO de noticias"""
-        self.logger.info("Iniciando scraping COMPLETO de Pachamama Radio...")
-        
-        # 1. Obtener enlaces de la página principal
+    def crawl_archive_links(self):
+        """Recorre la home y las páginas de archivo en busca de artículos"""
+        # Obtener enlaces de la página principal
         self.logger.info("Extrayendo enlaces de la página principal...")
         home_links = self.extract_article_links_from_home()
         all_article_links = set(home_links)
         self.logger.info(f"Enlaces encontrados en home: {len(home_links)}")
         
-        # 2. Buscar en TODAS las páginas de archivo
+        # Buscar en TODAS las páginas de archivo
         self.logger.info("Buscando en TODAS las páginas de archivo...")
         archive_pages = self.find_archive_pages()
         
-        for i, archive_url in enumerate(archive_pages):
-            if i % 50 == 0:
-                self.logger.info(f"Procesando página de archivo {i+1}/{len(archive_pages)}")
+        # Las páginas se descargan por ventanas en paralelo y se evalúan en orden
+        window = 10
+        reached_end = False
+        for start in range(0, len(archive_pages), window):
+            batch = archive_pages[start:start + window]
+            if start % 50 == 0:
+                self.logger.info(f"Procesando página de archivo {start+1}/{len(archive_pages)}")
             
-            archive_links = self.extract_articles_from_archive(archive_url)
-            all_article_links.update(archive_links)
+            results = dict(self.fetcher.for_each(
+                batch,
+                lambda url, response: (url, self.extract_articles_from_soup(self.parse_html(response)))
+            ))
             
-            # Pausa entre peticiones
-            time.sleep(1)
+            for offset, archive_url in enumerate(batch):
+                archive_links = results[archive_url]
+                all_article_links.update(archive_links)
+                
+                # Si no encuentra artículos nuevos en varias páginas consecutivas, detener
+                if start + offset > 10 and not archive_links:
+                    reached_end = True
+                    break
+                
+                # Modo incremental: una página con solo artículos conocidos corta la paginación
+                if self.incremental and self.crawl_state.all_known(archive_links):
+                    self.logger.info(f"Sin artículos nuevos en {archive_url}, fin de la paginación")
+                    reached_end = True
+                    break
             
-            # Si no encuentra artículos nuevos en varias páginas consecutivas, detener
-            if i > 10 and not archive_links:
+            if reached_end:
                 break
         
+        return all_article_links
+    
+    def scrape_news(self, incremental=False):
+        """Scraping COMPLETO de noticias (o solo de las nuevas si incremental)"""
+        mode = 'incremental' if incremental else 'completo'
+        self.logger.info(f"Iniciando scraping {mode.upper()} de Pachamama Radio...")
+        self.incremental = incremental
+        self.crawl_state.start_run(mode)
+        
+        # 1. Sitemaps, feed y API de WordPress: pocas descargas XML/JSON
+        self.logger.info("Buscando sitemap, feed y API de WordPress...")
+        all_article_links = self.discover_article_links()
+        
+        # 2. Solo si el sitio no expone un listado, recorrer home y archivo
+        if all_article_links:
+            self.logger.info(f"Enlaces encontrados por sitemap/feed: {len(all_article_links)}")
+        else:
+            all_article_links = self.crawl_archive_links()
+        
         self.logger.info(f"Total de enlaces de artículos a procesar: {len(all_article_links)}")
         
-        # 3. Extraer datos de cada artículo
+        # 3. Extraer datos de cada artículo (descargas en paralelo)
         self.logger.info("Extrayendo datos de cada artículo...")
-        for i, article_url in enumerate(all_article_links):
-            if i % 10 == 0:
-                self.logger.info(f"Procesado {i}/{len(all_article_links)} artículos")
-            
-            article_data = self.extract_article_data(article_url)
+        pending_urls = [url for url in all_article_links if url not in self.visited_urls]
+        if incremental:
+            # Los artículos ya rastreados ni siquiera se descargan
+            pending_urls = self.crawl_state.filter_new(pending_urls, self.lastmods)
+            self.logger.info(f"Modo incremental: {len(all_article_links) - len(pending_urls)} artículos ya conocidos")
+        self.visited_urls.update(pending_urls)
+        completed = 0
+        
+        def store_article(article_url, response, article_data):
             if article_data:
                 self.articles_data.append(article_data)
+                self.crawl_state.record(article_url, response, self.lastmods.get(article_url))
                 print(f"  ✅ Extraído: {article_data['titulo'][:50]}...")
             else:
                 print(f"  ❌ No se pudo extraer datos")
+        
+        def store_completed(pool, wait_all=False):
+            for article_url, response, data in pool.completed(wait_all=wait_all):
+                store_article(article_url, response, self.build_article(article_url, data))
+        
+        # El parseo va a un pool de procesos para no frenar las descargas
+        with ParsePool(self.extractor, stats_dir=self.data_folder) as pool:
+            def on_article(article_url, response):
+                nonlocal completed
+                if completed % 10 == 0:
+                    self.logger.info(f"Procesado {completed}/{len(pending_urls)} artículos")
+                completed += 1
+                
+                if response:
+                    pool.submit(article_url, response)
+                else:
+                    store_article(article_url, response, None)
+                store_completed(pool)
             
-            # Pausa entre artículos
-            time.sleep(0.5)
+            try:
+                self.fetcher.for_each(pending_urls, on_article)
+                store_completed(pool, wait_all=True)
+            finally:
+                self.fetcher.close()
+                self.extractor.save_stats()
+                self.articles_data.close()
+                self.crawl_state.finish_run(len(self.articles_data))
         
         self.logger.info(f"Scraping completado. Total de artículos extraídos: {len(self.articles_data)}")
         return self.articles_data
@@ -508,8 +362,7 @@ class PachamamaRadioLocalScraper:
             filename = f"{self.data_folder}/pachamamaradio_{timestamp}.csv"
         
         if self.articles_data:
-            df = pd.DataFrame(self.articles_data)
-            df.to_csv(filename, index=False, encoding='utf-8')
+            self.articles_data.export_csv(filename, encoding='utf-8')
             print(f"✅ Datos guardados en {filename}")
             return filename
         else:
@@ -523,8 +376,7 @@ class PachamamaRadioLocalScraper:
             filename = f"{self.data_folder}/pachamamaradio_{timestamp}.json"
         
         if self.articles_data:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(self.articles_data, f, ensure_ascii=False, indent=2)
+            self.articles_data.export_json(filename)
             print(f"✅ Datos guardados en {filename}")
             return filename
         else:
@@ -532,25 +384,34 @@ class PachamamaRadioLocalScraper:
             return None
 
 # Función principal para ejecutar
-def main():
+def run(incremental=False):
+    """
+    Rastreo completo de la fuente; devuelve su resumen (crawl_summary):
+    artículos extraídos, ficheros generados y lo guardado en PostgreSQL
+    """
     print("🚀 Iniciando scraping de Pachamama Radio...")
     print("=" * 50)
     
     scraper = PachamamaRadioLocalScraper()
     
     # Realizar scraping COMPLETO
-    news_data = scraper.scrape_news()
+    news_data = scraper.scrape_news(incremental=incremental)
     
     if news_data:
-        # Guardar en CSV y JSON
-        csv_file = scraper.save_to_csv()
-        json_file = scraper.save_to_json()
+        # Guardar en CSV y JSON (archivo opcional: las noticias ya se enviaron a PostgreSQL)
+        csv_file = json_file = None
+        if needs_files(news_data):
+            csv_file = scraper.save_to_csv()
+            json_file = scraper.save_to_json()
         
         print(f"\n🎉 ¡Scraping completado exitosamente!")
         print(f"📊 Total de noticias extraídas: {len(news_data)}")
-        print(f"📁 Archivos guardados:")
-        print(f"   - CSV: {csv_file}")
-        print(f"   - JSON: {json_file}")
+        if getattr(news_data, 'connected', False):
+            print(f"🗄️ Guardadas en PostgreSQL durante el rastreo: {news_data.inserted} nuevas")
+        if csv_file:
+            print(f"📁 Archivos guardados:")
+            print(f"   - CSV: {csv_file}")
+            print(f"   - JSON: {json_file}")
         
         # Mostrar estadísticas
         print(f"\n📈 Estadísticas:")
@@ -565,10 +426,10 @@ def main():
         if categorias:
             print(f"   - Categorías encontradas: {', '.join(list(categorias)[:5])}")
         
-        return csv_file, json_file
+        return crawl_summary(news_data, csv_file, json_file)
     else:
         print("❌ No se pudieron extraer noticias")
-        return None, None
+        return crawl_summary(news_data, None, None)
 
     def save_to_files(self, articles, csv_file, json_file):
         """Guardar artículos en archivos CSV y JSON"""
@@ -587,5 +448,10 @@ def main():
         with open(json_file, 'w', encoding='utf-8') as f:
             json.dump(articles, f, ensure_ascii=False, indent=2)
 
+def main(incremental=False):
+    """Ejecuta el rastreo; devuelve (csv_file, json_file), None si no se generaron"""
+    summary = run(incremental=incremental)
+    return summary['csv_file'], summary['json_file']
+
 if __name__ == "__main__":
     main()
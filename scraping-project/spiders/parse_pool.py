@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Etapa de parseo en procesos separada de la descarga
+El event loop del fetcher solo descarga bytes y los entrega a un
+ProcessPoolExecutor, donde cada proceso parsea el HTML con lxml y aplica el
+perfil de extracción de la fuente. Así la extracción usa todos los núcleos
+mientras la red sigue ocupada.
+
+Si no se pueden crear procesos hijos (por ejemplo dentro de un worker
+prefork de Celery, que es un proceso daemon) o SCRAPING_PARSE_WORKERS=0,
+el parseo se hace en línea en el proceso actual.
+"""
+
+import logging
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, CancelledError, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from spiders.extraction import ArticleExtractor
+from spiders.fetcher import ABORT_ERRORS
+from spiders.html_parser import parse_html
+
+logger = logging.getLogger(__name__)
+
+_worker_extractor = None
+
+
+def _init_worker(source, stats_dir):
+    """Cada proceso carga y compila el perfil una sola vez"""
+    global _worker_extractor
+    _worker_extractor = ArticleExtractor.load(source, stats_dir=stats_dir)
+
+
+def _extract_in_worker(url, content, encoding):
+    data = _worker_extractor.extract(parse_html(content, encoding=encoding), url)
+    return data, _worker_extractor.take_hits()
+
+
+def _declared_encoding(response):
+    if 'charset=' in response.headers.get('Content-Type', ''):
+        return response.encoding
+    return None
+
+
+def default_workers():
+    workers = os.getenv('SCRAPING_PARSE_WORKERS')
+    return int(workers) if workers else (os.cpu_count() or 1)
+
+
+class ParsePool:
+    """
+    Pool de extracción para una fuente.
+
+    - `submit(url, response)` encola un documento descargado.
+    - `completed()` entrega (url, response, data) de lo que ya terminó;
+      `completed(wait_all=True)` espera a que termine todo lo pendiente.
+    - Con más de `max_pending` documentos en cola, `submit` espera a que
+      acabe alguno: la descarga se frena en vez de acumular memoria.
+    """
+
+    def __init__(self, extractor, stats_dir=None, max_workers=None, max_pending=None):
+        self.extractor = extractor
+        self.max_workers = default_workers() if max_workers is None else max_workers
+        self.max_pending = max_pending or max(self.max_workers, 1) * 8
+        self._pending = {}
+        self._inline_done = []
+        self._executor = None
+
+        if self.max_workers > 1 and not multiprocessing.current_process().daemon:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(extractor.profile_name, stats_dir),
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def parallel(self):
+        return self._executor is not None
+
+    def submit(self, url, response):
+        if self._executor is not None:
+            try:
+                future = self._executor.submit(
+                    _extract_in_worker, url, response.content, _declared_encoding(response)
+                )
+                self._pending[future] = (url, response)
+                if len(self._pending) >= self.max_pending:
+                    wait(list(self._pending), return_when=FIRST_COMPLETED)
+                return
+            except ABORT_ERRORS:
+                raise
+            except Exception as e:
+                logger.warning(f"Pool de procesos no disponible, se parsea en línea: {e}")
+                self._abandon_executor()
+
+        data = self._extract_inline(url, response)
+        if data is not None:
+            self._inline_done.append((url, response, data))
+
+    def _extract_inline(self, url, response):
+        try:
+            return self.extractor.extract(response.document, url)
+        except ABORT_ERRORS:
+            raise
+        except Exception as e:
+            logger.error(f"Error parseando {url}: {e}")
+            return None
+
+    def _abandon_executor(self):
+        """Cierra un pool roto sin esperarlo; lo que tenía en cola se parsea en línea"""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def completed(self, wait_all=False):
+        """Resultados terminados, en el orden en que acabaron"""
+        done, self._inline_done = self._inline_done, []
+        yield from done
+
+        if not self._pending:
+            return
+        futures = list(self._pending)
+        if wait_all:
+            wait(futures)
+        for future in futures:
+            if not future.done():
+                continue
+            url, response = self._pending.pop(future)
+            try:
+                data, hits = future.result()
+            except (BrokenProcessPool, CancelledError) as e:
+                # El documento no llegó a parsearse: se hace aquí
+                logger.warning(f"Pool de procesos caído, se parsea {url} en línea: {e}")
+                self._abandon_executor()
+                data = self._extract_inline(url, response)
+                if data is not None:
+                    yield url, response, data
+                continue
+            except Exception as e:
+                logger.error(f"Error parseando {url} en el pool: {e}")
+                continue
+            self.extractor.add_hits(hits)
+            yield url, response, data
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
@@ -4,336 +4,106 @@ Spider local para Sin Fronteras - Adaptado desde Colab
 Extrae noticias y las guarda en CSV/JSON en la carpeta data/sinfronteras
 """
 
-import json
 import os
-import re
-import threading
-import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import sys
 from datetime import datetime
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urlparse
 
-import pandas as pd
-import requests
-from bs4 import BeautifulSoup
+# Agregar el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spiders.crawl_state import CrawlState
+from spiders.db_sink import crawl_summary, needs_files, open_sink
+from spiders.discovery import discover_articles
+from spiders.extraction import ArticleExtractor
+from spiders.fetcher import ABORT_ERRORS, AsyncFetcher
+from spiders.http_cache import HttpCache
+from spiders.parse_pool import ParsePool
+from url_canon import canonical_url
 
 
 class SinFronterasLocalScraper:
     def __init__(self):
         self.base_url = "https://diariosinfronteras.com.pe"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'es-ES,es;q=0.8,en-US;q=0.5,en;q=0.3',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Cache-Control': 'no-cache'
-        })
-        self.all_news = []
+        # Descargas asíncronas con keep-alive; 0.5 s entre peticiones al mismo host
+        self.fetcher = AsyncFetcher(
+            headers={
+                'Upgrade-Insecure-Requests': '1',
+                'Cache-Control': 'no-cache'
+            },
+            per_host_concurrency=5,
+            delay=0.5,
+            backoff=3,
+            cache=HttpCache.from_env(),
+        )
         self.processed_urls = set()
-        self.lock = threading.Lock()
+        self.incremental = False
+        self.lastmods = {}
         
         # Crear carpeta de datos si no existe
         self.data_folder = "data/sinfronteras"
         os.makedirs(self.data_folder, exist_ok=True)
         
-    def get_page(self, url, retries=3):
-        """Obtiene el contenido de una página con reintentos"""
-        for attempt in range(retries):
-            try:
-                response = self.session.get(url, timeout=30)
-                response.raise_for_status()
-                return response
-            except Exception as e:
-                print(f"Error en intento {attempt + 1} para {url}: {str(e)}")
-                if attempt < retries - 1:
-                    time.sleep(3)
-                else:
-                    return None
-    
-    def extract_images(self, soup):
-        """Extrae imágenes de un artículo (máximo 2)"""
-        images = []
-        img_selectors = [
-            'img[src]',
-            'img[data-src]',
-            'img[data-lazy-src]',
-            '.wp-post-image',
-            '.featured-image img',
-            '.post-thumbnail img',
-            '.entry-content img',
-            '.article-content img'
-        ]
+        # Artículos extraídos: se escriben a disco (NDJSON) y a PostgreSQL según llegan
+        self.all_news = open_sink(self.data_folder, 'sinfronteras', fuente='Sin Fronteras')
         
-        for selector in img_selectors:
-            img_tags = soup.select(selector)
-            for img in img_tags:
-                src = (img.get('src') or 
-                      img.get('data-src') or 
-                      img.get('data-lazy-src') or 
-                      img.get('data-original'))
-                if src and src not in [img.split('?')[0] for img in images]:
-                    # Filtrar imágenes muy pequeñas o de interface
-                    width = img.get('width')
-                    height = img.get('height')
-                    
-                    if width and height:
-                        try:
-                            w, h = int(width), int(height)
-                            if w < 100 or h < 100:  # Muy pequeñas, probablemente iconos
-                                continue
-                        except ValueError:
-                            pass
-                    
-                    # Filtrar por nombre de archivo
-                    if any(skip in src.lower() for skip in ['icon', 'logo', 'avatar', 'button', 'banner']):
-                        continue
-                    
-                    full_url = urljoin(self.base_url, src)
-                    if self.is_valid_image_url(full_url):
-                        images.append(full_url)
-                        
-                        # Limitar a máximo 2 imágenes
-                        if len(images) >= 2:
-                            break
-            
-            if len(images) >= 2:
-                break
-                
-        return images
-    
-    def is_valid_image_url(self, url):
-        """Verifica si la URL es una imagen válida"""
-        image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg']
-        return any(ext in url.lower() for ext in image_extensions)
-    
-    def clean_text(self, text):
-        """Limpia y normaliza el texto"""
-        if not text:
-            return ""
-        # Eliminar espacios extra y caracteres especiales
-        text = re.sub(r'\s+', ' ', text.strip())
-        text = re.sub(r'[\r\n\t]', ' ', text)
-        text = re.sub(r'[^\w\s\-.,;:!?()áéíóúüñÁÉÍÓÚÜÑ]', ' ', text)
-        return text.strip()
-    
-    def extract_date_time(self, soup):
-        """Extrae fecha y hora del artículo"""
-        fecha = ""
-        hora = ""
-        
-        # Múltiples selectores para fecha
-        date_selectors = [
-            'time[datetime]',
-            '.entry-date',
-            '.post-date',
-            '.published',
-            '.date',
-            '.post-meta time',
-            '.entry-meta time',
-            '[datetime]'
-        ]
+        # URLs ya rastreadas en ejecuciones anteriores (modo incremental)
+        self.crawl_state = CrawlState(self.data_folder)
         
-        for selector in date_selectors:
-            date_elem = soup.select_one(selector)
-            if date_elem:
-                datetime_attr = date_elem.get('datetime') or date_elem.get('content')
-                if datetime_attr:
-                    try:
-                        dt = datetime.fromisoformat(datetime_attr.replace('Z', '+00:00'))
-                        fecha = dt.strftime('%Y-%m-%d')
-                        hora = dt.strftime('%H:%M:%S')
-                        break
-                    except:
-                        pass
-                
-                # Si no hay datetime, extraer texto
-                date_text = self.clean_text(date_elem.get_text())
-                if date_text:
-                    fecha = self.parse_date_text(date_text)
-                    break
-        
-        return fecha, hora
-    
-    def parse_date_text(self, date_text):
-        """Parsea texto de fecha a formato estándar"""
-        if not date_text:
-            return datetime.now().strftime('%Y-%m-%d')
-        
-        # Patrones comunes en español
-        months = {
-            'enero': '01', 'febrero': '02', 'marzo': '03', 'abril': '04',
-            'mayo': '05', 'junio': '06', 'julio': '07', 'agosto': '08',
-            'septiembre': '09', 'octubre': '10', 'noviembre': '11', 'diciembre': '12'
-        }
+        # Perfil de extracción compilado una vez; aprende qué selectores aciertan
+        self.extractor = ArticleExtractor.load('sinfronteras', stats_dir=self.data_folder)
         
-        date_text = date_text.lower()
-        for month_name, month_num in months.items():
-            if month_name in date_text:
-                # Buscar día y año
-                numbers = re.findall(r'\d+', date_text)
-                if len(numbers) >= 2:
-                    day = numbers[0].zfill(2)
-                    year = numbers[-1] if len(numbers[-1]) == 4 else f"20{numbers[-1]}"
-                    return f"{year}-{month_num}-{day}"
-        
-        return datetime.now().strftime('%Y-%m-%d')
+    def get_page(self, url):
+        """Obtiene el contenido de una página con reintentos"""
+        return self.fetcher.get(url)
     
     def extract_article_data(self, article_url):
-        """Extrae todos los datos de un artículo específico"""
+        """Descarga y extrae todos los datos de un artículo específico"""
+        return self.parse_article(article_url, self.get_page(article_url))
+    
+    def parse_article(self, article_url, response):
+        """Extrae todos los datos de un artículo ya descargado"""
         try:
-            response = self.get_page(article_url)
             if not response:
                 return None
-                
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extraer título
-            title_selectors = [
-                'h1.entry-title',
-                'h1.post-title', 
-                'h1.article-title',
-                '.single-title h1',
-                'article h1',
-                'h1',
-                '.title h1',
-                '.entry-header h1'
-            ]
-            title = ""
-            for selector in title_selectors:
-                title_elem = soup.select_one(selector)
-                if title_elem:
-                    title = self.clean_text(title_elem.get_text())
-                    break
             
-            # Extraer fecha y hora
-            fecha, hora = self.extract_date_time(soup)
-            
-            # Extraer resumen/excerpt
-            summary_selectors = [
-                '.entry-excerpt',
-                '.post-excerpt',
-                '.excerpt',
-                '.lead',
-                '.summary',
-                'meta[name="description"]'
-            ]
-            resumen = ""
-            for selector in summary_selectors:
-                if selector.startswith('meta'):
-                    summary_elem = soup.select_one(selector)
-                    if summary_elem:
-                        resumen = self.clean_text(summary_elem.get('content', ''))
-                        break
-                else:
-                    summary_elem = soup.select_one(selector)
-                    if summary_elem:
-                        resumen = self.clean_text(summary_elem.get_text())
-                        break
-            
-            # Extraer contenido principal
-            content_selectors = [
-                '.entry-content',
-                '.post-content',
-                '.article-content',
-                '.content',
-                'article .text',
-                '.single-content',
-                '.post-body'
-            ]
-            contenido = ""
-            for selector in content_selectors:
-                content_elem = soup.select_one(selector)
-                if content_elem:
-                    # Eliminar elementos no deseados
-                    for unwanted in content_elem.find_all(['script', 'style', 'nav', 'aside', 'footer']):
-                        unwanted.decompose()
-                    contenido = self.clean_text(content_elem.get_text())
-                    break
-            
-            # Extraer categoría
-            category_selectors = [
-                '.category',
-                '.post-category',
-                '.entry-category',
-                '.cat-links a',
-                '[rel="category"]',
-                '.breadcrumb a',
-                '.post-categories a'
-            ]
-            categoria = ""
-            for selector in category_selectors:
-                cat_elems = soup.select(selector)
-                if cat_elems:
-                    categories = [self.clean_text(cat.get_text()) for cat in cat_elems]
-                    categoria = ", ".join(categories)
-                    break
-            
-            # Extraer autor
-            author_selectors = [
-                '.author',
-                '.post-author',
-                '.entry-author',
-                '[rel="author"]',
-                '.byline',
-                '.writer',
-                '.author-name'
-            ]
-            autor = ""
-            for selector in author_selectors:
-                author_elem = soup.select_one(selector)
-                if author_elem:
-                    autor = self.clean_text(author_elem.get_text())
-                    break
-            
-            # Extraer tags
-            tag_selectors = [
-                '.tags a',
-                '.post-tags a',
-                '.entry-tags a',
-                '[rel="tag"]'
-            ]
-            tags = []
-            for selector in tag_selectors:
-                tag_elems = soup.select(selector)
-                if tag_elems:
-                    tags = [self.clean_text(tag.get_text()) for tag in tag_elems]
-                    break
-            
-            # Extraer imágenes
-            images = self.extract_images(soup)
-            
-            return {
-                'titulo': title,
-                'fecha': fecha,
-                'hora': hora,
-                'resumen': resumen,
-                'contenido': contenido,
-                'categoria': categoria,
-                'autor': autor,
-                'tags': ", ".join(tags) if tags else "",
-                'url': article_url,
-                'fecha_extraccion': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'imagenes': ", ".join(images) if images else "",
-                'fuente': 'Sin Fronteras',
-                'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            }
+            # Selectores declarados en spiders/profiles/sinfronteras.json
+            return self.build_article(article_url, self.extractor.extract(response.document, article_url))
             
+        except ABORT_ERRORS:
+            raise
         except Exception as e:
             print(f"Error extrayendo artículo {article_url}: {str(e)}")
             return None
     
+    def build_article(self, article_url, data):
+        """Da formato a los campos extraídos (en línea o en el pool de procesos)"""
+        return {
+            'titulo': data['titulo'] or "",
+            'fecha': data['fecha'] or "",
+            'hora': data['hora'] or "",
+            'resumen': data['resumen'] or "",
+            'contenido': data['contenido'] or "",
+            'categoria': ", ".join(data['categoria']),
+            'autor': data['autor'] or "",
+            'tags': ", ".join(data['tags']),
+            'url': article_url,
+            'fecha_extraccion': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'imagenes': ", ".join(data['imagenes']),
+            'fuente': 'Sin Fronteras',
+            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+    
     def get_article_links_from_page(self, page_url):
-        """Extrae todos los enlaces de artículos de una página"""
+        """Descarga una página y extrae todos sus enlaces de artículos"""
+        response = self.get_page(page_url)
+        if not response:
+            return []
+        return self.extract_article_links(response.document)
+    
+    def extract_article_links(self, soup):
+        """Extrae todos los enlaces de artículos de una página ya parseada"""
         try:
-            response = self.get_page(page_url)
-            if not response:
-                return []
-                
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
             # Selectores comunes para enlaces de artículos
             article_selectors = [
                 'article a[href]',
@@ -356,7 +126,7 @@ class SinFronterasLocalScraper:
                 for elem in elements:
                     href = elem.get('href')
                     if href:
-                        full_url = urljoin(self.base_url, href)
+                        full_url = canonical_url(href, self.base_url)
                         # Filtrar solo URLs que parezcan artículos
                         if self.is_article_url(full_url):
                             links.add(full_url)
@@ -366,20 +136,26 @@ class SinFronterasLocalScraper:
             for link in all_links:
                 href = link.get('href')
                 if href:
-                    full_url = urljoin(self.base_url, href)
+                    full_url = canonical_url(href, self.base_url)
                     if self.is_article_url(full_url):
                         links.add(full_url)
             
             return list(links)
             
+        except ABORT_ERRORS:
+            raise
         except Exception as e:
-            print(f"Error obteniendo enlaces de {page_url}: {str(e)}")
+            print(f"Error obteniendo enlaces: {str(e)}")
             return []
     
     def is_article_url(self, url):
         """Determina si una URL es probablemente un artículo"""
         if not url.startswith(self.base_url):
             return False
+        
+        # La portada (también a donde llevan los enlaces "#..." ya canonicalizados)
+        if url.rstrip('/') == self.base_url:
+            return False
             
         # Excluir URLs que no son artículos
         exclude_patterns = [
@@ -419,111 +195,150 @@ class SinFronterasLocalScraper:
             for elem in elements:
                 href = elem.get('href')
                 if href:
-                    full_url = urljoin(self.base_url, href)
+                    full_url = canonical_url(href, self.base_url)
                     pagination_urls.add(full_url)
         
         return list(pagination_urls)
     
     def discover_all_pages(self):
         """Descubre TODAS las páginas del sitio web"""
-        print("🔍 Descubriendo TODAS las páginas del sitio...")
+        # Primero sitemaps, feed y API de WordPress: pocas descargas XML/JSON
+        discovered = discover_articles(self.fetcher, self.base_url, self.is_article_url)
+        if discovered:
+            print(f"✅ Descubrimiento por sitemap/feed completado. {len(discovered)} artículos encontrados")
+            self.lastmods = discovered
+            return list(discovered)
+        
+        print("🔍 Sin sitemap ni API: descubriendo TODAS las páginas del sitio...")
         
         pages_to_visit = [self.base_url]
         visited_pages = set()
         all_article_urls = set()
         
         while pages_to_visit:
-            current_page = pages_to_visit.pop(0)
+            # Cada nivel de la frontera se descarga en paralelo
+            frontier = [page for page in dict.fromkeys(pages_to_visit) if page not in visited_pages]
+            visited_pages.update(frontier)
+            next_pages = []
             
-            if current_page in visited_pages:
-                continue
-                
-            print(f"📄 Explorando: {current_page}")
-            visited_pages.add(current_page)
-            
-            try:
-                response = self.get_page(current_page)
+            def explore(current_page, response):
+                print(f"📄 Explorando: {current_page}")
                 if not response:
-                    continue
-                    
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Obtener enlaces de artículos de esta página
-                article_links = self.get_article_links_from_page(current_page)
-                all_article_urls.update(article_links)
-                print(f"  📰 Encontrados {len(article_links)} artículos en esta página")
-                
-                # Obtener TODOS los enlaces de paginación
-                pagination_links = self.get_pagination_urls(soup)
-                for link in pagination_links:
-                    if link not in visited_pages:
-                        pages_to_visit.append(link)
+                    return
                 
-                # Buscar enlaces internos adicionales
-                all_links = soup.find_all('a', href=True)
-                for link in all_links:
-                    href = link.get('href')
-                    if href:
-                        full_url = urljoin(self.base_url, href)
-                        if (full_url.startswith(self.base_url) and 
-                            full_url not in visited_pages and 
-                            full_url not in pages_to_visit and
-                            not self.is_article_url(full_url)):
-                            pages_to_visit.append(full_url)
-                
-                time.sleep(1)  # Pausa entre requests
-                
-            except Exception as e:
-                print(f"Error explorando {current_page}: {str(e)}")
-                continue
+                try:
+                    soup = response.document
+                    
+                    # Obtener enlaces de artículos de esta página
+                    article_links = self.extract_article_links(soup)
+                    all_article_urls.update(article_links)
+                    print(f"  📰 Encontrados {len(article_links)} artículos en esta página")
+                    
+                    # Modo incremental: una página con solo artículos conocidos corta la paginación
+                    if self.incremental and self.crawl_state.all_known(article_links):
+                        print("  ⏹️ Todos los artículos ya son conocidos, no se sigue paginando")
+                        return
+                    
+                    # Obtener TODOS los enlaces de paginación
+                    pagination_links = self.get_pagination_urls(soup)
+                    for link in pagination_links:
+                        if link not in visited_pages:
+                            next_pages.append(link)
+                    
+                    # Buscar enlaces internos adicionales
+                    all_links = soup.find_all('a', href=True)
+                    for link in all_links:
+                        href = link.get('href')
+                        if href:
+                            full_url = canonical_url(href, self.base_url)
+                            if (full_url.startswith(self.base_url) and 
+                                full_url not in visited_pages and 
+                                not self.is_article_url(full_url)):
+                                next_pages.append(full_url)
+                    
+                except ABORT_ERRORS:
+                    raise
+                except Exception as e:
+                    print(f"Error explorando {current_page}: {str(e)}")
+            
+            self.fetcher.for_each(frontier, explore)
+            pages_to_visit = next_pages
         
         print(f"✅ Descubrimiento completado. {len(all_article_urls)} artículos encontrados")
         return list(all_article_urls)
     
-    def scrape_article(self, url):
-        """Scraper individual para un artículo con thread safety"""
-        with self.lock:
-            if url in self.processed_urls:
-                return None
-            self.processed_urls.add(url)
-        
-        print(f"📖 Extrayendo: {url}")
-        article_data = self.extract_article_data(url)
-        
+    def scrape_article(self, url, response):
+        """Procesa un artículo ya descargado"""
+        return self.store_article(url, response, self.parse_article(url, response))
+    
+    def store_article(self, url, response, article_data):
+        """Guarda un artículo ya extraído y lo marca como rastreado"""
         if article_data and article_data['titulo']:
-            with self.lock:
-                self.all_news.append(article_data)
+            self.all_news.append(article_data)
+            self.crawl_state.record(url, response, self.lastmods.get(url))
             print(f"✅ Extraído: {article_data['titulo'][:50]}...")
             return article_data
         else:
             print(f"❌ No se pudo extraer: {url}")
             return None
     
-    def scrape_news(self, max_workers=5):
-        """Extrae TODAS las noticias del sitio web"""
-        print("🚀 Iniciando scraping COMPLETO de Sin Fronteras...")
+    def scrape_news(self, max_workers=5, incremental=False):
+        """Extrae TODAS las noticias del sitio web (o solo las nuevas si incremental)"""
+        mode = 'incremental' if incremental else 'completo'
+        print(f"🚀 Iniciando scraping {mode.upper()} de Sin Fronteras...")
+        
+        # max_workers = descargas simultáneas contra el sitio
+        self.fetcher.per_host_concurrency = max_workers
+        self.incremental = incremental
+        self.crawl_state.start_run(mode)
         
         # Descubrir TODAS las páginas y artículos
         all_article_urls = self.discover_all_pages()
         
-        if not all_article_urls:
-            print("❌ No se encontraron artículos")
+        pending_urls = [url for url in all_article_urls if url not in self.processed_urls]
+        if incremental:
+            # Los artículos ya rastreados ni siquiera se descargan
+            pending_urls = self.crawl_state.filter_new(pending_urls, self.lastmods)
+            print(f"♻️ Modo incremental: {len(all_article_urls) - len(pending_urls)} artículos ya conocidos")
+        self.processed_urls.update(pending_urls)
+        
+        if not pending_urls:
+            print("❌ No se encontraron artículos nuevos" if incremental else "❌ No se encontraron artículos")
+            self.crawl_state.finish_run(0)
+            self.fetcher.close()
             return []
         
-        print(f"📊 Total de artículos a procesar: {len(all_article_urls)}")
+        print(f"📊 Total de artículos a procesar: {len(pending_urls)}")
         
-        # Procesar TODOS los artículos con threading
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_url = {executor.submit(self.scrape_article, url): url for url in all_article_urls}
-            
-            completed = 0
-            for future in as_completed(future_to_url):
+        # Descargar TODOS los artículos en paralelo; el parseo va a un pool de
+        # procesos para no frenar el event loop de descargas
+        completed = 0
+        
+        def store_completed(pool, wait_all=False):
+            for url, response, data in pool.completed(wait_all=wait_all):
+                self.store_article(url, response, self.build_article(url, data))
+        
+        with ParsePool(self.extractor, stats_dir=self.data_folder) as pool:
+            def on_article(url, response):
+                nonlocal completed
                 completed += 1
+                print(f"📖 Extrayendo: {url}")
+                if response:
+                    pool.submit(url, response)
+                else:
+                    print(f"❌ No se pudo extraer: {url}")
+                store_completed(pool)
                 if completed % 10 == 0:
-                    print(f"🔄 Progreso: {completed}/{len(all_article_urls)} artículos procesados")
-                
-                # Pausa entre requests
-                time.sleep(0.5)
+                    print(f"🔄 Progreso: {completed}/{len(pending_urls)} artículos procesados")
+            
+            try:
+                self.fetcher.for_each(pending_urls, on_article)
+                store_completed(pool, wait_all=True)
+            finally:
+                self.fetcher.close()
+                self.extractor.save_stats()
+                self.all_news.close()
+                self.crawl_state.finish_run(len(self.all_news))
         
         print(f"🎉 Scraping completado! {len(self.all_news)} noticias extraídas")
         return self.all_news
@@ -535,8 +350,7 @@ class SinFronterasLocalScraper:
             filename = f"{self.data_folder}/sinfronteras_{timestamp}.csv"
         
         if self.all_news:
-            df = pd.DataFrame(self.all_news)
-            df.to_csv(filename, index=False, encoding='utf-8-sig')
+            self.all_news.export_csv(filename, encoding='utf-8-sig')
             print(f"✅ Datos guardados en {filename}")
             return filename
         else:
@@ -550,8 +364,7 @@ class SinFronterasLocalScraper:
             filename = f"{self.data_folder}/sinfronteras_{timestamp}.json"
         
         if self.all_news:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(self.all_news, f, ensure_ascii=False, indent=2)
+            self.all_news.export_json(filename)
             print(f"✅ Datos guardados en {filename}")
             return filename
         else:
@@ -559,25 +372,34 @@ class SinFronterasLocalScraper:
             return None
 
 # Función principal para ejecutar
-def main():
+def run(incremental=False):
+    """
+    Rastreo completo de la fuente; devuelve su resumen (crawl_summary):
+    artículos extraídos, ficheros generados y lo guardado en PostgreSQL
+    """
     print("🚀 Iniciando scraping de Sin Fronteras...")
     print("=" * 50)
     
     scraper = SinFronterasLocalScraper()
     
     # Realizar scraping COMPLETO
-    news_data = scraper.scrape_news(max_workers=5)
+    news_data = scraper.scrape_news(max_workers=5, incremental=incremental)
     
     if news_data:
-        # Guardar en CSV y JSON
-        csv_file = scraper.save_to_csv()
-        json_file = scraper.save_to_json()
+        # Guardar en CSV y JSON (archivo opcional: las noticias ya se enviaron a PostgreSQL)
+        csv_file = json_file = None
+        if needs_files(news_data):
+            csv_file = scraper.save_to_csv()
+            json_file = scraper.save_to_json()
         
         print(f"\n🎉 ¡Scraping completado exitosamente!")
         print(f"📊 Total de noticias extraídas: {len(news_data)}")
-        print(f"📁 Archivos guardados:")
-        print(f"   - CSV: {csv_file}")
-        print(f"   - JSON: {json_file}")
+        if getattr(news_data, 'connected', False):
+            print(f"🗄️ Guardadas en PostgreSQL durante el rastreo: {news_data.inserted} nuevas")
+        if csv_file:
+            print(f"📁 Archivos guardados:")
+            print(f"   - CSV: {csv_file}")
+            print(f"   - JSON: {json_file}")
         
         # Mostrar estadísticas
         print(f"\n📈 Estadísticas:")
@@ -592,10 +414,10 @@ def main():
         if categorias:
             print(f"   - Categorías encontradas: {', '.join(list(categorias)[:5])}")
         
-        return csv_file, json_file
+        return crawl_summary(news_data, csv_file, json_file)
     else:
         print("❌ No se pudieron extraer noticias")
-        return None, None
+        return crawl_summary(news_data, None, None)
 
     def save_to_files(self, articles, csv_file, json_file):
         """Guardar artículos en archivos CSV y JSON"""
@@ -614,5 +436,10 @@ def main():
         with open(json_file, 'w', encoding='utf-8') as f:
             json.dump(articles, f, ensure_ascii=False, indent=2)
 
+def main(incremental=False):
+    """Ejecuta el rastreo; devuelve (csv_file, json_file), None si no se generaron"""
+    summary = run(incremental=incremental)
+    return summary['csv_file'], summary['json_file']
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la preparación de datos de la carga masiva (bulk_loader)
+Normalización de valores y CSV que se envía a COPY; no necesita PostgreSQL
+Se ejecuta con `python test_bulk_loader.py` o con pytest
+"""
+
+import csv
+import io
+import sys
+from datetime import datetime
+
+from bulk_loader import BulkLoader, _CopyStream, _normalize
+
+COLUMNS = ['titulo', 'fecha', 'hora', 'url', 'fuente', 'created_at', 'caracteres_contenido']
+
+
+def test_normaliza_fechas():
+    esperado = '2025-03-09 14:30:00'
+    for valor in ['2025-03-09 14:30:00', '2025-03-09T14:30:00', '2025-03-09T14:30:00-05:00',
+                  '2025-03-09 14:30', datetime(2025, 3, 9, 14, 30)]:
+        assert _normalize('fecha', valor) == esperado, valor
+    assert _normalize('fecha', '09/03/2025') == '2025-03-09 00:00:00'
+    # Lo que PostgreSQL rechazaría queda en NULL en vez de abortar la carga
+    for valor in ['Fecha no encontrada', '', '   ', None, float('nan')]:
+        assert _normalize('fecha', valor) is None, valor
+
+
+def test_normaliza_horas_y_enteros():
+    assert _normalize('hora', '9:05') == '09:05:00'
+    assert _normalize('hora', '14:30:15') == '14:30:15'
+    assert _normalize('hora', 'mediodía') is None
+    assert _normalize('caracteres_contenido', '1520.0') == '1520'
+    assert _normalize('caracteres_contenido', 87) == '87'
+    assert _normalize('caracteres_contenido', 'n/a') is None
+
+
+def test_normaliza_textos_listas_y_urls():
+    assert _normalize('tags', ['puno', 'juliaca']) == 'puno, juliaca'
+    assert _normalize('titulo', '  ') is None
+    assert _normalize('titulo', ' Título ') == ' Título '
+    assert _normalize('url', 'http://www.losandes.com.pe/a/b?utm_source=fb') == 'https://losandes.com.pe/a/b/'
+
+
+def test_copy_stream_por_trozos():
+    lineas = ['uno,1\r\n', 'dos,2\r\n', 'tres,3\r\n']
+    completo = ''.join(lineas)
+    for tam in [1, 4, 7, 1000]:
+        stream = _CopyStream(iter(lineas))
+        trozos = []
+        while True:
+            trozo = stream.read(tam)
+            if not trozo:
+                break
+            assert len(trozo) <= tam
+            trozos.append(trozo)
+        assert ''.join(trozos) == completo, tam
+    assert _CopyStream(iter(lineas)).read() == completo
+    assert _CopyStream(iter([])).read(8192) == ''
+
+
+def test_csv_para_copy():
+    filas = [
+        {'titulo': 'Con "comillas", y coma', 'fecha': '2025-03-09T14:30:00', 'url': 'http://losandes.com.pe/a'},
+        {'titulo': 'Sin URL', 'url': ''},
+        {'titulo': 'Multilínea\nsegunda', 'fecha': 'sin fecha', 'url': 'https://losandes.com.pe/b/',
+         'fuente': 'Otra', 'created_at': '2025-01-01 00:00:00', 'caracteres_contenido': 10},
+    ]
+    loader = BulkLoader(conn=None, default_fuente='Los Andes')
+    counters = {'read': 0, 'without_url': 0}
+    texto = _CopyStream(loader._csv_lines(filas, COLUMNS, counters)).read()
+
+    assert counters == {'read': 3, 'without_url': 1}
+    leidas = list(csv.reader(io.StringIO(texto)))
+    assert len(leidas) == 2
+    primera, tercera = (dict(zip(COLUMNS, fila)) for fila in leidas)
+
+    assert primera['titulo'] == 'Con "comillas", y coma'
+    assert primera['fecha'] == '2025-03-09 14:30:00'
+    assert primera['url'] == 'https://losandes.com.pe/a/'
+    assert primera['fuente'] == 'Los Andes'
+    assert primera['created_at']
+    # NULL en COPY csv: campo vacío sin comillas
+    assert primera['hora'] == '' and ',,' in texto.splitlines()[0]
+
+    assert tercera['titulo'] == 'Multilínea\nsegunda'
+    assert tercera['fecha'] == ''
+    assert tercera['fuente'] == 'Otra'
+    assert tercera['created_at'] == '2025-01-01 00:00:00'
+    assert tercera['caracteres_contenido'] == '10'
+
+
+def main():
+    pruebas = [
+        test_normaliza_fechas,
+        test_normaliza_horas_y_enteros,
+        test_normaliza_textos_listas_y_urls,
+        test_copy_stream_por_trozos,
+        test_csv_para_copy,
+    ]
+    fallos = 0
+    for prueba in pruebas:
+        try:
+            prueba()
+            print(f"✅ {prueba.__name__}")
+        except AssertionError as e:
+            fallos += 1
+            print(f"❌ {prueba.__name__}: {e}")
+    return fallos == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
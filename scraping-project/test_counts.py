@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la caché de totales de la API (api/counts)
+Un cursor simulado responde a las consultas de versión, COUNT y EXPLAIN, así
+se ve cuándo se vuelve a contar; no necesita PostgreSQL
+Se ejecuta con `python test_counts.py` o con pytest
+"""
+
+import asyncio
+import sys
+import time
+
+import api.counts as counts
+import api.rollups as rollups
+
+WHERE = ['fuente = %s']
+PARAMS = ['Los Andes']
+
+
+class CursorSimulado:
+    """Responde como `noticias` con la versión y el total indicados"""
+
+    def __init__(self, total=120, version=1, estimate=50000):
+        self.total = total
+        self.version = version
+        self.estimate = estimate
+        self.conteos = 0
+        self._fila = None
+
+    async def execute(self, sql, params=None):
+        if 'EXPLAIN' in sql:
+            self._fila = ([{'Plan': {'Plan Rows': self.estimate}}],)
+        elif 'COUNT(*)' in sql:
+            self.conteos += 1
+            self._fila = (self.total,)
+        elif 'pg_stat_user_tables' in sql:
+            self._fila = (self.version, 0)
+        else:
+            raise AssertionError(f"consulta inesperada: {sql}")
+
+    async def fetchone(self):
+        return self._fila
+
+
+def contar(cur, where=WHERE, params=PARAMS, **kwargs):
+    return asyncio.run(counts.count_news(cur, where, params, **kwargs))
+
+
+def preparar():
+    """Caché vacía; sin rollups y con la tabla de versión instalada"""
+    counts.invalidate_counts()
+    rollups._installed = (False, time.monotonic())
+    counts._versioned = (True, time.monotonic())
+
+
+def test_reutiliza_el_total_mientras_no_cambia_la_version():
+    preparar()
+    cur = CursorSimulado()
+    assert contar(cur) == (120, True)
+    assert contar(cur) == (120, True)
+    assert cur.conteos == 1
+    # Otro filtro tiene su propia entrada
+    assert contar(cur, params=['Puno Noticias']) == (120, True)
+    assert cur.conteos == 2
+
+
+def test_una_carga_invalida_los_totales():
+    preparar()
+    cur = CursorSimulado()
+    contar(cur)
+    cur.total, cur.version = 121, 2
+    assert contar(cur) == (121, True)
+    assert cur.conteos == 2
+
+
+def test_invalidate_counts_y_caducidad():
+    preparar()
+    cur = CursorSimulado()
+    contar(cur)
+    counts.invalidate_counts()
+    contar(cur)
+    assert cur.conteos == 2
+
+    ttl = counts.COUNT_CACHE_TTL
+    counts.COUNT_CACHE_TTL = -1
+    try:
+        contar(cur)
+    finally:
+        counts.COUNT_CACHE_TTL = ttl
+    assert cur.conteos == 3
+
+
+def test_descarta_el_filtro_menos_usado():
+    preparar()
+    tamano = counts.COUNT_CACHE_SIZE
+    counts.COUNT_CACHE_SIZE = 2
+    try:
+        cur = CursorSimulado()
+        for fuente in ['A', 'B', 'A', 'C']:
+            contar(cur, params=[fuente])
+        assert cur.conteos == 3
+        contar(cur, params=['A'])
+        assert cur.conteos == 3
+        contar(cur, params=['B'])
+        assert cur.conteos == 4
+    finally:
+        counts.COUNT_CACHE_SIZE = tamano
+
+
+def test_estimacion_para_busquedas_costosas():
+    preparar()
+    cur = CursorSimulado(estimate=50000)
+    assert contar(cur, expensive=True) == (50000, False)
+    assert cur.conteos == 0
+    # Por debajo del umbral se cuenta (y se guarda) el total exacto
+    cur.estimate = 10
+    assert contar(cur, expensive=True) == (120, True)
+    assert contar(cur, expensive=True) == (120, True)
+    assert cur.conteos == 1
+
+
+def main():
+    pruebas = [
+        test_reutiliza_el_total_mientras_no_cambia_la_version,
+        test_una_carga_invalida_los_totales,
+        test_invalidate_counts_y_caducidad,
+        test_descarta_el_filtro_menos_usado,
+        test_estimacion_para_busquedas_costosas,
+    ]
+    fallos = 0
+    for prueba in pruebas:
+        try:
+            prueba()
+            print(f"✅ {prueba.__name__}")
+        except AssertionError as e:
+            fallos += 1
+            print(f"❌ {prueba.__name__}: {e}")
+    return fallos == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
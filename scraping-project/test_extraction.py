@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Pruebas del motor de extracción por perfiles (spiders/extraction)
+Extrae una página de ejemplo con el perfil de Los Andes y comprueba que los
+selectores que aciertan pasan a probarse primero
+Se ejecuta con `python test_extraction.py` o con pytest
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+from spiders.extraction import PROFILES_DIR, STATS_FILENAME, ArticleExtractor
+from spiders.html_parser import parse_html
+
+URL = 'https://losandes.com.pe/politica/el-consejo-regional-aprueba-el-presupuesto/'
+
+# Plantilla sin las clases habituales de WordPress: el título solo lo
+# encuentra el último selector del perfil (h1) y el contenido el cuarto
+PAGINA = """
+<html><head>
+  <meta property="article:published_time" content="2025-03-09T14:30:00-05:00">
+</head><body>
+  <h1>El consejo regional aprueba el presupuesto</h1>
+  <div class="content">
+    <p>El consejo regional de Puno aprobó por mayoría el presupuesto del próximo año.</p>
+    <script>var x = 1;</script>
+  </div>
+  <div class="tags"><a href="/tag/puno/">Puno</a><a href="/tag/presupuesto/">Presupuesto</a></div>
+  <img src="/wp-content/uploads/foto.jpg" width="800" height="600">
+  <img src="/wp-content/themes/logo.png">
+</body></html>
+"""
+
+
+def _extractor(stats_path=None):
+    """Extractor nuevo (sin la caché por proceso de ArticleExtractor.load)"""
+    with open(os.path.join(PROFILES_DIR, 'losandes.json'), encoding='utf-8') as f:
+        return ArticleExtractor(json.load(f), stats_path, profile_name='losandes')
+
+
+def test_extrae_la_pagina():
+    data = _extractor().extract(parse_html(PAGINA), URL)
+    assert data['titulo'] == 'El consejo regional aprueba el presupuesto'
+    assert data['fecha'] == '2025-03-09' and data['hora'] == '14:30:00'
+    assert data['contenido'].startswith('El consejo regional de Puno')
+    assert 'var x' not in data['contenido']
+    assert data['tags'] == ['Puno', 'Presupuesto']
+    assert data['imagenes'] == ['https://losandes.com.pe/wp-content/uploads/foto.jpg']
+
+
+def test_defaults_del_perfil():
+    with open(os.path.join(PROFILES_DIR, 'pachamamaradio.json'), encoding='utf-8') as f:
+        extractor = ArticleExtractor(json.load(f), profile_name='pachamamaradio')
+    sin_fecha = parse_html('<html><body><h1>Titular sin fecha ni autor</h1></body></html>')
+    data = extractor.extract(sin_fecha, URL)
+    assert data['fecha'] and data['autor'] == 'Redacción Pachamama Radio'
+    # Los spiders de Scrapy guardan lo que falta como tal
+    data = extractor.extract(sin_fecha, URL, defaults=False)
+    assert data['fecha'] is None and data['autor'] is None
+
+
+def test_el_selector_que_acierta_pasa_primero():
+    extractor = _extractor()
+    titulo = extractor.fields['titulo']
+    assert titulo.ordered_selectors()[0] == 'h1.entry-title'
+
+    extractor.extract(parse_html(PAGINA), URL)
+    assert titulo.hits['h1'] == 1
+    assert titulo.ordered_selectors()[0] == 'h1'
+    # El resto conserva el orden del perfil
+    assert titulo.ordered_selectors()[1:] == [s for s in titulo.selectors if s != 'h1']
+    assert extractor.fields['contenido'].ordered_selectors()[0] == '.content'
+
+
+def test_un_acierto_no_adelanta_a_uno_mas_frecuente():
+    extractor = _extractor()
+    titulo = extractor.fields['titulo']
+    otra = '<html><body><h1 class="entry-title">Otro titular de la portada</h1></body></html>'
+    for _ in range(2):
+        extractor.extract(parse_html(otra), URL)
+    extractor.extract(parse_html(PAGINA), URL)
+    assert titulo.ordered_selectors()[:2] == ['h1.entry-title', 'h1']
+    extractor.extract(parse_html(PAGINA), URL)
+    extractor.extract(parse_html(PAGINA), URL)
+    assert titulo.ordered_selectors()[:2] == ['h1', 'h1.entry-title']
+
+
+def test_aciertos_de_otros_procesos_y_entre_ejecuciones():
+    with tempfile.TemporaryDirectory() as carpeta:
+        stats_path = os.path.join(carpeta, STATS_FILENAME)
+
+        # Un proceso del pool reporta solo lo nuevo desde su última entrega
+        worker = _extractor()
+        worker.extract(parse_html(PAGINA), URL)
+        hits = worker.take_hits()
+        assert hits['titulo'] == {'h1': 1}
+        assert worker.take_hits() == {}
+
+        principal = _extractor(stats_path)
+        principal.add_hits(hits)
+        assert principal.fields['titulo'].ordered_selectors()[0] == 'h1'
+        principal.save_stats()
+
+        # La siguiente ejecución empieza ya con el orden aprendido
+        siguiente = _extractor(stats_path)
+        assert siguiente.fields['titulo'].hits['h1'] == 1
+        assert siguiente.fields['titulo'].ordered_selectors()[0] == 'h1'
+        assert siguiente.take_hits() == {}
+
+
+def test_reordenar_no_vacia_la_lista_que_leen_otros_hilos():
+    # scraper/spiders/losandes.py comparte un extractor entre varios hilos:
+    # mientras se reordena, ordered_selectors() debe seguir completa
+    titulo = _extractor().fields['titulo']
+    vistas = []
+
+    class Aciertos(dict):
+        def __getitem__(self, selector):
+            # La clave de ordenación lee los aciertos: es cuando otro hilo puede entrar
+            vistas.append(len(titulo.ordered_selectors()))
+            return dict.__getitem__(self, selector)
+
+    titulo.hits = Aciertos(titulo.hits)
+    titulo.record_hit('h1')
+    assert titulo.ordered_selectors()[0] == 'h1'
+    assert vistas and min(vistas) == len(titulo.selectors)
+
+
+def test_enlaces_de_listado():
+    portada = parse_html(
+        '<html><body>'
+        '<h2><a href="/politica/nota-uno?utm_source=fb">Uno</a></h2>'
+        '<article><a href="http://www.losandes.com.pe/politica/nota-uno/">Uno otra vez</a></article>'
+        '<h3><a href="/deportes/nota-dos">Dos</a></h3>'
+        '<div class="nav-links"><a href="/page/2/">2</a></div>'
+        '</body></html>'
+    )
+    extractor = _extractor()
+    assert sorted(extractor.listing_links(portada, 'articles')) == [
+        'https://losandes.com.pe/deportes/nota-dos/',
+        'https://losandes.com.pe/politica/nota-uno/',
+    ]
+    assert extractor.listing_links(portada, 'pagination') == ['https://losandes.com.pe/page/2/']
+    assert extractor.listing_links(portada, 'desconocido') == []
+
+
+def main():
+    pruebas = [
+        test_extrae_la_pagina,
+        test_defaults_del_perfil,
+        test_el_selector_que_acierta_pasa_primero,
+        test_un_acierto_no_adelanta_a_uno_mas_frecuente,
+        test_aciertos_de_otros_procesos_y_entre_ejecuciones,
+        test_reordenar_no_vacia_la_lista_que_leen_otros_hilos,
+        test_enlaces_de_listado,
+    ]
+    fallos = 0
+    for prueba in pruebas:
+        try:
+            prueba()
+            print(f"✅ {prueba.__name__}")
+        except AssertionError as e:
+            fallos += 1
+            print(f"❌ {prueba.__name__}: {e}")
+    return fallos == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la salida en streaming de los scrapers (spiders/jsonl_sink)
+Rotación de los .jsonl y exportación a CSV/JSON
+Se ejecuta con `python test_jsonl_sink.py` o con pytest
+"""
+
+import csv
+import json
+import os
+import sys
+import tempfile
+
+from spiders.jsonl_sink import JsonlSink
+
+ARTICULOS = [
+    {'titulo': f'Noticia {i}', 'url': f'https://losandes.com.pe/n{i}/', 'contenido': 'á' * 40}
+    for i in range(10)
+]
+
+
+def _sink(carpeta, **kwargs):
+    sink = JsonlSink(carpeta, 'prueba', **kwargs)
+    for articulo in ARTICULOS:
+        sink.append(articulo)
+    return sink
+
+
+def test_rota_al_superar_el_tamano():
+    with tempfile.TemporaryDirectory() as carpeta:
+        # Rota en cuanto el fichero alcanza max_bytes: 3 artículos por fichero
+        linea = len((json.dumps(ARTICULOS[0], ensure_ascii=False) + '\n').encode('utf-8'))
+        with _sink(carpeta, max_bytes=2 * linea + 1) as sink:
+            assert len(sink) == len(ARTICULOS) and sink
+            assert len(sink.files) == 4
+            assert [os.path.basename(f)[-9:] for f in sink.files] == ['001.jsonl', '002.jsonl', '003.jsonl', '004.jsonl']
+            # Se relee en el orden en que se escribió, sin cerrar el sink
+            assert list(sink) == ARTICULOS
+        lineas = [sum(1 for _ in open(f, encoding='utf-8')) for f in sink.files]
+        assert lineas == [3, 3, 3, 1]
+
+
+def test_sin_articulos():
+    with tempfile.TemporaryDirectory() as carpeta:
+        with JsonlSink(carpeta, 'vacio') as sink:
+            assert len(sink) == 0 and not sink
+            assert sink.files == []
+            assert list(sink) == []
+            destino = sink.export_json(os.path.join(carpeta, 'vacio.json'))
+        assert json.load(open(destino, encoding='utf-8')) == []
+
+
+def test_omite_linea_cortada():
+    with tempfile.TemporaryDirectory() as carpeta:
+        with _sink(carpeta) as sink:
+            pass
+        with open(sink.files[-1], 'a', encoding='utf-8') as f:
+            f.write('{"titulo": "a medio escri')
+        assert list(sink.iter_articles()) == ARTICULOS
+
+
+def test_exporta_json_igual_que_json_dump():
+    with tempfile.TemporaryDirectory() as carpeta:
+        with _sink(carpeta, max_bytes=300) as sink:
+            destino = sink.export_json(os.path.join(carpeta, 'salida.json'))
+        with open(destino, encoding='utf-8') as f:
+            texto = f.read()
+        assert texto == json.dumps(ARTICULOS, ensure_ascii=False, indent=2)
+
+
+def test_exporta_csv_con_columnas_de_todos_los_articulos():
+    with tempfile.TemporaryDirectory() as carpeta:
+        with JsonlSink(carpeta, 'csv') as sink:
+            sink.append({'titulo': 'Uno', 'url': 'https://a.pe/1/'})
+            sink.append({'titulo': 'Dos, "citado"', 'autor': 'Redacción', 'url': 'https://a.pe/2/'})
+            destino = sink.export_csv(os.path.join(carpeta, 'salida.csv'))
+        with open(destino, newline='', encoding='utf-8') as f:
+            filas = list(csv.DictReader(f))
+        assert list(filas[0]) == ['titulo', 'url', 'autor']
+        assert filas[0] == {'titulo': 'Uno', 'url': 'https://a.pe/1/', 'autor': ''}
+        assert filas[1]['titulo'] == 'Dos, "citado"' and filas[1]['autor'] == 'Redacción'
+
+
+def main():
+    pruebas = [
+        test_rota_al_superar_el_tamano,
+        test_sin_articulos,
+        test_omite_linea_cortada,
+        test_exporta_json_igual_que_json_dump,
+        test_exporta_csv_con_columnas_de_todos_los_articulos,
+    ]
+    fallos = 0
+    for prueba in pruebas:
+        try:
+            prueba()
+            print(f"✅ {prueba.__name__}")
+        except AssertionError as e:
+            fallos += 1
+            print(f"❌ {prueba.__name__}: {e}")
+    return fallos == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
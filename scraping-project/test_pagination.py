@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la paginación por cursor de la API (api/pagination)
+Se ejecuta con `python test_pagination.py` o con pytest
+"""
+
+import asyncio
+import sys
+from datetime import datetime
+
+from fastapi import HTTPException
+
+from api.pagination import decode_cursor, encode_cursor, fetch_page
+
+COLUMNS = ['id', 'fecha', 'titulo']
+
+
+class CursorGuionado:
+    """Cursor asíncrono que devuelve, consulta a consulta, las filas indicadas"""
+
+    def __init__(self, *resultados):
+        self.resultados = list(resultados)
+        self.consultas = []
+
+    async def execute(self, sql, params=None):
+        self.consultas.append((' '.join(sql.split()), list(params or [])))
+
+    async def fetchall(self):
+        return list(self.resultados.pop(0))
+
+
+def pagina(cur, **kwargs):
+    opciones = dict(where=[], params=[], order='desc', limit=3)
+    opciones.update(kwargs)
+    return asyncio.run(fetch_page(cur, COLUMNS, **opciones))
+
+
+def test_cursor_ida_y_vuelta():
+    fecha = datetime(2025, 3, 9, 14, 30, 5)
+    assert decode_cursor(encode_cursor(fecha, 42, 'desc'), 'desc') == (fecha, 42)
+    assert decode_cursor(encode_cursor(None, 7, 'asc'), 'asc') == (None, 7)
+    # Sin relleno '=': va tal cual en la query string
+    assert '=' not in encode_cursor(fecha, 123456, 'desc')
+
+
+def test_cursor_invalido_u_otro_orden():
+    for cursor, orden in [('no-es-base64!', 'desc'), ('bnVsbA', 'desc'), (encode_cursor(None, 1, 'asc'), 'desc')]:
+        try:
+            decode_cursor(cursor, orden)
+        except HTTPException as e:
+            assert e.status_code == 400, cursor
+        else:
+            raise AssertionError(f"cursor aceptado: {cursor}")
+
+
+def test_primera_pagina_con_offset():
+    filas = [(3, datetime(2025, 3, 3), 'c'), (2, datetime(2025, 3, 2), 'b'), (1, datetime(2025, 3, 1), 'a')]
+    cur = CursorGuionado(filas)
+    rows, siguiente = pagina(cur, skip=6)
+    assert rows == filas
+    sql, params = cur.consultas[0]
+    assert 'ORDER BY fecha DESC NULLS LAST, id DESC OFFSET %s LIMIT %s' in sql
+    assert params == [6, 3]
+    assert decode_cursor(siguiente, 'desc') == (datetime(2025, 3, 1), 1)
+
+
+def test_ultima_pagina_sin_cursor_siguiente():
+    cur = CursorGuionado([(1, datetime(2025, 3, 1), 'a')])
+    assert pagina(cur) == ([(1, datetime(2025, 3, 1), 'a')], None)
+
+
+def test_continua_con_las_filas_sin_fecha():
+    # Quedan dos filas con fecha; la página se completa con las que no la tienen
+    con_fecha = [(5, datetime(2025, 3, 2), 'e'), (4, datetime(2025, 3, 1), 'd')]
+    sin_fecha = [(9, None, 'i')]
+    cur = CursorGuionado(con_fecha, sin_fecha)
+    rows, siguiente = pagina(cur, where=['fuente = %s'], params=['Los Andes'],
+                             cursor=encode_cursor(datetime(2025, 3, 3), 6, 'desc'))
+    assert rows == con_fecha + sin_fecha
+    (sql_fecha, params_fecha), (sql_nulas, params_nulas) = cur.consultas
+    assert 'WHERE fuente = %s AND (fecha, id) < (%s, %s)' in sql_fecha
+    assert params_fecha == ['Los Andes', datetime(2025, 3, 3), 6, 3]
+    assert 'WHERE fuente = %s AND fecha IS NULL ORDER BY id DESC LIMIT %s' in sql_nulas
+    assert params_nulas == ['Los Andes', 1]
+    # El cursor siguiente apunta ya a las filas sin fecha
+    assert decode_cursor(siguiente, 'desc') == (None, 9)
+
+
+def test_cursor_dentro_de_las_filas_sin_fecha():
+    sin_fecha = [(8, None, 'h'), (7, None, 'g'), (3, None, 'c')]
+    cur = CursorGuionado(sin_fecha)
+    rows, siguiente = pagina(cur, order='asc', cursor=encode_cursor(None, 2, 'asc'))
+    assert rows == sin_fecha
+    # Ya no se consultan las filas con fecha
+    assert len(cur.consultas) == 1
+    sql, params = cur.consultas[0]
+    assert 'WHERE fecha IS NULL AND id > %s ORDER BY id ASC LIMIT %s' in sql
+    assert params == [2, 3]
+    assert decode_cursor(siguiente, 'asc') == (None, 3)
+
+
+def main():
+    pruebas = [
+        test_cursor_ida_y_vuelta,
+        test_cursor_invalido_u_otro_orden,
+        test_primera_pagina_con_offset,
+        test_ultima_pagina_sin_cursor_siguiente,
+        test_continua_con_las_filas_sin_fecha,
+        test_cursor_dentro_de_las_filas_sin_fecha,
+    ]
+    fallos = 0
+    for prueba in pruebas:
+        try:
+            prueba()
+            print(f"✅ {prueba.__name__}")
+        except AssertionError as e:
+            fallos += 1
+            print(f"❌ {prueba.__name__}: {e}")
+    return fallos == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
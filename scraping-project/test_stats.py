@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Pruebas de las estadísticas de la API (api/stats)
+Decodificación de la máscara GROUPING() de la consulta GROUPING SETS; las
+filas las devuelve un cursor simulado, no necesita PostgreSQL
+Se ejecuta con `python test_stats.py` o con pytest
+"""
+
+import asyncio
+import sys
+import time
+from datetime import datetime
+
+import api.rollups as rollups
+from api.stats import RECENT_DAYS, compute_stats
+
+# GROUPING(fuente, categoria, mes, dia_semana): bit a 1 = columna agregada
+POR_FUENTE, POR_CATEGORIA, POR_MES, POR_DIA, TOTAL = 0b0111, 0b1011, 0b1101, 0b1110, 0b1111
+
+FILAS = [
+    # (grouping, fuente, categoria, mes, dia_semana, total, recientes)
+    (POR_FUENTE, 'Puno Noticias', None, None, None, 40, 6),
+    (POR_FUENTE, 'Los Andes', None, None, None, 60, 24),
+    (POR_FUENTE, None, None, None, None, 5, 0),          # noticias sin fuente
+    (POR_CATEGORIA, None, 'Política', None, None, 70, 20),
+    (POR_CATEGORIA, None, 'Deportes', None, None, 35, 10),
+    (POR_CATEGORIA, None, 'Cultura', None, None, 0, 0),  # resto de un rollup tras borrar
+    (POR_MES, None, None, '2025-03', None, 55, 30),
+    (POR_MES, None, None, '2025-01', None, 50, 0),
+    (POR_DIA, None, None, None, 1, 30, 10),
+    (POR_DIA, None, None, None, 7, 75, 20),
+    (TOTAL, None, None, None, None, 105, 30),
+]
+
+RECIENTES = [(105, 'Última noticia', datetime(2025, 3, 9, 14, 30))]
+
+
+class CursorSimulado:
+    def __init__(self, *resultados):
+        self.resultados = list(resultados)
+        self.consultas = []
+
+    async def execute(self, sql, params=None):
+        self.consultas.append((' '.join(sql.split()), list(params or [])))
+
+    async def fetchall(self):
+        return self.resultados.pop(0)
+
+
+def estadisticas(filas, **kwargs):
+    rollups._installed = (True, time.monotonic())
+    cur = CursorSimulado(filas, RECIENTES)
+    return asyncio.run(compute_stats(cur, **kwargs)), cur
+
+
+def test_cada_conjunto_en_su_desglose():
+    stats, _ = estadisticas(FILAS)
+    assert stats['total'] == 105
+    assert stats['por_fuente'] == [{'nombre': 'Los Andes', 'total': 60}, {'nombre': 'Puno Noticias', 'total': 40}]
+    assert stats['total_fuentes'] == 2
+    # Ordenado por total; las filas a 0 del rollup no cuentan
+    assert stats['por_categoria'] == [{'nombre': 'Política', 'total': 70}, {'nombre': 'Deportes', 'total': 35}]
+    assert stats['total_categorias'] == 2
+    assert stats['por_mes'] == [{'mes': '2025-01', 'total': 50}, {'mes': '2025-03', 'total': 55}]
+    assert stats['promedio_diario'] == round(30 / RECENT_DAYS, 1)
+    assert stats['recientes'] == [{'id': 105, 'titulo': 'Última noticia', 'created_at': datetime(2025, 3, 9, 14, 30)}]
+
+
+def test_dias_de_la_semana_isodow():
+    stats, _ = estadisticas(FILAS)
+    dias = {d['dia']: d['total'] for d in stats['por_dia_semana']}
+    assert list(dias) == ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
+    assert dias['Lunes'] == 30 and dias['Domingo'] == 75
+    assert dias['Martes'] == 0
+
+
+def test_sin_noticias():
+    stats, _ = estadisticas([(TOTAL, None, None, None, None, None, None)])
+    assert stats['total'] == 0 and stats['promedio_diario'] == 0
+    assert stats['por_fuente'] == [] and stats['por_mes'] == []
+    assert all(d['total'] == 0 for d in stats['por_dia_semana'])
+
+
+def test_filtro_de_fechas_sobre_el_rollup():
+    desde, hasta = datetime(2025, 1, 1).date(), datetime(2025, 3, 31).date()
+    _, cur = estadisticas(FILAS, date_from=desde, date_to=hasta)
+    (sql, params), (sql_recientes, params_recientes) = cur.consultas
+    assert 'FROM noticias_diarias WHERE dia >= %s AND dia <= %s' in sql
+    assert params == [desde, hasta]
+    assert 'fecha >= %s AND fecha < %s::date + 1' in sql_recientes
+    assert params_recientes[:2] == [desde, hasta]
+
+
+def main():
+    pruebas = [
+        test_cada_conjunto_en_su_desglose,
+        test_dias_de_la_semana_isodow,
+        test_sin_noticias,
+        test_filtro_de_fechas_sobre_el_rollup,
+    ]
+    fallos = 0
+    for prueba in pruebas:
+        try:
+            prueba()
+            print(f"✅ {prueba.__name__}")
+        except AssertionError as e:
+            fallos += 1
+            print(f"❌ {prueba.__name__}: {e}")
+    return fallos == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
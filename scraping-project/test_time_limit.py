@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Pruebas del límite de tiempo del scraping de cada fuente (celery_tasks/scraping_tasks)
+Límite incremental o de rastreo completo según el estado de rastreo, y el
+límite suave en mitad del rastreo de Los Andes: el resumen del chord debe
+recibir la fuente como fallida. Descargas simuladas y tareas en modo eager:
+no necesita red, Redis ni PostgreSQL
+Se ejecuta con `python test_time_limit.py` o con pytest
+"""
+
+import os
+import sys
+import tempfile
+from functools import partial
+
+from celery.exceptions import SoftTimeLimitExceeded
+
+import spiders.discovery as discovery
+import spiders.losandes_local as losandes_local
+import spiders.parse_pool as parse_pool
+from celery_app import celery_app
+from celery_tasks.scraping_tasks import (TIME_LIMIT_GRACE_SECONDS, launch_sources,
+                                         source_pipeline, source_timeout)
+from config.redis_config import SCRAPING_FULL_TIMEOUT_SECONDS, SCRAPING_TIMEOUT_SECONDS
+from spiders.crawl_state import CrawlState
+from spiders.fetcher import AsyncFetcher, FetchResponse
+
+URLS = [f'https://losandes.com.pe/politica/noticia-{i}/' for i in range(40)]
+
+PAGINA = b"""
+<html><body>
+  <h1 class="entry-title">Noticia de prueba</h1>
+  <div class="entry-content"><p>Contenido de la noticia de prueba.</p></div>
+</body></html>
+"""
+
+
+class Parches:
+    """Sustituye atributos de módulos y clases y los restaura al salir"""
+
+    def __init__(self, *parches):
+        self.parches = parches
+        self.originales = []
+
+    def __enter__(self):
+        for objeto, nombre, valor in self.parches:
+            self.originales.append((objeto, nombre, getattr(objeto, nombre)))
+            setattr(objeto, nombre, valor)
+        return self
+
+    def __exit__(self, *exc):
+        for objeto, nombre, valor in reversed(self.originales):
+            setattr(objeto, nombre, valor)
+
+
+async def descarga_simulada(self, url, headers=None):
+    return FetchResponse(url, 200, PAGINA, {'Content-Type': 'text/html; charset=utf-8'})
+
+
+def limite_suave(*args, **kwargs):
+    raise SoftTimeLimitExceeded()
+
+
+class CarpetaTemporal(tempfile.TemporaryDirectory):
+    """Directorio de trabajo temporal: los spiders escriben en data/<fuente>"""
+
+    def __enter__(self):
+        self.anterior = os.getcwd()
+        os.chdir(self.name)
+        return self.name
+
+    def __exit__(self, *exc):
+        os.chdir(self.anterior)
+        super().__exit__(*exc)
+
+
+def lanzar_losandes():
+    """Cadena de Los Andes y resumen del chord, sin estado de rastreo previo"""
+    celery_app.conf.update(
+        broker_url='memory://',
+        result_backend='cache+memory://',
+        task_always_eager=True,
+        task_eager_propagates=True,
+    )
+    entorno = {'SINK_DB_ENABLED': 'false', 'SCRAPING_PARSE_WORKERS': '2'}
+    previo = {clave: os.environ.get(clave) for clave in entorno}
+    os.environ.update(entorno)
+    try:
+        with CarpetaTemporal():
+            return launch_sources(['losandes']).get()
+    finally:
+        for clave, valor in previo.items():
+            if valor is None:
+                os.environ.pop(clave)
+            else:
+                os.environ[clave] = valor
+
+
+def comprobar_fallo(resumen):
+    fuente = resumen['sources']['losandes']
+    assert resumen['status'] == 'completed'
+    assert fuente['status'] == 'failed'
+    assert fuente['articles_count'] == 0 and fuente['migrated_count'] == 0
+    # Primera ejecución de la fuente: el límite de un rastreo completo
+    assert fuente['error'] == f"Tiempo límite superado ({SCRAPING_FULL_TIMEOUT_SECONDS} s)"
+
+
+def test_limite_completo_sin_estado_de_rastreo():
+    with CarpetaTemporal():
+        assert source_timeout('losandes', incremental=True) == SCRAPING_FULL_TIMEOUT_SECONDS
+        # Un rastreo sin terminar tampoco cuenta como estado
+        estado = CrawlState('data/losandes')
+        estado.start_run('incremental')
+        estado.close()
+        assert source_timeout('losandes', incremental=True) == SCRAPING_FULL_TIMEOUT_SECONDS
+
+        with CrawlState('data/losandes') as estado:
+            estado.start_run('incremental')
+            estado.finish_run(10)
+        assert source_timeout('losandes', incremental=True) == SCRAPING_TIMEOUT_SECONDS
+        assert source_timeout('losandes', incremental=False) == SCRAPING_FULL_TIMEOUT_SECONDS
+
+        scrape = source_pipeline('losandes', incremental=True).tasks[0]
+        assert scrape.args == ('losandes', True)
+        assert scrape.options['soft_time_limit'] == SCRAPING_TIMEOUT_SECONDS
+        assert scrape.options['time_limit'] == SCRAPING_TIMEOUT_SECONDS + TIME_LIMIT_GRACE_SECONDS
+        scrape = source_pipeline('losandes', incremental=False).tasks[0]
+        assert scrape.options['soft_time_limit'] == SCRAPING_FULL_TIMEOUT_SECONDS
+
+
+def test_limite_durante_el_descubrimiento():
+    descargas = []
+
+    async def descarga(self, url, headers=None):
+        descargas.append(url)
+        return None
+
+    # Sin el límite, el descubrimiento fallido recurriría al rastreo HTML
+    with Parches((discovery.SiteDiscovery, 'discover', limite_suave),
+                 (AsyncFetcher, 'fetch', descarga)):
+        comprobar_fallo(lanzar_losandes())
+    assert descargas == []
+
+
+def test_limite_mientras_el_pool_de_parseo_esta_lleno():
+    esperas = []
+    wait = parse_pool.wait
+
+    def espera(*args, **kwargs):
+        # El límite llega una sola vez, mientras submit espera a un proceso
+        esperas.append(args)
+        if len(esperas) == 1:
+            raise SoftTimeLimitExceeded()
+        return wait(*args, **kwargs)
+
+    with Parches((losandes_local, 'discover_articles', lambda *args: dict.fromkeys(URLS)),
+                 (losandes_local, 'ParsePool', partial(parse_pool.ParsePool, max_pending=1)),
+                 (AsyncFetcher, 'fetch', descarga_simulada),
+                 (parse_pool, 'wait', espera)):
+        comprobar_fallo(lanzar_losandes())
+    assert len(esperas) == 1
+
+
+def main():
+    pruebas = [
+        test_limite_completo_sin_estado_de_rastreo,
+        test_limite_durante_el_descubrimiento,
+        test_limite_mientras_el_pool_de_parseo_esta_lleno,
+    ]
+    fallos = 0
+    for prueba in pruebas:
+        try:
+            prueba()
+            print(f"✅ {prueba.__name__}")
+        except AssertionError as e:
+            fallos += 1
+            print(f"❌ {prueba.__name__}: {e}")
+    return fallos == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Forma canónica de las URL de artículos
+La misma noticia aparece enlazada con variantes: ?utm_*, #comentarios,
+http o https, con www o sin él. Los scrapers canonicalizan cada enlace al
+descubrirlo (así cada artículo se descarga una sola vez) y BulkLoader al
+guardarlo (el índice único sobre `url` hace que se guarde una sola vez).
+
+Reglas para cualquier sitio, que no cambian la página que se sirve:
+esquema https, host en minúsculas y sin www, sin puerto por defecto,
+segmentos . y .. resueltos, sin #fragmento y sin parámetros de campaña
+(utm_*, fbclid, gclid). El resto de la query se conserva tal cual.
+
+Reglas propias de un sitio, en la sección "urls" de su perfil
+(spiders/profiles/<fuente>.json), según el host de su base_url:
+- trailing_slash: barra final en las rutas sin extensión (WordPress
+  redirige ahí; pedirla sin barra cuesta una redirección)
+- drop_params: parámetros que en ese sitio no cambian el contenido
+
+    canonical_url('http://www.losandes.com.pe/politica/nota?utm_source=fb#respond')
+    -> 'https://losandes.com.pe/politica/nota/'
+"""
+
+import glob
+import json
+import os
+import posixpath
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+PROFILES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'spiders', 'profiles')
+
+# Todas las fuentes se sirven por https y sin www
+CANONICAL_SCHEME = 'https'
+
+# Parámetros de campañas y de clics en anuncios
+TRACKING_PARAM_PREFIXES = ('utm_',)
+TRACKING_PARAMS = {'fbclid', 'gclid'}
+
+_DEFAULT_PORTS = {'80', '443'}
+
+_site_rules = None
+
+
+def site_rules():
+    """{host: reglas "urls"} de los perfiles de las fuentes (leídos una vez)"""
+    global _site_rules
+    if _site_rules is None:
+        rules = {}
+        for path in glob.glob(os.path.join(PROFILES_DIR, '*.json')):
+            with open(path, 'r', encoding='utf-8') as f:
+                profile = json.load(f)
+            if profile.get('urls') and profile.get('base_url'):
+                rules[_canonical_host(urlsplit(profile['base_url']).netloc)] = profile['urls']
+        _site_rules = rules
+    return _site_rules
+
+
+def _canonical_host(netloc):
+    host = netloc.rsplit('@', 1)[-1].lower()
+    port = None
+    if ':' in host and not host.endswith(']'):
+        host, port = host.rsplit(':', 1)
+    host = host.rstrip('.')
+    if host.startswith('www.'):
+        host = host[4:]
+    return f"{host}:{port}" if port and port not in _DEFAULT_PORTS else host
+
+
+def _canonical_path(path, trailing_slash=False):
+    path = path or '/'
+    if '/.' in path:
+        # Segmentos . y .. (urljoin solo los resuelve en enlaces relativos)
+        trailing = path.endswith(('/', '/.', '/..'))
+        path = posixpath.normpath(path)
+        if path.startswith('//'):
+            path = '/' + path.lstrip('/')
+        if trailing and path != '/':
+            path += '/'
+    if trailing_slash and not path.endswith('/') and '.' not in path.rsplit('/', 1)[-1]:
+        path += '/'
+    return path
+
+
+def _canonical_query(query, drop_params=()):
+    """Query sin los parámetros descartados; el resto sin recodificar ni reordenar"""
+    if not query:
+        return query
+    kept = []
+    for param in query.split('&'):
+        name = param.split('=', 1)[0].lower()
+        if name.startswith(TRACKING_PARAM_PREFIXES) or name in TRACKING_PARAMS or name in drop_params:
+            continue
+        kept.append(param)
+    return '&'.join(kept)
+
+
+def canonical_url(url, base=None):
+    """
+    Forma canónica de `url` (relativa a `base` si se da), o None si está
+    vacía. Las URL que no son http(s) (mailto:, javascript:...) se
+    devuelven sin cambios.
+    """
+    if url is None:
+        return None
+    url = str(url).strip()
+    if base:
+        url = urljoin(base, url)
+    if not url:
+        return None
+
+    parts = urlsplit(url)
+    if parts.scheme.lower() not in ('http', 'https') or not parts.netloc:
+        return url
+
+    host = _canonical_host(parts.netloc)
+    rules = site_rules().get(host, {})
+    drop_params = {name.lower() for name in rules.get('drop_params', ())}
+    return urlunsplit((
+        CANONICAL_SCHEME,
+        host,
+        _canonical_path(parts.path, rules.get('trailing_slash', False)),
+        _canonical_query(parts.query, drop_params),
+        '',
+    ))
+
+
+def canonical_urls(urls, base=None):
+    """Forma canónica de varias URL, sin repetidas y en el orden original"""
+    return list(dict.fromkeys(filter(None, (canonical_url(url, base) for url in urls))))